@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible.module_utils.basic import remove_values
+from ansible.plugins.action import ActionBase
+
+try:
+    from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+    from ansible.module_utils.errors import UnsupportedError
+except ImportError:
+    # ansible-base 2.10 and older: the modules are run as usual.
+    ArgumentSpecValidator = None
+
+from ..module_utils.ac_client import ACClientError, open_client
+from ..module_utils.ac_facts import facts_argument_spec, run_facts
+from ..module_utils.ac_intent import intent_argument_spec, run_intent
+from ..module_utils.ac_resource import (RESOURCES, perform, resource_argument_spec, resource_required_if,
+                                        resource_runner)
+
+
+def entry_point(module_name):
+    """Return ``(argument spec, required_if, runner)`` of an ac_* module, or None."""
+    resource_type = module_name[len('ac_'):]
+    if module_name.startswith('ac_') and resource_type in RESOURCES:
+        return (resource_argument_spec(resource_type), resource_required_if(resource_type),
+                resource_runner(resource_type))
+    if module_name == 'ac_fabric_intent':
+        return intent_argument_spec(), [], run_intent
+    if module_name == 'ac_facts':
+        return facts_argument_spec(), [], run_facts
+    return None
+
+
+class ActionModule(ActionBase):
+    """Runs the ac_* modules inside the Ansible process instead of shipping them.
+
+    The modules only speak HTTPS to the controller, so when the task runs
+    on the control node, directly or over the C(httpapi) connection, the
+    requests are made from here. That skips building the AnsiballZ payload
+    and starting a Python interpreter for every task. Tasks on other hosts
+    and older Ansible versions run the module as usual.
+    """
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+        module_name = self._task.action.split('.')[-1]
+        entry = entry_point(module_name)
+        socket_path = getattr(self._connection, 'socket_path', None)
+        local = self._connection.transport == 'local' or socket_path
+        if entry is None or ArgumentSpecValidator is None or not local:
+            result.update(self._execute_module(module_name=self._task.action, module_args=self._task.args,
+                                               task_vars=task_vars))
+            return result
+
+        argument_spec, required_if, runner = entry
+        validation = ArgumentSpecValidator(argument_spec, required_if=required_if).validate(self._task.args)
+        if validation.error_messages:
+            msg = validation.errors.msg
+            if isinstance(validation.errors[0], UnsupportedError):
+                msg = 'Unsupported parameters for (%s) module: %s' % (module_name, msg)
+            result.update(failed=True, msg=msg)
+            return result
+        params = validation.validated_parameters
+        try:
+            client = open_client(params, socket_path)
+        except ACClientError as e:
+            result.update(failed=True, msg=str(e))
+            return result
+        result.update(perform(runner, params, client, self._play_context.check_mode))
+        return remove_values(result, validation._no_log_values)
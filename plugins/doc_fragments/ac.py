@@ -0,0 +1,123 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+
+    # Connection options of the ac_* modules talking to the northbound API
+    DOCUMENTATION = '''
+options:
+    north_ip:
+        description:
+            - Address of the AC northbound interface.
+            - Required unless the task runs over the C(httpapi) connection, which then provides the session.
+        type: str
+    north_port:
+        description:
+            - Port of the AC northbound interface.
+        type: int
+        default: 18002
+    token:
+        description:
+            - AC access token, as returned by M(huawei.ac.ac_token).
+            - When omitted, I(username) and I(password) are used to get a token, see I(token_cache).
+        type: str
+        aliases: [token_id]
+    username:
+        description:
+            - AC User name.
+        type: str
+        aliases: [userName]
+    password:
+        description:
+            - AC User password.
+        type: str
+    validate_certs:
+        description:
+            - Whether to validate the controller TLS certificate.
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Socket timeout in seconds.
+        type: int
+        default: 30
+    pool_size:
+        description:
+            - Number of idle keep-alive connections kept for reuse while the task runs.
+        type: int
+        default: 4
+    retries:
+        description:
+            - Number of times a request is sent again after a transient failure.
+            - Answers C(429) and C(503) are retried for every request. Connection failures and answers C(502) and C(504)
+              are only retried for requests that can safely be repeated, that is reads, updates, deletes and creates
+              whose objects carry their id.
+            - Waits grow exponentially with random jitter, or follow the C(Retry-After) header of the controller.
+            - After 5 failures in a row, requests fail at once for 30 seconds instead of adding load to the controller.
+        type: int
+        default: 3
+    retry_max_delay:
+        description:
+            - Longest wait in seconds before a retry.
+        type: int
+        default: 30
+    rate_limit:
+        description:
+            - Highest average number of requests per second sent to the controller.
+            - All threads of the task and all forks on the same host share one budget per controller, kept in a file under
+              C(~/.ansible/ac_limits), so parallel tasks and I(workers) cannot burst past it together.
+            - By default requests are not limited.
+        type: float
+    rate_burst:
+        description:
+            - Number of requests that may be sent at once after an idle period when I(rate_limit) is set.
+            - Defaults to I(rate_limit) rounded down, and at least 1.
+        type: int
+    adaptive_concurrency:
+        description:
+            - Adapt the number of concurrent requests to how the controller copes, separately for each class of request
+              such as C(POST ports) or C(GET tenants).
+            - A class starts with 4 requests in flight and gains about one more per round of fast, successful answers; a
+              timeout, a 5xx or 429 answer, or an answer more than twice as slow as usual halves it.
+            - The number of concurrent requests of the task stays the upper bound. When disabled, only that number and
+              I(concurrency_limits) bound the requests in flight.
+        type: bool
+        default: true
+    concurrency_limits:
+        description:
+            - Highest number of concurrent requests per class of request, by C(METHOD collection) such as C(POST ports),
+              by collection such as C(ports), or by method such as C(GET). The most specific entry applies.
+        type: dict
+        default: {}
+    token_cache:
+        description:
+            - Keep the token obtained with I(username) and I(password) in a private file under C(~/.ansible/ac_tokens)
+              and reuse it in later tasks and runs until shortly before it expires.
+            - All forks share the file; when the token has to be replaced one fork logs in and the others wait for it.
+            - When disabled, the task logs in and out again.
+        type: bool
+        default: true
+notes:
+  - This module uses a token from M(huawei.ac.ac_token), or logs in with I(username) and I(password).
+  - With C(ansible_connection=ansible.netcommon.httpapi) and the C(ac) httpapi plugin, the connection
+    options are ignored and all tasks of the play share one authenticated session.
+'''
@@ -0,0 +1,82 @@
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+name: ac
+short_description: HttpApi Plugin for HUAWEI iMaster NCE-Fabric Controller.
+description:
+    - Keeps one authenticated session to HUAWEI iMaster NCE-Fabric Controller(AC) for the whole play.
+    - The token is created once through C(/controller/v2/tokens) with C(ansible_user) and C(ansible_password),
+      and HTTPS connections to the northbound interface are kept alive between tasks.
+author: ZhiwenZhang (@maomao1995)
+notes:
+  - Set C(ansible_connection=ansible.netcommon.httpapi) and C(ansible_network_os) to this plugin on the controller host.
+  - C(ansible_httpapi_port) defaults to 18002. The northbound interface is HTTPS only.
+  - The token is cached under C(~/.ansible/ac_tokens) and reused by later plays and runs while it is valid.
+    It is refreshed before it expires, and re-created once when the controller answers HTTP 401.
+  - Identical GET requests of the tasks of a play are sent once, and their answers are reused for up to 60 seconds.
+    Creates and updates through the connection forget the answers of their collection, and deletes forget all
+    answers.
+'''
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.plugins.httpapi import HttpApiBase
+
+from ..module_utils.ac_auth import TokenCache, TokenManager, token_cache_path
+from ..module_utils.ac_client import ACClient, ACClientError, DEFAULT_PORT
+from ..module_utils.ac_memo import RequestMemo
+
+
+class HttpApi(HttpApiBase):
+
+    def __init__(self, connection):
+        super(HttpApi, self).__init__(connection)
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            conn = self.connection
+            self._client = ACClient(conn.get_option('host'), conn.get_option('port') or DEFAULT_PORT,
+                                    validate_certs=conn.get_option('validate_certs'),
+                                    timeout=conn.get_option('persistent_command_timeout'),
+                                    memo=RequestMemo())
+        return self._client
+
+    def login(self, username, password):
+        if not (username and password):
+            raise AnsibleConnectionFailure('ansible_user and ansible_password are required to log in to AC')
+        client = self._get_client()
+        cache = TokenCache(token_cache_path(client.host, client.port, username))
+        client.auth = TokenManager(client, username, password, cache=cache)
+        try:
+            client.token = client.auth.token()
+        except ACClientError as e:
+            raise AnsibleConnectionFailure('Login to AC failed: %s' % e)
+
+    def logout(self):
+        # The token stays cached for later runs; only the sockets are closed.
+        if self._client is not None:
+            self._client.close()
+
+    def send_request(self, method, path, body=None, query=None):
+        """Send one northbound request and return ``(status, headers, data)``."""
+        # Requests bypass connection.send(), which is what logs in on first use.
+        self.connection._connect()
+        return self._get_client().send(method, path, body, query)
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+name: ac_id
+short_description: Resolves object names to ids on HUAWEI iMaster NCE-Fabric Controller.
+description:
+    - Returns the id of the object of the given type named I(name) on HUAWEI iMaster NCE-Fabric Controller(AC).
+    - Each type is listed once with paged requests and kept in a bounded least recently used cache of the process,
+      so resolving many names of one type costs one listing instead of one request per name.
+author: ZhiwenZhang (@maomao1995)
+notes:
+  - The cache lives as long as the process templating the task, so it is shared by all items of a loop. Combine it with
+    I(snapshot_max_age) to share listings between tasks and runs.
+  - Logins use the token cache of the modules, so the lookup reuses the token of earlier tasks.
+options:
+    _terms:
+        description:
+            - Object types, one of C(tenant), C(logicnetwork), C(logicrouter), C(logicswitch), C(logicsubnet),
+              C(logicinterface), C(logicport) or C(endport). One id is returned per term.
+        required: true
+    name:
+        description:
+            - Name of the object.
+        type: str
+        required: true
+    filters:
+        description:
+            - Other fields the object must have, e.g. C(logicNetworkId), when the name alone is not unique.
+        type: dict
+        default: {}
+    north_ip:
+        description:
+            - Address of the AC northbound interface.
+        type: str
+        required: true
+        vars:
+            - name: ac_north_ip
+        env:
+            - name: AC_NORTH_IP
+    north_port:
+        description:
+            - Port of the AC northbound interface.
+        type: int
+        default: 18002
+        vars:
+            - name: ac_north_port
+        env:
+            - name: AC_NORTH_PORT
+    token:
+        description:
+            - AC access token, as returned by M(huawei.ac.ac_token).
+        type: str
+        vars:
+            - name: ac_token
+        env:
+            - name: AC_TOKEN
+    username:
+        description:
+            - AC User name, used when I(token) is not set.
+        type: str
+        vars:
+            - name: ac_username
+        env:
+            - name: AC_USERNAME
+    password:
+        description:
+            - AC User password.
+        type: str
+        vars:
+            - name: ac_password
+        env:
+            - name: AC_PASSWORD
+    validate_certs:
+        description:
+            - Whether to validate the controller TLS certificate.
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Socket timeout in seconds.
+        type: int
+        default: 30
+    page_size:
+        description:
+            - Number of objects fetched per request when listing a type.
+        type: int
+        default: 1000
+    cache_ttl:
+        description:
+            - Seconds a listing is reused for.
+        type: int
+        default: 300
+    cache_size:
+        description:
+            - Maximum number of listings kept; the least recently used one is dropped first.
+        type: int
+        default: 64
+    snapshot_max_age:
+        description:
+            - List types from the local snapshot written by M(huawei.ac.ac_facts) when it was refreshed at most this many seconds ago.
+        type: int
+'''
+
+EXAMPLES = '''
+- name: Create a LogicPort on LogicSwitch web
+  ac_logicport:
+    operation: create
+    logicport_name: web-p1
+    logicswitch_id: "{{ lookup('ac_id', 'logicswitch', name='web') }}"
+    device_ip: 10.0.0.11
+    port_name: 10GE1/0/1
+
+- name: Resolve a router inside one LogicNetwork
+  debug:
+    msg: "{{ lookup('ac_id', 'logicrouter', name='r1', filters={'logicNetworkId': logicnetwork_id}) }}"
+'''
+
+RETURN = '''
+_raw:
+    description: One id per term.
+    type: list
+    elements: str
+'''
+
+import sqlite3
+
+from ansible.errors import AnsibleError
+from ansible.plugins.lookup import LookupBase
+
+from ..module_utils.ac_cache import TTLCache
+from ..module_utils.ac_client import ACClientError, connect
+from ..module_utils.ac_resource import RESOURCES, ACResource, matches
+from ..module_utils.ac_snapshot import SnapshotStore, snapshot_path
+
+# Listings by (host, port, type), shared by every lookup of the process.
+_LISTINGS = TTLCache()
+
+
+class LookupModule(LookupBase):
+
+    def run(self, terms, variables=None, **kwargs):
+        self.set_options(var_options=variables, direct=kwargs)
+        _LISTINGS.maxsize = self.get_option('cache_size')
+        self._client = None
+        try:
+            return [self._resolve(term) for term in terms]
+        except ACClientError as e:
+            raise AnsibleError('AC lookup failed: %s' % e)
+        finally:
+            if self._client is not None:
+                self._client.close()
+
+    def _resolve(self, resource_type):
+        if resource_type not in RESOURCES:
+            raise AnsibleError('unknown AC object type %s' % resource_type)
+        name = self.get_option('name')
+        filters = self.get_option('filters')
+        found = [obj['id'] for obj in self._listing(resource_type)
+                 if obj.get('name') == name and matches(obj, filters)]
+        if not found:
+            raise AnsibleError('no %s named %s' % (resource_type, name))
+        if len(found) > 1:
+            raise AnsibleError('%d objects of type %s are named %s, narrow them down with filters'
+                               % (len(found), resource_type, name))
+        return found[0]
+
+    def _listing(self, resource_type):
+        key = (self.get_option('north_ip'), self.get_option('north_port'), resource_type)
+        objs = _LISTINGS.get(key)
+        if objs is None:
+            objs = self._snapshot_listing(resource_type)
+            if objs is None:
+                objs = ACResource(self._connect(), resource_type).list(page_size=self.get_option('page_size'))
+            _LISTINGS.put(key, objs, self.get_option('cache_ttl'))
+        return objs
+
+    def _snapshot_listing(self, resource_type):
+        max_age = self.get_option('snapshot_max_age')
+        if max_age is None:
+            return None
+        # A snapshot that cannot be read is skipped like a stale one.
+        try:
+            store = SnapshotStore.open_existing(snapshot_path(self.get_option('north_ip'),
+                                                              self.get_option('north_port')))
+            if store is None:
+                return None
+            try:
+                if store.fresh(resource_type, max_age):
+                    return store.list(resource_type)
+            finally:
+                store.close()
+        except sqlite3.Error:
+            pass
+        return None
+
+    def _connect(self):
+        if self._client is None:
+            self._client = connect(dict((option, self.get_option(option)) for option in
+                                        ('north_ip', 'north_port', 'token', 'username', 'password',
+                                         'validate_certs', 'timeout')))
+        return self._client
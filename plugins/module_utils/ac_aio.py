@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import asyncio
+import json
+import time
+
+from ansible.module_utils.six.moves.urllib.parse import urlencode
+
+from .ac_client import TOKEN_PATH, ACCircuitOpenError, ACClientError, decode_payload
+from .ac_retry import MAYBE_HANDLED, NOT_HANDLED, parse_retry_after
+from .ac_scheduler import DEFAULT_WORKERS, endpoint_class
+
+# Answers after which the other requests of the batch are not worth sending.
+FATAL_STATUSES = (401, 403)
+
+# Seconds between looks for a free slot; slots freed by other threads of
+# the process do not wake the loop.
+SLOT_POLL = 0.05
+
+
+class _Fatal(Exception):
+
+    def __init__(self, error):
+        super(_Fatal, self).__init__(str(error))
+        self.error = error
+
+
+class AsyncEngine:
+    """Sends many requests of one ``ACClient`` concurrently on an asyncio event loop.
+
+    Requests share a pool of keep-alive connections and, like the client
+    itself, its token, retry policy, circuit breaker, rate limiter and
+    concurrency control. Each endpoint class, e.g. ``POST ports``, has at
+    most ``per_endpoint`` requests in flight, fewer while its limiter in
+    the client's ``concurrency`` says so. When a request fails in a way
+    that dooms the others, such as a rejected token or an open circuit,
+    the requests still pending are cancelled.
+    """
+
+    def __init__(self, client, per_endpoint=DEFAULT_WORKERS):
+        self.client = client
+        self.per_endpoint = per_endpoint
+        self._semaphores = {}
+        self._idle = []
+        self._released = None
+
+    def _semaphore(self, method, path):
+        name = endpoint_class(method, path)
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.BoundedSemaphore(max(self.per_endpoint, 1))
+        return self._semaphores[name]
+
+    async def _slot(self, slots):
+        """Wait for a slot of an ``AIMDLimiter`` without blocking the loop; return its round."""
+        while True:
+            taken = slots.try_acquire()
+            if taken is not None:
+                return taken
+            self._released.clear()
+            try:
+                await asyncio.wait_for(self._released.wait(), SLOT_POLL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _connection(self, method, url):
+        if self._idle:
+            return self._idle.pop(), True
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.client.host, self.client.port, ssl=self.client._ssl_context),
+                self.client.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise ACClientError('%s %s failed: %s' % (method, url, str(e) or type(e).__name__))
+        return (reader, writer), False
+
+    def close(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+
+    async def _read_response(self, reader, method):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError('connection closed by the controller')
+        status = int(line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, value = line.decode('latin-1').split(':', 1)
+            headers[name.strip()] = value.strip()
+        fields = dict((k.lower(), v.lower()) for k, v in headers.items())
+        keep_alive = fields.get('connection') != 'close'
+        if method == 'HEAD' or status in (204, 304) or status < 200:
+            raw = b''
+        elif 'chunked' in fields.get('transfer-encoding', ''):
+            raw = b''
+            while True:
+                size = int(((await reader.readline()).split(b';')[0].strip()), 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                raw += await reader.readexactly(size)
+                await reader.readexactly(2)
+        elif 'content-length' in fields:
+            raw = await reader.readexactly(int(fields['content-length']))
+        else:
+            raw = await reader.read()
+            keep_alive = False
+        return status, headers, raw, keep_alive
+
+    async def _exchange(self, method, url, data):
+        # A pooled connection may have been closed while idle; such a
+        # failure is retried once on a fresh connection, as ACClient does.
+        while True:
+            (reader, writer), reused = await self._connection(method, url)
+            head = ['%s %s HTTP/1.1' % (method, url), 'Host: %s:%s' % (self.client.host, self.client.port)]
+            head.extend('%s: %s' % item for item in self.client.headers().items())
+            head.append('Content-Length: %d' % len(data or b''))
+            try:
+                writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + (data or b''))
+                await asyncio.wait_for(writer.drain(), self.client.timeout)
+                status, headers, raw, keep_alive = await asyncio.wait_for(self._read_response(reader, method),
+                                                                          self.client.timeout)
+            except (OSError, ValueError, IndexError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                writer.close()
+                if reused and not isinstance(e, asyncio.TimeoutError):
+                    continue
+                raise ACClientError('%s %s failed: %s' % (method, url, str(e) or type(e).__name__))
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, headers, decode_payload(raw)
+
+    async def _send_once(self, method, url, data):
+        client = self.client
+        loop = asyncio.get_event_loop()
+        while client.limiter is not None:
+            # A shared bucket is read and written under flock, off the loop.
+            wait = await loop.run_in_executor(None, client.limiter.take)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        if client.concurrency is None:
+            return await self._exchange(method, url, data)
+        slots = client.concurrency.limiter(method, url)
+        taken = await self._slot(slots)
+        started = time.time()
+        status = None
+        try:
+            status, headers, payload = await self._exchange(method, url, data)
+        finally:
+            slots.release(taken, time.time() - started, status is not None and status < 500 and status != 429)
+            self._released.set()
+        return status, headers, payload
+
+    async def _send_authorized(self, method, path, url, data):
+        client = self.client
+        loop = asyncio.get_event_loop()
+        managed = client.auth is not None and path != TOKEN_PATH
+        if managed:
+            # Logins block on the token cache lock, so they run off the loop.
+            client.token = await loop.run_in_executor(None, client.auth.token)
+        status, headers, payload = await self._send_once(method, url, data)
+        if status == 401 and managed:
+            rejected = client.token
+            client.token = await loop.run_in_executor(None, lambda: client.auth.refresh(rejected=rejected))
+            status, headers, payload = await self._send_once(method, url, data)
+        return status, headers, payload
+
+    async def request(self, method, path, body=None, query=None, allowed=None):
+        """Send one request like ``ACClient.request`` and return ``(status, data)``."""
+        client = self.client
+        url = '%s?%s' % (path, urlencode(query)) if query else path
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        attempt = 0
+        async with self._semaphore(method, path):
+            while True:
+                if not client.breaker.allow():
+                    raise ACCircuitOpenError('%s %s not sent: the controller failed %d requests in a row'
+                                             % (method, url, client.breaker.failures))
+                try:
+                    status, headers, payload = await self._send_authorized(method, path, url, data)
+                    error = None
+                except ACClientError as e:
+                    status, headers, payload, error = None, {}, None, e
+                if status is None or status >= 500 or status in NOT_HANDLED:
+                    client.breaker.failure()
+                else:
+                    client.breaker.success()
+                transient = status is None or status in NOT_HANDLED or status in MAYBE_HANDLED
+                if (not transient or attempt >= client.retry.retries
+                        or not client.retry.retryable(method, body, status)):
+                    break
+                retry_after = dict((k.lower(), v) for k, v in headers.items()).get('retry-after')
+                await asyncio.sleep(client.retry.delay(attempt, parse_retry_after(retry_after)))
+                attempt += 1
+        if method != 'GET' and client.memo is not None:
+            client.memo.invalidate(method, path)
+        if error is not None:
+            raise error
+        if status >= 400 and status not in (allowed or ()):
+            raise ACClientError('%s %s returned HTTP %s' % (method, path, status), status=status, body=payload)
+        return status, payload
+
+    async def _run_one(self, request, allowed):
+        try:
+            return await self.request(*request, allowed=allowed), None
+        except ACCircuitOpenError as e:
+            raise _Fatal(e)
+        except ACClientError as e:
+            if e.status in FATAL_STATUSES:
+                raise _Fatal(e)
+            return None, e
+
+    async def run(self, requests, allowed=None):
+        """Send all ``requests`` and return ``(result, error)`` pairs in their order."""
+        self._released = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._run_one(request, allowed)) for request in requests]
+        if not tasks:
+            return []
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    for other in pending:
+                        other.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    exc = task.exception()
+                    raise exc.error if isinstance(exc, _Fatal) else exc
+            return [task.result() for task in tasks]
+        finally:
+            self.close()
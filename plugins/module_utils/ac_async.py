@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from .ac_client import ACCircuitOpenError, ACClient, ACClientError
+from .ac_scheduler import DEFAULT_WORKERS, run_parallel
+
+try:
+    # The engine needs Python 3.5 or later; older interpreters use threads.
+    import asyncio
+    from .ac_aio import FATAL_STATUSES, AsyncEngine
+except (ImportError, SyntaxError):
+    AsyncEngine = None
+    FATAL_STATUSES = (401, 403)
+
+
+def run_requests(client, requests, workers=DEFAULT_WORKERS, allowed=None):
+    """Send ``(method, path, body, query)`` requests concurrently and return ``(result, error)`` pairs.
+
+    ``result`` is the ``(status, data)`` of ``client.request``. Requests of
+    a direct ``ACClient`` go through ``AsyncEngine`` with ``workers``
+    requests in flight per endpoint class; those over the C(httpapi)
+    connection, or on interpreters without asyncio, are sent by ``workers``
+    threads. Errors of single requests are returned, but an error that
+    dooms the remaining requests is raised.
+    """
+    requests = [tuple(request) + (None,) * (4 - len(request)) for request in requests]
+    if AsyncEngine is not None and isinstance(client, ACClient):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(AsyncEngine(client, workers).run(requests, allowed))
+        finally:
+            loop.close()
+    results = []
+    for dummy, result, error in run_parallel(lambda request: client.request(*request, allowed=allowed),
+                                             requests, workers):
+        if isinstance(error, ACCircuitOpenError) or getattr(error, 'status', None) in FATAL_STATUSES:
+            raise error
+        if error is not None and not isinstance(error, ACClientError):
+            raise error
+        results.append((result, error))
+    return results
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_TOKEN_TTL = 1800
+REFRESH_MARGIN = 300
+DEFAULT_CACHE_DIR = '~/.ansible/ac_tokens'
+
+
+def parse_expiry(token_info, ttl):
+    """Return the expiry of a login response as an epoch timestamp.
+
+    The controller reports ``expiredDate`` in its local time; when it is
+    missing, unreadable or already past (clock or time zone skew) the token
+    is assumed to live for ``ttl`` seconds.
+    """
+    now = time.time()
+    expired = token_info.get('expiredDate')
+    if expired:
+        try:
+            expires = time.mktime(time.strptime(expired, '%Y-%m-%d %H:%M:%S'))
+        except (TypeError, ValueError, OverflowError):
+            expires = None
+        if expires is not None and expires > now:
+            return min(expires, now + ttl)
+    return now + ttl
+
+
+def token_cache_path(host, port, username, cache_dir=None):
+    key = hashlib.sha256(('%s:%s:%s' % (host, port, username)).encode('utf-8')).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir or DEFAULT_CACHE_DIR), key[:32] + '.json')
+
+
+class TokenCache:
+    """Token and expiry of one controller account, kept in a private file.
+
+    The file is shared by every fork and every run on the host. Writers
+    replace it atomically, so readers never see a partial entry, and logins
+    are serialized with ``lock``.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _ensure_dir(self):
+        directory = os.path.dirname(self.path)
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+
+    @contextmanager
+    def lock(self):
+        self._ensure_dir()
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or 'token' not in entry or 'expires' not in entry:
+            return None
+        return entry
+
+    def save(self, entry):
+        self._ensure_dir()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), prefix='.token-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+            os.rename(tmp, self.path)
+        except Exception:
+            os.unlink(tmp)
+            raise
+
+    def clear(self):
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class TokenManager:
+    """Hands out a valid token, logging in only when needed.
+
+    A token is reused from memory or from ``cache`` while it has more than
+    ``refresh_margin`` seconds left, and replaced before it expires. Logins
+    happen under the cache lock: when several forks need a token at once,
+    one logs in and the others wait and pick up the token it stored.
+    """
+
+    def __init__(self, client, username, password, cache=None, ttl=DEFAULT_TOKEN_TTL,
+                 refresh_margin=REFRESH_MARGIN):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.cache = cache
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._entry = None
+        self._lock = threading.Lock()
+
+    @property
+    def expires(self):
+        return self._entry['expires'] if self._entry else None
+
+    def _fresh(self, entry):
+        return entry is not None and entry['expires'] - self.refresh_margin > time.time()
+
+    def token(self):
+        if self._fresh(self._entry):
+            return self._entry['token']
+        if self.cache is not None:
+            entry = self.cache.load()
+            if self._fresh(entry):
+                self._entry = entry
+                return entry['token']
+        return self.refresh()
+
+    def refresh(self, rejected=None):
+        """Return a new token, or one another process stored meanwhile.
+
+        ``rejected`` is a token the controller refused; it is never reused.
+        Threads of one process are serialized as well, so they share a
+        single login.
+        """
+        with self._lock:
+            if self._fresh(self._entry) and self._entry['token'] != rejected:
+                return self._entry['token']
+            if self.cache is None:
+                return self._login()
+            with self.cache.lock():
+                entry = self.cache.load()
+                if self._fresh(entry) and entry['token'] != rejected:
+                    self._entry = entry
+                    return entry['token']
+                return self._login()
+
+    def _login(self):
+        token_info = self.client.login(self.username, self.password)
+        self._entry = {'token': token_info['token_id'], 'expires': parse_expiry(token_info, self.ttl)}
+        if self.cache is not None:
+            self.cache.save(self._entry)
+        return self._entry['token']
+
+    def invalidate(self, token):
+        """Forget ``token``, e.g. after it was logged out."""
+        if self._entry is not None and self._entry['token'] == token:
+            self._entry = None
+        if self.cache is not None:
+            entry = self.cache.load()
+            if entry is not None and entry['token'] == token:
+                self.cache.clear()
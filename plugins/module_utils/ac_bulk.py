@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from .ac_client import ACClientError
+
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+
+# Rejections that say nothing about the items themselves; splitting the
+# chunk would only repeat the failure.
+_NOT_ITEM_ERRORS = (401, 403, 404, 405, 408, 413, 429)
+
+# Answer to creating an object that clashes with an existing one, by id or
+# by another unique field such as its name.
+CONFLICT = (409,)
+
+
+def chunks(objs, max_items, max_bytes, overhead=0):
+    """Split ``objs`` into lists of at most ``max_items`` objects.
+
+    A list is also closed before its JSON encoding, plus ``overhead`` bytes
+    for the wrapping body, would exceed ``max_bytes``. An object too large
+    on its own still gets a list of its own.
+    """
+    max_items = max(max_items, 1)
+    chunk = []
+    size = overhead
+    for obj in objs:
+        obj_size = len(json.dumps(obj)) + 2
+        if chunk and (len(chunk) >= max_items or size + obj_size > max_bytes):
+            yield chunk
+            chunk = []
+            size = overhead
+        chunk.append(obj)
+        size += obj_size
+    if chunk:
+        yield chunk
+
+
+class ObjectExists(ACClientError):
+    """Reported for an object refused with a conflict whose id the controller was found to have."""
+
+
+def is_conflict(error):
+    return getattr(error, 'status', None) in CONFLICT
+
+
+def already_exists(error):
+    return isinstance(error, ObjectExists)
+
+
+def object_exists(obj, error):
+    return ObjectExists('%s already exists' % obj.get('id'), status=error.status, body=error.body)
+
+
+def is_item_error(error):
+    return error.status is not None and 400 <= error.status < 500 and error.status not in _NOT_ITEM_ERRORS
+
+
+class BulkWriter:
+    """Writes objects through an array payload endpoint in chunks.
+
+    ``write`` sends one list of objects and raises ``ACClientError`` when the
+    controller rejects it. A chunk rejected because of its content is split
+    in half and retried until the offending objects are isolated, so one bad
+    item costs about log2(chunk size) extra requests instead of failing its
+    whole chunk.
+
+    A chunk rejected with a conflict is not split at once: ``existing``
+    returns the ids among a list of objects that the controller already
+    has, those objects are reported with an ``ObjectExists`` error, and the
+    others are sent again in one request. When none of the ids is taken the
+    conflict is about another field, and the chunk is split like any other
+    until the objects refused for it are reported with the controller's
+    error. Without ``existing`` a conflict is an error like any other.
+    """
+
+    def __init__(self, write, max_items=DEFAULT_CHUNK_SIZE, max_bytes=DEFAULT_CHUNK_BYTES, overhead=0,
+                 existing=None):
+        self.write = write
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.overhead = overhead
+        self.existing = existing
+        self.requests = 0
+
+    def run(self, objs, check_mode=False):
+        """Return one ``(obj, error)`` pair per object, in input order."""
+        results = []
+        for chunk in chunks(objs, self.max_items, self.max_bytes, self.overhead):
+            if check_mode:
+                results.extend((obj, None) for obj in chunk)
+            else:
+                results.extend(self._write(chunk))
+        return results
+
+    def _write(self, chunk):
+        """Return ``(obj, error)`` for each object of ``chunk``."""
+        self.requests += 1
+        try:
+            self.write(chunk)
+        except ACClientError as e:
+            if is_conflict(e) and self.existing is not None:
+                return self._resolve(chunk, e)
+            if len(chunk) > 1 and is_item_error(e):
+                middle = len(chunk) // 2
+                return self._write(chunk[:middle]) + self._write(chunk[middle:])
+            return [(obj, e) for obj in chunk]
+        return [(obj, None) for obj in chunk]
+
+    def _resolve(self, chunk, error):
+        """Report the objects of a chunk that already exist and send the others again."""
+        try:
+            found = self.existing(chunk)
+        except ACClientError as e:
+            return [(obj, e) for obj in chunk]
+        missing = [obj for obj in chunk if obj.get('id') not in found]
+        if len(missing) == len(chunk):
+            # The conflict is about something else than the ids.
+            if len(chunk) == 1:
+                return [(chunk[0], error)]
+            middle = len(chunk) // 2
+            return self._write(chunk[:middle]) + self._write(chunk[middle:])
+        written = iter(self._write(missing) if missing else [])
+        return [(obj, object_exists(obj, error)) if obj.get('id') in found else next(written) for obj in chunk]
@@ -0,0 +1,372 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import socket
+import ssl
+import time
+
+from ansible.module_utils._text import to_text
+from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.six.moves import http_client
+from ansible.module_utils.six.moves import queue
+from ansible.module_utils.six.moves.urllib.parse import urlencode
+
+from .ac_auth import TokenCache, TokenManager, token_cache_path
+from .ac_memo import RequestMemo
+from .ac_ratelimit import TokenBucket, bucket_path
+from .ac_scheduler import ConcurrencyControl
+from .ac_retry import (DEFAULT_RETRIES, DEFAULT_RETRY_MAX_DELAY, MAYBE_HANDLED, NOT_HANDLED, CircuitBreaker,
+                       RetryPolicy, parse_retry_after)
+
+TOKEN_PATH = '/controller/v2/tokens'
+DEFAULT_PORT = 18002
+
+
+def ac_argument_spec():
+    """Options shared by every module talking to the northbound API."""
+    return dict(
+        north_ip=dict(type='str'),
+        north_port=dict(type='int', default=DEFAULT_PORT),
+        token=dict(type='str', no_log=True, aliases=['token_id']),
+        username=dict(type='str', aliases=['userName']),
+        password=dict(type='str', no_log=True),
+        validate_certs=dict(type='bool', default=False),
+        timeout=dict(type='int', default=30),
+        pool_size=dict(type='int', default=4),
+        retries=dict(type='int', default=DEFAULT_RETRIES),
+        retry_max_delay=dict(type='int', default=DEFAULT_RETRY_MAX_DELAY),
+        rate_limit=dict(type='float'),
+        rate_burst=dict(type='int'),
+        adaptive_concurrency=dict(type='bool', default=True),
+        concurrency_limits=dict(type='dict', default={}),
+        token_cache=dict(type='bool', default=True),
+    )
+
+
+class ACClientError(Exception):
+    """Raised for transport failures and unexpected controller responses."""
+
+    def __init__(self, msg, status=None, body=None):
+        super(ACClientError, self).__init__(msg)
+        self.status = status
+        self.body = body
+
+
+class ACCircuitOpenError(ACClientError):
+    """Raised instead of sending a request while the controller keeps failing."""
+
+
+def decode_payload(raw):
+    """Return a response body as JSON, as text when it is not JSON, or None when empty."""
+    try:
+        return json.loads(raw.decode('utf-8')) if raw else None
+    except ValueError:
+        return raw.decode('utf-8', 'replace')
+
+
+class ACBaseClient:
+    """Request helpers shared by the direct and httpapi backed clients.
+
+    Subclasses implement ``send``, which returns ``(status, headers, data)``
+    without looking at the status code.
+    """
+
+    def send(self, method, path, body=None, query=None):
+        raise NotImplementedError
+
+    def endpoint(self):
+        """Return the ``(host, port)`` of the controller."""
+        raise NotImplementedError
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        """Send a request and return ``(status, data)``.
+
+        ``data`` is the decoded JSON body, or ``None`` for empty replies.
+        Statuses of 400 and above raise ``ACClientError`` unless listed in
+        ``allowed``.
+        """
+        status, dummy, payload = self.send(method, path, body, query)
+        if status >= 400 and status not in (allowed or ()):
+            raise ACClientError('%s %s returned HTTP %s' % (method, path, status),
+                                status=status, body=payload)
+        return status, payload
+
+    def close(self):
+        pass
+
+
+class ACClient(ACBaseClient):
+    """REST client for the NCE-Fabric northbound API.
+
+    Connections are kept alive and handed back to a small LIFO pool after
+    each request, so a module issuing many calls pays for the TCP and TLS
+    handshake once per pooled connection instead of once per call.
+
+    With ``auth`` set to a ``TokenManager`` the token is fetched from it
+    before each request, and a request answered with HTTP 401 is sent once
+    more with a new token.
+
+    Transient failures are retried as ``retry`` allows, and ``breaker``
+    stops all requests while the controller keeps failing. With ``limiter``
+    set to a ``TokenBucket`` every request waits for its turn first, and
+    with ``concurrency`` set to a ``ConcurrencyControl`` it also waits for
+    a free slot of its endpoint class.
+
+    With ``memo`` set to a ``RequestMemo``, identical GETs share one
+    request and their answers are reused until a write changes them.
+    """
+
+    def __init__(self, host, port=DEFAULT_PORT, token=None, validate_certs=False,
+                 timeout=30, pool_size=4, auth=None, retry=None, breaker=None, limiter=None,
+                 concurrency=None, memo=None):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.auth = auth
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.memo = memo
+        self.owns_token = False
+        self._ssl_context = self._make_ssl_context(validate_certs)
+        self._pool = queue.LifoQueue(maxsize=max(pool_size, 1))
+
+    def endpoint(self):
+        return self.host, self.port
+
+    @staticmethod
+    def _make_ssl_context(validate_certs):
+        context = ssl.create_default_context()
+        if not validate_certs:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def _acquire(self):
+        try:
+            return self._pool.get_nowait(), True
+        except queue.Empty:
+            conn = http_client.HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                               context=self._ssl_context)
+            return conn, False
+
+    def _release(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def headers(self):
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive',
+        }
+        if self.token:
+            headers['X-ACCESS-TOKEN'] = self.token
+        return headers
+
+    def _exchange(self, method, url, data):
+        # A pooled connection may have been closed by the controller while
+        # idle; that only shows up on the next use, so such a failure is
+        # retried once on a fresh connection.
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, url, body=data, headers=self.headers())
+                resp = conn.getresponse()
+                raw = resp.read()
+            except (http_client.HTTPException, socket.error) as e:
+                conn.close()
+                if reused and isinstance(e, (http_client.BadStatusLine, socket.error)):
+                    continue
+                raise ACClientError('%s %s failed: %s' % (method, url, e))
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return resp.status, dict(resp.getheaders()), raw
+
+    def _send_once(self, method, url, data):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        if self.concurrency is None:
+            status, headers, raw = self._exchange(method, url, data)
+        else:
+            slots = self.concurrency.limiter(method, url)
+            taken = slots.acquire()
+            started = time.time()
+            status = None
+            try:
+                status, headers, raw = self._exchange(method, url, data)
+            finally:
+                slots.release(taken, time.time() - started, status is not None and status < 500 and status != 429)
+        return status, headers, decode_payload(raw)
+
+    def _send_authorized(self, method, path, url, data):
+        managed = self.auth is not None and path != TOKEN_PATH
+        if managed:
+            self.token = self.auth.token()
+        status, headers, payload = self._send_once(method, url, data)
+        if status == 401 and managed:
+            self.token = self.auth.refresh(rejected=self.token)
+            status, headers, payload = self._send_once(method, url, data)
+        return status, headers, payload
+
+    def send(self, method, path, body=None, query=None):
+        if self.memo is None:
+            return self._send(method, path, body, query)
+        return self.memo.send(method, path, query, lambda: self._send(method, path, body, query))
+
+    def _send(self, method, path, body, query):
+        url = path
+        if query:
+            url = '%s?%s' % (path, urlencode(query))
+        data = json.dumps(body) if body is not None else None
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                raise ACCircuitOpenError('%s %s not sent: the controller failed %d requests in a row'
+                                         % (method, url, self.breaker.failures))
+            try:
+                status, headers, payload = self._send_authorized(method, path, url, data)
+                error = None
+            except ACClientError as e:
+                status, headers, payload, error = None, {}, None, e
+            if status is None or status >= 500 or status in NOT_HANDLED:
+                self.breaker.failure()
+            else:
+                self.breaker.success()
+            transient = status is None or status in NOT_HANDLED or status in MAYBE_HANDLED
+            if not transient or attempt >= self.retry.retries or not self.retry.retryable(method, body, status):
+                if error is not None:
+                    raise error
+                return status, headers, payload
+            retry_after = dict((k.lower(), v) for k, v in headers.items()).get('retry-after')
+            time.sleep(self.retry.delay(attempt, parse_retry_after(retry_after)))
+            attempt += 1
+
+    def login(self, username, password):
+        """Create a token with ``/controller/v2/tokens`` and use it from now on."""
+        dummy, data = self.request('POST', TOKEN_PATH, {'userName': username, 'password': password})
+        try:
+            token_info = data['data']
+            self.token = token_info['token_id']
+        except (KeyError, TypeError):
+            raise ACClientError('Unexpected login response from controller', body=data)
+        return token_info
+
+    def logout(self, token=None):
+        token = token or self.token
+        self.request('DELETE', TOKEN_PATH, {'token': token}, allowed=(401, 404))
+        if token == self.token:
+            self.token = None
+
+
+class ACConnectionClient(ACBaseClient):
+    """Client that sends requests through the C(httpapi) persistent connection.
+
+    The connection process owns the token and the keep-alive pool, so they
+    outlive the task and are shared by every task of the play.
+    """
+
+    owns_token = False
+
+    def __init__(self, socket_path):
+        self._connection = Connection(socket_path)
+        self._endpoint = None
+
+    def endpoint(self):
+        if self._endpoint is None:
+            try:
+                self._endpoint = (self._connection.get_option('host'),
+                                  self._connection.get_option('port') or DEFAULT_PORT)
+            except ConnectionError as e:
+                raise ACClientError('cannot read the connection options: %s' % to_text(e))
+        return self._endpoint
+
+    def send(self, method, path, body=None, query=None):
+        try:
+            status, headers, payload = self._connection.send_request(method, path, body, query)
+        except ConnectionError as e:
+            raise ACClientError('%s %s failed: %s' % (method, path, to_text(e)))
+        return status, headers, payload
+
+
+def connect(params):
+    """Return a direct client for the connection options in ``params``.
+
+    Without a token the client logs in with the user name and password,
+    sharing the cached token when ``token_cache`` is set.
+    """
+    if not params.get('north_ip'):
+        raise ACClientError('north_ip is required unless the httpapi connection is used')
+    client = ACClient(params['north_ip'], params.get('north_port') or DEFAULT_PORT, token=params.get('token'),
+                      validate_certs=params.get('validate_certs', False), timeout=params.get('timeout', 30),
+                      pool_size=params.get('pool_size', 4),
+                      retry=RetryPolicy(params.get('retries', DEFAULT_RETRIES),
+                                        params.get('retry_max_delay', DEFAULT_RETRY_MAX_DELAY)),
+                      memo=RequestMemo())
+    if params.get('adaptive_concurrency', True) or params.get('concurrency_limits'):
+        client.concurrency = ConcurrencyControl(params.get('concurrency_limits'),
+                                                adaptive=params.get('adaptive_concurrency', True))
+    if params.get('rate_limit'):
+        client.limiter = TokenBucket(params['rate_limit'], params.get('rate_burst'),
+                                     path=bucket_path(client.host, client.port))
+    if not client.token:
+        if not (params.get('username') and params.get('password')):
+            raise ACClientError('one of token or username/password is required')
+        cache = None
+        if params.get('token_cache', True):
+            cache = TokenCache(token_cache_path(client.host, client.port, params['username']))
+        client.auth = TokenManager(client, params['username'], params['password'], cache=cache)
+        # Cached tokens are left open for later tasks and runs to reuse.
+        client.owns_token = cache is None
+    return client
+
+
+def open_client(params, socket_path=None):
+    """Return an authenticated client.
+
+    Tasks running over the C(httpapi) connection reuse its session; other
+    tasks connect directly using the connection options in ``params``.
+    """
+    if socket_path:
+        return ACConnectionClient(socket_path)
+    return connect(params)
+
+
+def get_client(module):
+    """Return an authenticated client for the module."""
+    try:
+        return open_client(module.params, module._socket_path)
+    except ACClientError as e:
+        module.fail_json(msg=str(e))
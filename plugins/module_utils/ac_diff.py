@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import copy
+
+# Fields the controller or the modules maintain themselves; they never
+# make a difference between the desired and the current object.
+SERVER_FIELDS = frozenset(['id', 'additional', 'producer', 'createAt', 'updateAt'])
+
+
+class _Unset:
+    """Stands in for options the task did not set while building an object."""
+
+    def __repr__(self):
+        return 'UNSET'
+
+
+UNSET = _Unset()
+
+
+def _contains_unset(value):
+    if value is UNSET:
+        return True
+    if isinstance(value, dict):
+        return any(_contains_unset(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_contains_unset(v) for v in value)
+    return False
+
+
+def prune(obj):
+    """Drop server-managed fields and fields built from unset options."""
+    return dict((k, v) for k, v in obj.items() if k not in SERVER_FIELDS and not _contains_unset(v))
+
+
+def _scalar_equal(desired, current):
+    if desired in (None, '') and current in (None, ''):
+        return True
+    if isinstance(desired, bool) or isinstance(current, bool):
+        return desired is current or str(desired).lower() == str(current).lower()
+    return desired == current or str(desired) == str(current)
+
+
+def differences(desired, current, path=''):
+    """Return the paths of the fields of ``desired`` that ``current`` does not match.
+
+    Dicts are compared as subsets, so fields the controller adds are
+    ignored; lists match element by element.
+    """
+    if isinstance(desired, dict):
+        if not isinstance(current, dict):
+            return [path or '.']
+        found = []
+        for key, value in sorted(desired.items()):
+            found.extend(differences(value, current.get(key), '%s.%s' % (path, key) if path else key))
+        return found
+    if isinstance(desired, list):
+        if not isinstance(current, list) or len(desired) != len(current):
+            return [path]
+        found = []
+        for index, (d, c) in enumerate(zip(desired, current)):
+            found.extend(differences(d, c, '%s[%d]' % (path, index)))
+        return found
+    return [] if _scalar_equal(desired, current) else [path]
+
+
+def merge(current, desired):
+    """Return a copy of ``current`` with the fields of ``desired`` applied."""
+    merged = copy.deepcopy(current)
+    for key, value in desired.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sqlite3
+import time
+
+from .ac_async import run_requests
+from .ac_client import ac_argument_spec
+from .ac_resource import DEFAULT_PAGE_SIZE, ACResource
+from .ac_scheduler import DEFAULT_WORKERS, run_parallel
+from .ac_snapshot import SnapshotStore, snapshot_path, version
+from .ac_topology import parent_fields, parent_refs
+
+FACT_TYPES = ['tenant', 'logicnetwork', 'logicrouter', 'logicswitch', 'logicsubnet', 'logicinterface',
+              'logicport', 'endport']
+
+
+def facts_argument_spec():
+    spec = ac_argument_spec()
+    spec.update(
+        gather_subset=dict(type='list', elements='str', default=['all'], choices=['all'] + FACT_TYPES),
+        workers=dict(type='int', default=DEFAULT_WORKERS),
+        page_size=dict(type='int', default=DEFAULT_PAGE_SIZE),
+        snapshot=dict(type='bool', default=False),
+        sync=dict(type='str', default='full', choices=['full', 'delta']),
+    )
+    return spec
+
+
+def index(resource_type, objs):
+    """Index objects by id, by name and by the id of each parent.
+
+    Names and parents map to lists of ids; the parent indexes are named
+    after the field holding the parent id, e.g. ``by_logicSwitchId``.
+    """
+    indexed = dict(by_id={}, by_name={})
+    for field in parent_fields(resource_type):
+        indexed['by_' + field] = {}
+    for obj in objs:
+        indexed['by_id'][obj['id']] = obj
+        if obj.get('name'):
+            indexed['by_name'].setdefault(obj['name'], []).append(obj['id'])
+        for field, parent_id in parent_refs(resource_type, obj):
+            indexed['by_' + field].setdefault(parent_id, []).append(obj['id'])
+    return indexed
+
+
+def fetch(client, resource_types, workers=DEFAULT_WORKERS, page_size=DEFAULT_PAGE_SIZE):
+    """Read the collections of ``resource_types`` concurrently.
+
+    The first page of every collection is requested at once. The
+    ``totalNum`` of the first pages tells which pages remain, and those are
+    requested at once as well, rather than one after the other.
+    """
+    page_size = max(page_size, 1)
+    resources = dict((t, ACResource(client, t)) for t in resource_types)
+
+    def page(resource_type, index):
+        return ('GET', resources[resource_type].spec['path'], None, dict(pageIndex=index, pageSize=page_size))
+
+    pages = {}
+    remaining = []
+    replies = run_requests(client, [page(t, 1) for t in resource_types], workers)
+    for resource_type, (reply, error) in zip(resource_types, replies):
+        if error is not None:
+            raise error
+        data = reply[1]
+        found = resources[resource_type].unwrap(data)
+        pages[resource_type] = [found]
+        total = data.get('totalNum') if isinstance(data, dict) else None
+        if len(found) == page_size and total is not None:
+            remaining.extend((resource_type, index) for index in range(2, -(-int(total) // page_size) + 1))
+    replies = run_requests(client, [page(t, index) for t, index in remaining], workers)
+    for (resource_type, dummy), (reply, error) in zip(remaining, replies):
+        if error is not None:
+            raise error
+        pages[resource_type].append(resources[resource_type].unwrap(reply[1]))
+    return dict((t, [obj for found in pages[t] for obj in found]) for t in resource_types)
+
+
+def read_delta(client, resource_type, versions, page_size=DEFAULT_PAGE_SIZE):
+    """Read a collection and keep only what differs from ``versions``.
+
+    ``versions`` maps known ids to their ``version``, usually the
+    ``updateAt`` time. Returns the objects that are new or were updated
+    since, and the known ids that are gone. Unchanged objects are dropped
+    as the pages stream in.
+    """
+    changed = []
+    seen = set()
+    for obj in ACResource(client, resource_type).iter_list(page_size=page_size):
+        seen.add(obj['id'])
+        if versions.get(obj['id']) != version(obj):
+            changed.append(obj)
+    return changed, [obj_id for obj_id in versions if obj_id not in seen]
+
+
+def sync_delta(store, client, resource_types, workers=DEFAULT_WORKERS, page_size=DEFAULT_PAGE_SIZE):
+    """Bring the snapshot of ``resource_types`` up to date and return what changed."""
+    started = time.time()
+    versions = dict((t, store.versions(t) if store.synced_at(t) is not None else {}) for t in resource_types)
+    changes = {}
+    for resource_type, delta, error in run_parallel(lambda t: read_delta(client, t, versions[t], page_size),
+                                                    resource_types, workers):
+        if error is not None:
+            raise error
+        changed, removed = delta
+        store.apply(resource_type, changed, removed, started)
+        changes[resource_type] = dict(changed=[obj['id'] for obj in changed], removed=removed)
+    return changes
+
+
+def run_facts(params, client, check_mode=False):
+    """Gather the facts, or with ``sync=delta`` only refresh the snapshot and report the changes."""
+    subset = params['gather_subset']
+    resource_types = FACT_TYPES if 'all' in subset else [t for t in FACT_TYPES if t in subset]
+    result = dict(changed=False)
+    started = time.time()
+    objs = None
+    if params['sync'] == 'full':
+        objs = fetch(client, resource_types, params['workers'], params['page_size'])
+    if params['snapshot'] or params['sync'] == 'delta':
+        path = snapshot_path(*client.endpoint())
+        try:
+            store = SnapshotStore(path)
+            try:
+                if objs is None:
+                    result['changes'] = sync_delta(store, client, resource_types, params['workers'],
+                                                   params['page_size'])
+                else:
+                    for resource_type in resource_types:
+                        store.replace(resource_type, objs[resource_type], started)
+            finally:
+                store.close()
+        except (sqlite3.Error, OSError) as e:
+            return dict(failed=True, msg='cannot use the snapshot %s: %s' % (path, e))
+    if objs is not None:
+        facts = dict((resource_type, index(resource_type, objs[resource_type])) for resource_type in resource_types)
+        result['ansible_facts'] = dict(ac=facts)
+    return result
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+from .ac_bulk import BulkWriter, DEFAULT_CHUNK_BYTES, DEFAULT_CHUNK_SIZE, already_exists, chunks
+from .ac_client import ac_argument_spec
+from .ac_resource import ACResource, ACResourceError
+from .ac_scheduler import DEFAULT_WORKERS, TaskGraph, run_parallel
+from .ac_snapshot import record
+from .ac_validate import validate
+
+
+def _named(**extra):
+    spec = dict(name=dict(type='str', required=True), description=dict(type='str', default=''),
+                id=dict(type='str'))
+    spec.update(extra)
+    return spec
+
+
+def _children(options):
+    return dict(type='list', elements='dict', default=[], options=options)
+
+
+ENDPORT_SPEC = _named()
+PORT_SPEC = _named(device_ip=dict(type='str', required=True), port_name=dict(type='str', required=True),
+                   endports=_children(ENDPORT_SPEC))
+SWITCH_SPEC = _named(ports=_children(PORT_SPEC))
+SUBNET_SPEC = dict(cidr=dict(type='str', required=True), gateway_ip=dict(type='str', required=True),
+                   id=dict(type='str'))
+ROUTER_SPEC = _named(fabric_id=dict(type='str'), subnets=_children(SUBNET_SPEC))
+INTERFACE_SPEC = dict(name=dict(type='str', required=True), id=dict(type='str'),
+                      router=dict(type='str', required=True), switch=dict(type='str', required=True),
+                      subnet=dict(type='str', required=True))
+NETWORK_SPEC = _named(fabric_id=dict(type='str'), routers=_children(ROUTER_SPEC),
+                      switches=_children(SWITCH_SPEC), interfaces=_children(INTERFACE_SPEC))
+TENANT_SPEC = _named(fabric_id=dict(type='str'), networks=_children(NETWORK_SPEC))
+
+
+def intent_argument_spec():
+    spec = ac_argument_spec()
+    spec.update(
+        tenants=dict(type='list', elements='dict', required=True, options=TENANT_SPEC),
+        fabric_id=dict(type='str'),
+        workers=dict(type='int', default=DEFAULT_WORKERS),
+        chunk_size=dict(type='int', default=DEFAULT_CHUNK_SIZE),
+        chunk_bytes=dict(type='int', default=DEFAULT_CHUNK_BYTES),
+    )
+    return spec
+
+
+class IntentBuilder:
+    """Turns the nested intent into a ``TaskGraph`` of objects to create.
+
+    Node keys are ``type:path`` where the path joins the names from the
+    tenant down, e.g. ``logicswitch:t1/net1/web``. Ids are generated while
+    building, so child payloads carry their parents' ids from the start and
+    the graph only orders the requests.
+    """
+
+    def __init__(self, client, fabric_id=None):
+        self.client = client
+        self.fabric_id = fabric_id
+        self.graph = TaskGraph()
+        self._resources = {}
+
+    def resource(self, resource_type):
+        if resource_type not in self._resources:
+            self._resources[resource_type] = ACResource(self.client, resource_type)
+        return self._resources[resource_type]
+
+    def _add(self, resource_type, path, params, deps=()):
+        obj = self.resource(resource_type).build(params, create=True)
+        node = self.graph.add('%s:%s' % (resource_type, path), deps, type=resource_type,
+                              path=path, obj=obj)
+        return node
+
+    def build(self, tenants):
+        for tenant in tenants:
+            fabric_id = tenant['fabric_id'] or self.fabric_id
+            node = self._add('tenant', tenant['name'], dict(
+                tenant_id=tenant['id'], tenant_name=tenant['name'], tenant_desc=tenant['description'],
+                fabric_id=fabric_id))
+            for network in tenant['networks']:
+                self._network(network, node, fabric_id)
+        return self.graph
+
+    def _network(self, network, parent, fabric_id):
+        fabric_id = network['fabric_id'] or fabric_id
+        if not fabric_id:
+            raise ACResourceError('fabric_id is required for network %s' % network['name'])
+        path = '%s/%s' % (parent['path'], network['name'])
+        node = self._add('logicnetwork', path, dict(
+            logicnetwork_id=network['id'], logicnetwork_name=network['name'],
+            logicnetwork_desc=network['description'], tenant_id=parent['obj']['id'],
+            fabric_id=fabric_id), [parent['key']])
+        routers = {}
+        subnets = {}
+        switches = {}
+        for router in network['routers']:
+            routers[router['name']] = self._router(router, node, router['fabric_id'] or fabric_id, subnets)
+        for switch in network['switches']:
+            switches[switch['name']] = self._switch(switch, node)
+        for interface in network['interfaces']:
+            self._interface(interface, node, routers, switches, subnets)
+
+    def _router(self, router, parent, fabric_id, subnets):
+        path = '%s/%s' % (parent['path'], router['name'])
+        node = self._add('logicrouter', path, dict(
+            logicrouter_id=router['id'], logicrouter_name=router['name'],
+            logicrouter_desc=router['description'], logicnetwork_id=parent['obj']['id'],
+            fabric_id=fabric_id), [parent['key']])
+        for subnet in router['subnets']:
+            subnets[(router['name'], subnet['cidr'])] = self._add('logicsubnet', '%s/%s' % (path, subnet['cidr']), dict(
+                logicsubnet_id=subnet['id'], logicrouter_id=node['obj']['id'], cidr=subnet['cidr'],
+                gateway_ip=subnet['gateway_ip']), [node['key']])
+        return node
+
+    def _switch(self, switch, parent):
+        path = '%s/%s' % (parent['path'], switch['name'])
+        node = self._add('logicswitch', path, dict(
+            logicswitch_id=switch['id'], logicswitch_name=switch['name'],
+            logicswitch_desc=switch['description'], logicnetwork_id=parent['obj']['id']), [parent['key']])
+        for port in switch['ports']:
+            port_path = '%s/%s' % (path, port['name'])
+            port_node = self._add('logicport', port_path, dict(
+                logicport_id=port['id'], logicport_name=port['name'], logicport_desc=port['description'],
+                logicswitch_id=node['obj']['id'], device_ip=port['device_ip'], port_name=port['port_name']),
+                [node['key']])
+            for endport in port['endports']:
+                self._add('endport', '%s/%s' % (port_path, endport['name']), dict(
+                    endport_id=endport['id'], endport_name=endport['name'], endport_desc=endport['description'],
+                    logicnetwork_id=parent['obj']['id'], logicport_id=port_node['obj']['id']),
+                    [port_node['key'], parent['key']])
+        return node
+
+    def _interface(self, interface, parent, routers, switches, subnets):
+        router = routers.get(interface['router'])
+        switch = switches.get(interface['switch'])
+        subnet = subnets.get((interface['router'], interface['subnet']))
+        if router is None or switch is None or subnet is None:
+            raise ACResourceError('interface %s refers to an unknown router, switch or subnet in network %s'
+                                  % (interface['name'], parent['path']))
+        self._add('logicinterface', '%s/%s' % (parent['path'], interface['name']), dict(
+            logicinterface_id=interface['id'], logicinterface_name=interface['name'],
+            logicrouter_id=router['obj']['id'], logicswitch_id=switch['obj']['id'],
+            logicsubnet_id=subnet['obj']['id']), [router['key'], switch['key'], subnet['key']])
+
+
+def _batches(builder, nodes, chunk_size, chunk_bytes):
+    """Group the nodes of one level into requests: chunks for array payloads, single objects otherwise."""
+    by_type = {}
+    for node in nodes:
+        by_type.setdefault(node['type'], []).append(node)
+    batches = []
+    for resource_type, typed in sorted(by_type.items()):
+        resource = builder.resource(resource_type)
+        if resource.spec['array']:
+            overhead = len(json.dumps(resource.wrap([])))
+            start = 0
+            for chunk in chunks([node['obj'] for node in typed], chunk_size, chunk_bytes, overhead):
+                batches.append((resource, typed[start:start + len(chunk)]))
+                start += len(chunk)
+        else:
+            batches.extend((resource, [node]) for node in typed)
+    return batches
+
+
+def run_intent(params, client, check_mode=False):
+    """Create the whole intent level by level and return the module result."""
+    builder = IntentBuilder(client, params['fabric_id'])
+    graph = builder.build(params['tenants'])
+    problems = []
+    for node in graph.nodes.values():
+        problems.extend('%s %s: %s' % (node['type'], node['path'], problem)
+                        for problem in validate(node['type'], node['obj']))
+    if problems:
+        raise ACResourceError('invalid intent: %s' % '; '.join(problems))
+    status = {}
+
+    def send(batch):
+        resource, nodes = batch
+        writer = BulkWriter(resource.create, params['chunk_size'], params['chunk_bytes'],
+                            existing=resource.existing_ids)
+        return writer.run([node['obj'] for node in nodes], check_mode)
+
+    for level in graph.levels():
+        ready = []
+        for node in level:
+            # A parent is only reported as existing once its id was found on the
+            # controller, so a parent refused for another conflict skips its subtree.
+            if all(status[dep]['status'] in ('created', 'exists') for dep in node['deps']):
+                ready.append(node)
+            else:
+                status[node['key']] = dict(status='skipped', msg='a parent object was not created')
+        batches = _batches(builder, ready, params['chunk_size'], params['chunk_bytes'])
+        for batch, written, error in run_parallel(send, batches, params['workers']):
+            for index, node in enumerate(batch[1]):
+                obj_error = error if error is not None else written[index][1]
+                if obj_error is None:
+                    status[node['key']] = dict(status='created')
+                elif already_exists(obj_error):
+                    status[node['key']] = dict(status='exists')
+                else:
+                    status[node['key']] = dict(status='failed', msg=str(obj_error))
+
+    results = []
+    ids = {}
+    for node in graph.nodes.values():
+        item = dict(type=node['type'], path=node['path'], id=node['obj']['id'])
+        item.update(status[node['key']])
+        results.append(item)
+        if item['status'] in ('created', 'exists'):
+            ids.setdefault(node['type'], {})[node['path']] = node['obj']['id']
+    if not check_mode:
+        record(client, written=[(node['type'], node['obj']) for node in graph.nodes.values()
+                                if status[node['key']]['status'] == 'created'])
+    failed = [r for r in results if r['status'] not in ('created', 'exists')]
+    result = dict(changed=any(r['status'] == 'created' for r in results), results=results, ids=ids)
+    if failed:
+        result.update(failed=True, msg='%d of %d objects were not created' % (len(failed), len(results)))
+    return result
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import copy
+import threading
+
+from .ac_cache import TTLCache
+from .ac_scheduler import collection_path
+
+DEFAULT_MEMO_SIZE = 256
+DEFAULT_MEMO_TTL = 60
+
+# Answers worth remembering: the object or listing, or that it is missing.
+MEMO_STATUSES = (200, 404)
+
+
+def request_key(path, query=None):
+    """Return the memo key of a GET, its collection, path and sorted query."""
+    return collection_path(path), path, tuple(sorted((query or {}).items()))
+
+
+class _Flight:
+    """One GET being sent, which identical GETs wait for instead of sending their own."""
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.answer = None
+        self.error = None
+
+
+class RequestMemo:
+    """Sends each distinct GET once and remembers the answer for ``ttl`` seconds.
+
+    A GET asked for while an identical one is on its way waits for that
+    answer instead of sending its own ("single flight"). Answers are kept
+    in a ``TTLCache`` and every caller gets its own copy, so callers can
+    change what they got.
+
+    Writes forget what was remembered: creates and updates the answers of
+    their collection, deletes all answers, as the controller may remove
+    objects below the deleted one as well. An answer that was on its way
+    while something was written is handed to its waiters but not kept.
+    """
+
+    def __init__(self, ttl=DEFAULT_MEMO_TTL, maxsize=DEFAULT_MEMO_SIZE):
+        self._answers = TTLCache(maxsize, ttl)
+        self._flights = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def send(self, method, path, query, sender):
+        """Return the ``(status, headers, data)`` of ``sender()``, or the answer of an identical GET."""
+        if method != 'GET':
+            try:
+                return sender()
+            finally:
+                self.invalidate(method, path)
+        key = request_key(path, query)
+        answer = self._answers.get(key)
+        if answer is not None:
+            return copy.deepcopy(answer)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(self._generation)
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.answer)
+        try:
+            answer = sender()
+            flight.answer = copy.deepcopy(answer)
+            return answer
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if (flight.error is None and flight.answer[0] in MEMO_STATUSES
+                        and flight.generation == self._generation):
+                    self._answers.put(key, flight.answer)
+            flight.done.set()
+
+    def invalidate(self, method, path):
+        """Forget the answers a ``method`` request to ``path`` may have changed."""
+        collection = collection_path(path)
+        with self._lock:
+            self._generation += 1
+            if method == 'DELETE':
+                self._flights.clear()
+                self._answers.clear()
+                return
+            for key in [key for key in self._flights if key[0] == collection]:
+                del self._flights[key]
+            self._answers.discard_matching(lambda key: key[0] == collection)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._flights.clear()
+            self._answers.clear()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import os
+import threading
+import time
+
+DEFAULT_LIMIT_DIR = '~/.ansible/ac_limits'
+
+
+def bucket_path(host, port, cache_dir=None):
+    key = hashlib.sha256(('%s:%s' % (host, port)).encode('utf-8')).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir or DEFAULT_LIMIT_DIR), key[:32] + '.bucket')
+
+
+class TokenBucket:
+    """Lets requests through at ``rate`` per second on average, in bursts of up to ``burst``.
+
+    The bucket is shared by the threads of one process. With ``path`` its
+    state lives in a small file read and written under ``flock``, so every
+    fork on the host draws from the same bucket.
+    """
+
+    def __init__(self, rate, burst=None, path=None):
+        self.rate = float(rate)
+        self.burst = max(burst or int(self.rate), 1)
+        self.path = path
+        self._state = [float(self.burst), time.time()]
+        self._lock = threading.Lock()
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory and not os.path.isdir(directory):
+                try:
+                    os.makedirs(directory, 0o700)
+                except OSError:
+                    if not os.path.isdir(directory):
+                        raise
+
+    def acquire(self):
+        """Wait until a request may be sent."""
+        while True:
+            wait = self.take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def take(self):
+        """Take a token when there is one; otherwise return the seconds until the next one."""
+        with self._lock:
+            if self.path is None:
+                return self._take_from(self._state)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                state = self._read(fd)
+                wait = self._take_from(state)
+                os.lseek(fd, 0, os.SEEK_SET)
+                os.ftruncate(fd, 0)
+                os.write(fd, ('%r %r' % tuple(state)).encode('ascii'))
+                return wait
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
+
+    def _read(self, fd):
+        try:
+            tokens, stamp = os.read(fd, 64).decode('ascii').split()
+            return [min(float(tokens), self.burst), float(stamp)]
+        except ValueError:
+            # A new or unreadable file starts as a full bucket.
+            return [float(self.burst), time.time()]
+
+    def _take_from(self, state):
+        """Take one token from ``[tokens, stamp]``; return how long to wait when there is none."""
+        now = time.time()
+        tokens = min(self.burst, state[0] + max(now - state[1], 0) * self.rate)
+        if tokens >= 1:
+            state[:] = [tokens - 1, now]
+            return 0
+        state[:] = [tokens, now]
+        return (1 - tokens) / self.rate
@@ -0,0 +1,841 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import sqlite3
+import time
+import uuid
+from itertools import islice
+
+from .ac_async import run_requests
+from .ac_bulk import BulkWriter, DEFAULT_CHUNK_BYTES, DEFAULT_CHUNK_SIZE, already_exists, is_conflict, object_exists
+from .ac_client import ACClientError, ac_argument_spec, get_client
+from .ac_diff import UNSET, differences, merge, prune
+from .ac_scheduler import DEFAULT_WORKERS, run_parallel
+from .ac_snapshot import open_snapshot, record
+from .ac_topology import delete_graph, descendant_types, parent_fields
+from .ac_validate import validate
+
+LOGICNETWORK = '/controller/dc/v3/logicnetwork'
+# Namespace of the ids derived from the natural key of new objects.
+ID_NAMESPACE = uuid.UUID('2dfc2462-776a-5b0e-9215-f522d0f02a68')
+DEFAULT_PAGE_SIZE = 1000
+
+
+class ACResourceError(Exception):
+    """Raised for parameters that cannot be turned into a request."""
+
+
+def _now():
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _additional(create):
+    now = _now()
+    if create:
+        return {'producer': 'default', 'createAt': now, 'updateAt': now}
+    return {'updateAt': now}
+
+
+def _describe(obj, description, create):
+    """Add the description; an unset one is sent empty on create and left out of updates."""
+    if description is None and create:
+        description = ''
+    if description is not None:
+        obj['description'] = description
+    return obj
+
+
+def _build_tenant(p, create):
+    obj = _describe({'id': p['tenant_id'], 'name': p['tenant_name']}, p['tenant_desc'], create)
+    if create:
+        now = _now()
+        obj.update(producer='default', createAt=now, updateAt=now,
+                   resPool={'fabricIds': [p['fabric_id']] if p['fabric_id'] else []})
+    else:
+        obj['updateAt'] = _now()
+    return obj
+
+
+def _build_logicnetwork(p, create):
+    obj = _describe({'id': p['logicnetwork_id'], 'name': p['logicnetwork_name'], 'additional': _additional(create)},
+                    p['logicnetwork_desc'], create)
+    if create:
+        obj.update(tenantId=p['tenant_id'], fabricId=[p['fabric_id']])
+    return obj
+
+
+def _build_logicrouter(p, create):
+    obj = _describe({'id': p['logicrouter_id'], 'name': p['logicrouter_name'], 'additional': _additional(create)},
+                    p['logicrouter_desc'], create)
+    if create:
+        obj.update(logicNetworkId=p['logicnetwork_id'], type='Normal',
+                   routerLocations=[{'fabricId': p['fabric_id'], 'fabricRole': 'master'}])
+    return obj
+
+
+def _build_logicswitch(p, create):
+    return _describe({'id': p['logicswitch_id'], 'name': p['logicswitch_name'],
+                      'logicNetworkId': p['logicnetwork_id'] or '', 'additional': _additional(create)},
+                     p['logicswitch_desc'], create)
+
+
+def _build_logicsubnet(p, create):
+    obj = {'id': p['logicsubnet_id'], 'cidr': p['cidr'], 'gatewayIp': p['gateway_ip'],
+           'additional': _additional(create)}
+    if create:
+        obj['logicRouterId'] = p['logicrouter_id']
+    return obj
+
+
+def _build_logicinterface(p, create):
+    return {'id': p['logicinterface_id'], 'name': p['logicinterface_name'],
+            'interfaceType': 'RouterInterface', 'logicRouterId': p['logicrouter_id'],
+            'logicSwitchId': p['logicswitch_id'], 'ip': {'subnetId': p['logicsubnet_id']},
+            'additional': _additional(create)}
+
+
+def _build_logicport(p, create):
+    obj = _describe({'id': p['logicport_id'], 'name': p['logicport_name'], 'logicSwitchId': p['logicswitch_id'],
+                     'accessInfo': {'mode': 'UNI', 'type': 'UNTAG',
+                                    'location': [{'deviceIp': p['device_ip'], 'portName': p['port_name']}]},
+                     'additional': _additional(create)},
+                    p['logicport_desc'], create)
+    if not create:
+        obj['fabricId'] = p['fabric_id']
+    return obj
+
+
+def _build_endport(p, create):
+    obj = _describe({'id': p['endport_id'], 'name': p['endport_name']}, p['endport_desc'], create)
+    if create:
+        obj.update(logicNetworkId=p['logicnetwork_id'], logicPortId=p['logicport_id'])
+    else:
+        obj['additional'] = _additional(create)
+    return obj
+
+
+# Per resource type: REST paths, the key wrapping objects in request and
+# response bodies, whether that key holds a list, the module options and the
+# options required for each operation. Every type accepts an ``items``
+# option creating many objects; types whose key holds a list send them with
+# one request per chunk, the others with concurrent single requests.
+# ``cascade`` types can be deleted together with everything below them.
+# ``filters`` lists the query parameters the controller filters on itself.
+# ``identity`` lists the fields that find an existing object without its id.
+# ``update_keep`` lists the fields a partial update always carries, and
+# ``full_update`` marks types whose updates must hold the whole object.
+RESOURCES = {
+    'tenant': dict(
+        path='/controller/dc/v3/tenants',
+        item_path='/controller/dc/v3/tenants/tenant/%s',
+        key='tenant', array=True, build=_build_tenant, cascade=True,
+        filters=['name'],
+        identity=['name'],
+        update_keep=['name'],
+        options=dict(tenant_id=dict(type='str'), tenant_name=dict(type='str'),
+                     tenant_desc=dict(type='str'), fabric_id=dict(type='str')),
+        required=dict(create=['tenant_name'], update=['tenant_id', 'tenant_name']),
+    ),
+    'logicnetwork': dict(
+        path=LOGICNETWORK + '/networks',
+        item_path=LOGICNETWORK + '/networks/network/%s',
+        key='network', array=False, build=_build_logicnetwork, cascade=True,
+        filters=['tenantId', 'name'],
+        identity=['name', 'tenantId'],
+        update_keep=['name'],
+        options=dict(logicnetwork_id=dict(type='str'), logicnetwork_name=dict(type='str'),
+                     logicnetwork_desc=dict(type='str'), fabric_id=dict(type='str'),
+                     tenant_id=dict(type='str')),
+        required=dict(create=['logicnetwork_name', 'tenant_id', 'fabric_id'],
+                      update=['logicnetwork_id', 'logicnetwork_name']),
+    ),
+    'logicrouter': dict(
+        path=LOGICNETWORK + '/routers',
+        item_path=LOGICNETWORK + '/routers/router/%s',
+        key='router', array=False, build=_build_logicrouter,
+        filters=['logicNetworkId', 'name'],
+        identity=['name', 'logicNetworkId'],
+        update_keep=['name'],
+        options=dict(logicrouter_id=dict(type='str'), logicrouter_name=dict(type='str'),
+                     logicrouter_desc=dict(type='str'), fabric_id=dict(type='str'),
+                     logicnetwork_id=dict(type='str')),
+        required=dict(create=['logicrouter_name', 'logicnetwork_id', 'fabric_id'],
+                      update=['logicrouter_id', 'logicrouter_name']),
+    ),
+    'logicswitch': dict(
+        path=LOGICNETWORK + '/switchs',
+        item_path=LOGICNETWORK + '/switchs/switch/%s',
+        key='switch', array=True, build=_build_logicswitch,
+        filters=['logicNetworkId', 'name'],
+        identity=['name', 'logicNetworkId'],
+        update_keep=['name'],
+        options=dict(logicswitch_id=dict(type='str'), logicswitch_name=dict(type='str'),
+                     logicswitch_desc=dict(type='str'), logicnetwork_id=dict(type='str')),
+        required=dict(create=['logicswitch_name', 'logicnetwork_id'],
+                      update=['logicswitch_id', 'logicswitch_name']),
+    ),
+    'logicsubnet': dict(
+        path=LOGICNETWORK + '/subnets',
+        item_path=LOGICNETWORK + '/subnets/subnet/%s',
+        key='subnet', array=True, build=_build_logicsubnet,
+        filters=['logicRouterId'],
+        identity=['cidr', 'logicRouterId'],
+        update_keep=['cidr', 'gatewayIp'],
+        options=dict(logicsubnet_id=dict(type='str'), logicrouter_id=dict(type='str'),
+                     cidr=dict(type='str'), gateway_ip=dict(type='str')),
+        required=dict(create=['logicrouter_id', 'cidr', 'gateway_ip'],
+                      update=['logicsubnet_id', 'cidr', 'gateway_ip']),
+    ),
+    'logicinterface': dict(
+        path=LOGICNETWORK + '/interfaces',
+        item_path=LOGICNETWORK + '/interfaces/interface/%s',
+        key='interface', array=True, build=_build_logicinterface,
+        filters=['logicRouterId', 'logicSwitchId', 'name'],
+        identity=['name', 'logicRouterId'],
+        options=dict(logicinterface_id=dict(type='str'), logicinterface_name=dict(type='str'),
+                     logicrouter_id=dict(type='str'), logicswitch_id=dict(type='str'),
+                     logicsubnet_id=dict(type='str')),
+        required=dict(create=['logicinterface_name', 'logicrouter_id', 'logicswitch_id',
+                              'logicsubnet_id']),
+    ),
+    'logicport': dict(
+        path=LOGICNETWORK + '/ports',
+        item_path=LOGICNETWORK + '/ports/port/%s',
+        key='port', array=True, build=_build_logicport, items_aliases=['ports'],
+        filters=['logicSwitchId', 'name'],
+        identity=['name', 'logicSwitchId'],
+        full_update=True,
+        options=dict(logicport_id=dict(type='str'), logicport_name=dict(type='str'),
+                     logicport_desc=dict(type='str'), fabric_id=dict(type='str'),
+                     logicswitch_id=dict(type='str'), device_ip=dict(type='str'),
+                     port_name=dict(type='str')),
+        required=dict(create=['logicport_name', 'logicswitch_id', 'device_ip', 'port_name'],
+                      update=['logicport_id', 'logicswitch_id', 'fabric_id', 'logicport_name',
+                              'device_ip', 'port_name']),
+    ),
+    'endport': dict(
+        path=LOGICNETWORK + '/endports',
+        item_path=LOGICNETWORK + '/endports/endport/%s',
+        key='endPort', array=False, build=_build_endport,
+        filters=['logicNetworkId', 'logicPortId', 'name'],
+        identity=['name', 'logicPortId'],
+        update_keep=['name'],
+        options=dict(endport_id=dict(type='str'), endport_name=dict(type='str'),
+                     endport_desc=dict(type='str'), logicnetwork_id=dict(type='str'),
+                     logicport_id=dict(type='str')),
+        required=dict(create=['endport_name', 'logicnetwork_id', 'logicport_id'],
+                      update=['endport_id', 'endport_name']),
+    ),
+}
+
+
+def id_option(resource_type):
+    return '%s_id' % resource_type
+
+
+def operations(resource_type):
+    ops = ['create', 'query', 'delete']
+    if 'update' in RESOURCES[resource_type]['required']:
+        ops.insert(1, 'update')
+    return ops
+
+
+def resource_argument_spec(resource_type):
+    resource = RESOURCES[resource_type]
+    spec = ac_argument_spec()
+    spec.update(resource['options'])
+    spec['operation'] = dict(type='str', default='query', choices=operations(resource_type))
+    spec['state'] = dict(type='str', choices=['present', 'absent'])
+    if 'update' in resource['required']:
+        spec['update_mode'] = dict(type='str', default='full', choices=['full', 'minimal'])
+    spec['page_size'] = dict(type='int', default=DEFAULT_PAGE_SIZE)
+    spec['limit'] = dict(type='int')
+    spec['filters'] = dict(type='dict', default={})
+    spec['fields'] = dict(type='list', elements='str')
+    spec['snapshot_max_age'] = dict(type='int')
+    # Items fall back to the top-level options, so they carry no defaults.
+    item_options = dict((name, dict((k, v) for k, v in option.items() if k != 'default'))
+                        for name, option in resource['options'].items())
+    spec['items'] = dict(type='list', elements='dict', options=item_options,
+                         aliases=resource.get('items_aliases', []))
+    if resource['array']:
+        spec['chunk_size'] = dict(type='int', default=DEFAULT_CHUNK_SIZE)
+        spec['chunk_bytes'] = dict(type='int', default=DEFAULT_CHUNK_BYTES)
+    if resource.get('cascade'):
+        spec['cascade'] = dict(type='bool', default=False)
+    if resource.get('cascade') or not resource['array']:
+        spec['workers'] = dict(type='int', default=DEFAULT_WORKERS)
+    return spec
+
+
+def resource_required_if(resource_type):
+    # Creates, which may take their fields from items, and minimal updates
+    # check their fields in run_resource.
+    resource = RESOURCES[resource_type]
+    rules = [('operation', op, fields) for op, fields in sorted(resource['required'].items())
+             if op not in ('create', 'update')]
+    if 'update' in resource['required']:
+        rules.append(('operation', 'update', [id_option(resource_type)]))
+    rules.append(('operation', 'delete', [id_option(resource_type)]))
+    return rules
+
+
+def merge_item(resource_type, params, item):
+    """Return ``params`` overridden by the values set in one bulk item.
+
+    The object id is never inherited, so items without one get their own.
+    """
+    merged = dict(params)
+    merged[id_option(resource_type)] = None
+    merged.update((k, v) for k, v in item.items() if v is not None)
+    return merged
+
+
+def split_filters(resource_type, filters):
+    """Split query filters into those the controller applies and the rest."""
+    server = dict((k, v) for k, v in filters.items() if k in RESOURCES[resource_type]['filters'])
+    local = dict((k, v) for k, v in filters.items() if k not in server)
+    return server, local
+
+
+def _matches(value, wanted):
+    if isinstance(value, list):
+        return any(_matches(v, wanted) for v in value)
+    if isinstance(value, bool) or isinstance(wanted, bool):
+        return str(value).lower() == str(wanted).lower()
+    return value is not None and str(value) == str(wanted)
+
+
+def matches(obj, filters):
+    """Whether ``obj`` has every ``filters`` field set to the given value.
+
+    A list field matches when one of its values does, e.g. ``fabricId``.
+    """
+    return all(_matches(obj.get(k), v) for k, v in filters.items())
+
+
+def project(obj, fields):
+    if not fields:
+        return obj
+    return dict((k, obj[k]) for k in fields if k in obj)
+
+
+def _item_result(obj, error):
+    item = dict(id=obj['id'], status='created')
+    if 'name' in obj:
+        item['name'] = obj['name']
+    if already_exists(error):
+        item['status'] = 'exists'
+    elif isinstance(error, ACClientError):
+        item.update(status='failed', msg=str(error), body=error.body)
+    elif error is not None:
+        item.update(status='failed', msg=str(error))
+    return item
+
+
+def natural_id(resource_type, obj):
+    """Return a uuid5 of the type and identity fields of a new object.
+
+    Building the same object again gives the same id, so a create can be
+    repeated without checking first. Objects lacking an identity field get
+    a random id.
+    """
+    values = [obj.get(field) for field in RESOURCES[resource_type]['identity']]
+    if any(value in (None, '') for value in values):
+        return str(uuid.uuid4())
+    return str(uuid.uuid5(ID_NAMESPACE, '/'.join([resource_type] + [str(value) for value in values])))
+
+
+def missing_required(resource_type, operation, params):
+    return [f for f in RESOURCES[resource_type]['required'].get(operation, []) if params.get(f) in (None, '')]
+
+
+def check_required(resource_type, operation, params):
+    missing = missing_required(resource_type, operation, params)
+    if missing:
+        raise ACResourceError('missing required arguments: %s' % ', '.join(missing))
+
+
+def check_valid(resource_type, obj):
+    """Raise for values the controller would reject, before any request is made."""
+    problems = validate(resource_type, obj)
+    if problems:
+        raise ACResourceError('invalid %s: %s' % (resource_type, '; '.join(problems)))
+
+
+class ACResource:
+    """CRUD helper for one resource type of the northbound API."""
+
+    def __init__(self, client, resource_type):
+        self.client = client
+        self.resource_type = resource_type
+        self.spec = RESOURCES[resource_type]
+
+    @property
+    def key(self):
+        return self.spec['key']
+
+    def build(self, params, create):
+        obj = self.spec['build'](params, create)
+        if create and not obj.get('id'):
+            obj['id'] = natural_id(self.resource_type, obj)
+        return obj
+
+    def wrap(self, objs):
+        if self.spec['array']:
+            return {self.key: list(objs)}
+        return {self.key: objs[0]}
+
+    def unwrap(self, data):
+        if not isinstance(data, dict):
+            return []
+        found = data.get(self.key) or []
+        if isinstance(found, dict):
+            return [found]
+        return found
+
+    def create(self, objs):
+        self.client.request('POST', self.spec['path'], self.wrap(objs))
+
+    def ensure_created(self, obj):
+        """Create one object; return False when its id already exists.
+
+        A conflict is only taken for an existing object once the controller
+        is found to have its id; any other conflict is raised.
+        """
+        try:
+            self.create([obj])
+        except ACClientError as e:
+            if is_conflict(e) and self.existing_ids([obj]):
+                return False
+            raise
+        return True
+
+    def existing_ids(self, objs):
+        """Return the ids among ``objs`` that the controller already has.
+
+        The collection is listed once, narrowed to the parents all objects
+        share where the controller filters on them, and the listing stops
+        once every id was seen. A single object is looked up by its id.
+        """
+        if len(objs) == 1:
+            return set([objs[0]['id']]) if self.get(objs[0]['id']) is not None else set()
+        wanted = set(obj.get('id') for obj in objs)
+        query = {}
+        for field in parent_fields(self.resource_type):
+            values = set(obj.get(field) for obj in objs)
+            if field in self.spec['filters'] and len(values) == 1 and None not in values:
+                query[field] = values.pop()
+        found = set()
+        for obj in self.iter_list(query):
+            if obj.get('id') in wanted:
+                found.add(obj['id'])
+                if len(found) == len(wanted):
+                    break
+        return found
+
+    def create_chunked(self, objs, chunk_size, chunk_bytes, check_mode=False):
+        """Create ``objs`` in chunks and report each object."""
+        writer = BulkWriter(self.create, chunk_size, chunk_bytes, overhead=len(json.dumps(self.wrap([]))),
+                            existing=self.existing_ids)
+        return [_item_result(obj, error) for obj, error in writer.run(objs, check_mode)]
+
+    def create_each(self, objs, workers, check_mode=False):
+        """Create ``objs`` with one request each, ``workers`` at a time, and report each object."""
+        if check_mode:
+            return [_item_result(obj, None) for obj in objs]
+        replies = run_requests(self.client, [('POST', self.spec['path'], self.wrap([obj])) for obj in objs], workers)
+        errors = [error for dummy, error in replies]
+        conflicts = [obj for obj, error in zip(objs, errors) if is_conflict(error)]
+        try:
+            found = self.existing_ids(conflicts) if conflicts else set()
+        except ACClientError:
+            found = set()
+        errors = [object_exists(obj, error) if is_conflict(error) and obj['id'] in found else error
+                  for obj, error in zip(objs, errors)]
+        return [_item_result(obj, error) for obj, error in zip(objs, errors)]
+
+    def update(self, obj):
+        self.client.request('PUT', self.spec['item_path'] % obj['id'], self.wrap([obj]))
+
+    def get(self, obj_id):
+        status, data = self.client.request('GET', self.spec['item_path'] % obj_id, allowed=(404,))
+        if status == 404:
+            return None
+        found = self.unwrap(data)
+        return found[0] if found else None
+
+    def iter_list(self, query=None, page_size=DEFAULT_PAGE_SIZE, limit=None):
+        """Yield the objects of the collection, one page at a time.
+
+        Pages of ``page_size`` objects are requested with ``pageIndex`` and
+        ``pageSize`` only as the caller consumes them, and no further page
+        is requested once ``limit`` objects were yielded. A response without
+        ``totalNum`` is taken to hold the whole collection.
+        """
+        page_size = max(page_size, 1)
+        count = 0
+        index = 1
+        while limit is None or count < limit:
+            page_query = dict(query or {}, pageIndex=index, pageSize=page_size)
+            dummy, data = self.client.request('GET', self.spec['path'], query=page_query)
+            page = self.unwrap(data)
+            for obj in page:
+                if limit is not None and count >= limit:
+                    return
+                count += 1
+                yield obj
+            total = data.get('totalNum') if isinstance(data, dict) else None
+            if len(page) < page_size or total is None or index * page_size >= int(total):
+                return
+            index += 1
+
+    def list(self, query=None, page_size=DEFAULT_PAGE_SIZE, limit=None):
+        return list(self.iter_list(query, page_size, limit))
+
+    def delete(self, obj_id):
+        status, dummy = self.client.request('DELETE', self.spec['item_path'] % obj_id, allowed=(404,))
+        return status != 404
+
+
+def cascade_delete(client, resource_type, obj_id, workers=DEFAULT_WORKERS, check_mode=False):
+    """Delete ``obj_id`` and all objects below it, leaves first.
+
+    The collections of every descendant type are fetched at once, then each
+    level of the subtree is deleted in parallel. Objects whose children
+    could not be deleted are left alone.
+    """
+    result = dict(changed=False, id=obj_id, deleted=[])
+    if ACResource(client, resource_type).get(obj_id) is None:
+        return result
+    inventory = {}
+    for child_type, objs, error in run_parallel(lambda t: ACResource(client, t).list(),
+                                                descendant_types(resource_type), workers):
+        if error is not None:
+            raise error
+        inventory[child_type] = objs
+    graph = delete_graph(resource_type, obj_id, inventory)
+
+    status = {}
+    for level in graph.levels():
+        ready = []
+        for node in level:
+            if all(status[dep]['status'] == 'deleted' for dep in node['deps']):
+                ready.append(node)
+            else:
+                status[node['key']] = dict(status='skipped', msg='an object below it was not deleted')
+        if check_mode:
+            replies = [(None, None)] * len(ready)
+        else:
+            replies = run_requests(client, [('DELETE', RESOURCES[node['type']]['item_path'] % node['id'])
+                                            for node in ready], workers, allowed=(404,))
+        for node, (dummy, error) in zip(ready, replies):
+            if error is None:
+                status[node['key']] = dict(status='deleted')
+            else:
+                status[node['key']] = dict(status='failed', msg=str(error))
+        for node in level:
+            item = dict(type=node['type'], id=node['id'])
+            item.update(status[node['key']])
+            result['deleted'].append(item)
+    if not check_mode:
+        record(client, removed=[(r['type'], r['id']) for r in result['deleted'] if r['status'] == 'deleted'])
+    failed = [r for r in result['deleted'] if r['status'] != 'deleted']
+    result['changed'] = len(failed) < len(result['deleted'])
+    if failed:
+        result.update(failed=True, msg='%d of %d objects were not deleted' % (len(failed), len(result['deleted'])))
+    return result
+
+
+def query_snapshot(store, resource_type, obj_id, filters):
+    """Answer a query from the snapshot, using its name and parent indexes."""
+    if obj_id:
+        found = store.get(resource_type, obj_id)
+        objs = [found] if found else []
+    else:
+        parents = dict((k, str(v)) for k, v in filters.items() if k in parent_fields(resource_type))
+        name = filters.get('name')
+        objs = store.find(resource_type, name=None if name is None else str(name), parents=parents)
+    return [obj for obj in objs if matches(obj, filters)]
+
+
+def _query(resource, params, obj_id):
+    if params.get('snapshot_max_age') is not None:
+        # A snapshot that cannot be read is skipped like a stale one.
+        try:
+            store = open_snapshot(resource.client)
+            if store is not None:
+                try:
+                    if store.fresh(resource.resource_type, params['snapshot_max_age']):
+                        return islice(query_snapshot(store, resource.resource_type, obj_id, params['filters']),
+                                      params['limit'])
+                finally:
+                    store.close()
+        except sqlite3.Error:
+            pass
+    if obj_id:
+        found = resource.get(obj_id)
+        return [found] if found and matches(found, params['filters']) else []
+    # Every filter is checked again on the listed objects, so a parameter
+    # the controller ignores cannot widen the result.
+    server, dummy = split_filters(resource.resource_type, params['filters'])
+    objs = resource.iter_list(server, params['page_size'])
+    return islice((obj for obj in objs if matches(obj, params['filters'])), params['limit'])
+
+
+def desired_fields(resource_type, params, create=True):
+    """Return the fields of the object described by ``params``.
+
+    Fields built from options the task left unset are not part of it, nor
+    are the fields the controller maintains.
+    """
+    built = dict(params)
+    for option in RESOURCES[resource_type]['options']:
+        if built.get(option) is None:
+            built[option] = UNSET
+    return prune(RESOURCES[resource_type]['build'](built, create))
+
+
+def find_current(resource, params, obj_id, desired):
+    """Return the existing object with ``obj_id``, or the one matching the identity fields."""
+    identity = resource.spec['identity']
+    if not obj_id:
+        missing = [field for field in identity if desired.get(field) in (None, '')]
+        if missing:
+            raise ACResourceError('%s or the options giving %s are required with state'
+                                  % (id_option(resource.resource_type), ', '.join(missing)))
+    filters = {} if obj_id else dict((field, desired[field]) for field in identity)
+    found = list(_query(resource, dict(params, filters=filters, limit=2), obj_id))
+    if len(found) > 1:
+        raise ACResourceError('more than one %s has %s' % (resource.resource_type, ', '.join(
+            '%s=%s' % item for item in sorted(filters.items()))))
+    return found[0] if found else None
+
+
+def _touch(obj, current):
+    if isinstance(current.get('additional'), dict):
+        obj['additional'] = dict(obj.get('additional') or {}, updateAt=_now())
+    if 'updateAt' in current:
+        obj['updateAt'] = _now()
+    return obj
+
+
+def update_payload(resource, current, desired, changed_fields, mode='full'):
+    """Return the body of the update turning ``current`` into ``desired``.
+
+    In ``full`` mode, and for types whose updates need the whole object,
+    that is the current copy with the changes merged in, so no extra GET
+    is needed. In ``minimal`` mode it holds only the id, the changed
+    top-level fields and the fields the type always needs.
+    """
+    merged = merge(current, desired)
+    if mode == 'full' or resource.spec.get('full_update'):
+        return _touch(merged, current)
+    fields = set(field.split('.')[0].split('[')[0] for field in changed_fields)
+    fields.update(resource.spec.get('update_keep', []))
+    payload = dict((field, merged[field]) for field in fields if field in merged)
+    payload['id'] = current['id']
+    return _touch(payload, current)
+
+
+def run_state(resource_type, params, client, check_mode=False):
+    """Make the object exist as described, or not exist, writing only on a difference."""
+    resource = ACResource(client, resource_type)
+    obj_id = params[id_option(resource_type)]
+    desired = desired_fields(resource_type, params)
+    if params['state'] == 'present':
+        check_valid(resource_type, desired)
+    current = find_current(resource, params, obj_id, desired)
+    result = dict(changed=False)
+
+    if params['state'] == 'absent':
+        if current is None:
+            return result
+        if params.get('cascade'):
+            return cascade_delete(client, resource_type, current['id'], params['workers'], check_mode)
+        if not check_mode:
+            resource.delete(current['id'])
+            record(client, removed=[(resource_type, current['id'])])
+        result.update(changed=True, id=current['id'], diff=dict(before=current, after={}))
+        return result
+
+    if current is None:
+        check_required(resource_type, 'create', params)
+        obj = resource.build(params, create=True)
+        check_valid(resource_type, obj)
+        created = check_mode or resource.ensure_created(obj)
+        if created and not check_mode:
+            record(client, written=[(resource_type, obj)])
+        result.update(changed=created, id=obj['id'])
+        if created:
+            result['diff'] = dict(before={}, after=obj)
+        result[resource.key] = obj
+        return result
+
+    result['id'] = current['id']
+    changed_fields = differences(desired, current)
+    if not changed_fields:
+        result[resource.key] = current
+        return result
+    if 'update' not in resource.spec['required']:
+        raise ACResourceError('%s %s differs in %s and cannot be updated'
+                              % (resource_type, current['id'], ', '.join(changed_fields)))
+    obj = update_payload(resource, current, desired, changed_fields, params['update_mode'])
+    if not check_mode:
+        resource.update(obj)
+        record(client, written=[(resource_type, obj)])
+    result.update(changed=True, differences=changed_fields, diff=dict(before=current, after=merge(current, obj)))
+    result[resource.key] = obj
+    return result
+
+
+def run_minimal_update(resource, params, check_mode=False):
+    """Update only the fields that differ from the current object, if any.
+
+    Only the options the task sets are compared; the others, such as a
+    description left out, keep their current value.
+    """
+    obj_id = params[id_option(resource.resource_type)]
+    desired = desired_fields(resource.resource_type, params, create=False)
+    check_valid(resource.resource_type, dict(desired, id=obj_id))
+    current = find_current(resource, params, obj_id, {})
+    if current is None:
+        raise ACResourceError('%s %s does not exist' % (resource.resource_type, obj_id))
+    changed_fields = differences(desired, current)
+    result = dict(changed=False, id=obj_id)
+    if not changed_fields:
+        result[resource.key] = current
+        return result
+    obj = update_payload(resource, current, desired, changed_fields, 'minimal')
+    if not check_mode:
+        resource.update(obj)
+        record(resource.client, written=[(resource.resource_type, obj)])
+    result.update(changed=True, differences=changed_fields, diff=dict(before=current, after=merge(current, obj)))
+    result[resource.key] = obj
+    return result
+
+
+def run_resource(resource_type, params, client, check_mode=False):
+    """Carry out ``params['operation']`` and return the module result."""
+    if params.get('state'):
+        return run_state(resource_type, params, client, check_mode)
+    resource = ACResource(client, resource_type)
+    operation = params['operation']
+    obj_id = params[id_option(resource_type)]
+    result = dict(changed=False)
+
+    if operation == 'create' and params.get('items'):
+        # Every item is checked before the first request, and all problems are reported together.
+        objs = []
+        problems = []
+        for index, item in enumerate(params['items']):
+            merged = merge_item(resource_type, params, item)
+            missing = missing_required(resource_type, operation, merged)
+            if missing:
+                problems.append('items[%d]: missing required arguments: %s' % (index, ', '.join(missing)))
+                continue
+            obj = resource.build(merged, create=True)
+            problems.extend('items[%d]: %s' % (index, problem) for problem in validate(resource_type, obj))
+            objs.append(obj)
+        if problems:
+            raise ACResourceError('invalid items: %s' % '; '.join(problems))
+        if resource.spec['array']:
+            results = resource.create_chunked(objs, params['chunk_size'], params['chunk_bytes'], check_mode)
+        else:
+            results = resource.create_each(objs, params['workers'], check_mode)
+        failed = [r for r in results if r['status'] == 'failed']
+        if not check_mode:
+            record(client, written=[(resource_type, obj) for obj, r in zip(objs, results) if r['status'] == 'created'])
+        result.update(changed=any(r['status'] == 'created' for r in results), results=results)
+        if failed:
+            result.update(failed=True, msg='%d of %d items failed' % (len(failed), len(results)))
+        return result
+
+    if operation == 'create':
+        check_required(resource_type, operation, params)
+    if operation == 'update' and params['update_mode'] == 'minimal':
+        return run_minimal_update(resource, params, check_mode)
+    if operation == 'update':
+        check_required(resource_type, operation, params)
+    if operation == 'query':
+        result[resource.key] = [project(obj, params['fields']) for obj in _query(resource, params, obj_id)]
+    elif operation == 'delete' and params.get('cascade'):
+        return cascade_delete(client, resource_type, obj_id, params['workers'], check_mode)
+    elif operation == 'delete':
+        if check_mode:
+            result['changed'] = resource.get(obj_id) is not None
+        else:
+            result['changed'] = resource.delete(obj_id)
+            record(client, removed=[(resource_type, obj_id)])
+        result['id'] = obj_id
+    else:
+        obj = resource.build(params, create=operation == 'create')
+        check_valid(resource_type, obj)
+        changed = True
+        if not check_mode:
+            if operation == 'create':
+                changed = resource.ensure_created(obj)
+            else:
+                resource.update(obj)
+            if changed:
+                record(client, written=[(resource_type, obj)])
+        result.update(changed=changed, id=obj['id'])
+        result[resource.key] = obj
+    return result
+
+
+def resource_runner(resource_type):
+    return lambda params, client, check_mode: run_resource(resource_type, params, client, check_mode)
+
+
+def run_module(module, resource_type):
+    """Entry point shared by the ac_* resource modules."""
+    execute(module, resource_runner(resource_type))
+
+
+def perform(runner, params, client, check_mode=False):
+    """Run ``runner(params, client, check_mode)`` and return its result, then release the client.
+
+    Errors are returned as failed results, so modules and action plugins
+    report them the same way.
+    """
+    try:
+        return runner(params, client, check_mode)
+    except ACClientError as e:
+        return dict(failed=True, msg=str(e), status=e.status, body=e.body)
+    except ACResourceError as e:
+        return dict(failed=True, msg=str(e))
+    finally:
+        if client.owns_token:
+            try:
+                client.logout()
+            except ACClientError:
+                pass
+        client.close()
+
+
+def execute(module, runner):
+    """Run ``runner(params, client, check_mode)`` and exit the module with its result."""
+    result = perform(runner, module.params, get_client(module), module.check_mode)
+    if result.get('failed'):
+        module.fail_json(**result)
+    module.exit_json(**result)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import random
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_MAX_DELAY = 30
+DEFAULT_BACKOFF = 0.5
+
+# Answers meaning the controller did not handle the request, so any request
+# can be sent again.
+NOT_HANDLED = (429, 503)
+# Answers after which the request may or may not have been handled; only
+# requests that can safely be repeated are sent again.
+MAYBE_HANDLED = (502, 504)
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+
+
+def parse_retry_after(value, now=None):
+    """Return the seconds a ``Retry-After`` header asks to wait, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(mktime_tz(parsed) - (time.time() if now is None else now), 0)
+
+
+def _has_ids(body):
+    if isinstance(body, list):
+        return bool(body) and all(_has_ids(obj) for obj in body)
+    return isinstance(body, dict) and bool(body.get('id'))
+
+
+def idempotent(method, body=None):
+    """Whether sending the request twice has the same effect as sending it once.
+
+    Creates qualify when every object carries its id: a repeated create then
+    finds the object already there instead of adding a second one.
+    """
+    if method in IDEMPOTENT_METHODS:
+        return True
+    if method == 'POST' and isinstance(body, dict) and body:
+        return all(_has_ids(objs) for objs in body.values())
+    return False
+
+
+class RetryPolicy:
+    """Decides which failed requests are sent again and how long to wait first.
+
+    Waits grow exponentially from ``backoff`` and are drawn at random below
+    that bound ("full jitter"), so concurrent workers that failed together
+    do not retry together. A ``Retry-After`` header takes precedence. No
+    wait exceeds ``max_delay``.
+    """
+
+    def __init__(self, retries=DEFAULT_RETRIES, max_delay=DEFAULT_RETRY_MAX_DELAY, backoff=DEFAULT_BACKOFF):
+        self.retries = retries
+        self.max_delay = max_delay
+        self.backoff = backoff
+
+    def retryable(self, method, body, status):
+        """Whether a request that got ``status``, or None for a transport failure, may be sent again."""
+        if status in NOT_HANDLED:
+            return True
+        return (status is None or status in MAYBE_HANDLED) and idempotent(method, body)
+
+    def delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.backoff * 2 ** attempt, self.max_delay))
+
+
+class CircuitBreaker:
+    """Stops sending requests to a controller that keeps failing.
+
+    After ``threshold`` failures in a row the circuit opens and requests
+    fail at once, without reaching the controller. After ``reset_timeout``
+    seconds one request is let through; its success closes the circuit
+    again, and its failure keeps it open for another period. The breaker
+    is shared by the threads of one client.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a request may be sent now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.time() - self.opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                self.opened_at = time.time()
+            self._trial = False
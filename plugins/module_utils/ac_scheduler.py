@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import re
+import threading
+from collections import OrderedDict
+
+from ansible.module_utils.six.moves import queue
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_CONCURRENCY = 64
+
+
+def run_parallel(func, items, workers=DEFAULT_WORKERS):
+    """Call ``func`` for every item on at most ``workers`` threads.
+
+    Returns ``(item, result, error)`` tuples in input order; an exception
+    raised by ``func`` is returned as ``error`` instead of propagating.
+    """
+    items = list(items)
+    results = [None] * len(items)
+    pending = queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+
+    def worker():
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[index] = (item, func(item), None)
+            except Exception as e:
+                results[index] = (item, None, e)
+
+    if len(items) <= 1 or workers <= 1:
+        worker()
+        return results
+    threads = [threading.Thread(target=worker) for dummy in range(min(workers, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TaskGraph:
+    """Nodes with dependencies, grouped into levels that can run in parallel."""
+
+    def __init__(self):
+        self.nodes = OrderedDict()
+
+    def add(self, key, deps=(), **data):
+        if key in self.nodes:
+            raise ValueError('duplicate node %s' % key)
+        node = dict(data, key=key, deps=list(deps))
+        self.nodes[key] = node
+        return node
+
+    def levels(self):
+        """Return lists of nodes; every node comes after all of its dependencies."""
+        depth = {}
+        for key in self.nodes:
+            self._depth(key, depth, set())
+        levels = [[] for dummy in range(max(depth.values()) + 1)] if depth else []
+        for key, node in self.nodes.items():
+            levels[depth[key]].append(node)
+        return levels
+
+    def _depth(self, key, depth, visiting):
+        if key in depth:
+            return depth[key]
+        if key not in self.nodes:
+            raise ValueError('unknown dependency %s' % key)
+        if key in visiting:
+            raise ValueError('dependency cycle through %s' % key)
+        visiting.add(key)
+        deps = self.nodes[key]['deps']
+        depth[key] = max([self._depth(dep, depth, visiting) + 1 for dep in deps] or [0])
+        visiting.discard(key)
+        return depth[key]
+
+
+def collection_path(path):
+    """Return the collection a path belongs to.
+
+    Item paths belong to their collection: ``/.../ports/port/<id>`` is in
+    ``/.../ports``.
+    """
+    segments = [segment for segment in path.split('?')[0].split('/') if segment]
+    if len(segments) > 2 and not re.match(r'^[A-Za-z]+$', segments[-1]):
+        segments = segments[:-2]
+    return '/' + '/'.join(segments)
+
+
+def endpoint_class(method, path):
+    """Return the class of a request, its method and collection, e.g. ``POST ports``."""
+    return '%s %s' % (method, collection_path(path).split('/')[-1])
+
+
+class AIMDLimiter:
+    """Concurrency limit adapted to how the controller copes, additive increase and multiplicative decrease.
+
+    Every request that succeeds quickly raises the limit by ``1 / limit``,
+    which is one more concurrent request per round of requests. A failure
+    (timeout, 5xx, 429), or a latency above ``tolerance`` times the
+    baseline and at least ``slack`` seconds above it, multiplies it by
+    ``backoff``. Only one cut is made per round:
+    requests sent before the last cut do not cut it again.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=DEFAULT_MAX_CONCURRENCY, backoff=0.5, tolerance=2.0,
+                 slack=0.1):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.slack = slack
+        self.baseline = None
+        self.inflight = 0
+        self._round = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Wait for a free slot and return the round it was taken in."""
+        with self._cond:
+            while self.inflight >= int(self.limit):
+                self._cond.wait()
+            self.inflight += 1
+            return self._round
+
+    def try_acquire(self):
+        """Take a free slot without waiting; return its round, or None when there is none."""
+        with self._cond:
+            if self.inflight >= int(self.limit):
+                return None
+            self.inflight += 1
+            return self._round
+
+    def release(self, taken, latency, ok):
+        with self._cond:
+            self.inflight -= 1
+            if ok:
+                # The baseline follows the latency slowly but drops at once to a faster answer.
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    self.baseline += (latency - self.baseline) * 0.05
+            congested = not ok or latency > max(self.baseline * self.tolerance, self.baseline + self.slack)
+            if congested and taken == self._round:
+                self.limit = max(self.minimum, self.limit * self.backoff)
+                self._round += 1
+            elif not congested:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class ConcurrencyControl:
+    """One ``AIMDLimiter`` per endpoint class, created on first use.
+
+    ``limits`` caps classes by name: a ``METHOD collection`` pair such as
+    ``POST ports``, a collection such as ``ports``, or a method such as
+    ``GET``; the most specific entry applies. Without ``adaptive`` every
+    class may use its cap at once and the cap never changes.
+    """
+
+    def __init__(self, limits=None, maximum=DEFAULT_MAX_CONCURRENCY, adaptive=True):
+        self.limits = limits or {}
+        self.maximum = maximum
+        self.adaptive = adaptive
+        self._limiters = {}
+        self._lock = threading.Lock()
+
+    def limiter(self, method, path):
+        name = endpoint_class(method, path)
+        with self._lock:
+            if name not in self._limiters:
+                collection = name.split(' ', 1)[1]
+                for key in (name, collection, method):
+                    if key in self.limits:
+                        maximum = int(self.limits[key])
+                        break
+                else:
+                    maximum = self.maximum
+                if self.adaptive:
+                    self._limiters[name] = AIMDLimiter(maximum=maximum)
+                else:
+                    # Starting at the cap without ever backing off keeps the limit fixed.
+                    self._limiters[name] = AIMDLimiter(initial=maximum, maximum=maximum, backoff=1.0)
+            return self._limiters[name]
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .ac_topology import parent_refs
+
+DEFAULT_SNAPSHOT_DIR = '~/.ansible/ac_snapshots'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS objects (
+    type TEXT NOT NULL, id TEXT NOT NULL, name TEXT, version TEXT, body TEXT NOT NULL,
+    PRIMARY KEY (type, id));
+CREATE INDEX IF NOT EXISTS objects_name ON objects (type, name);
+CREATE TABLE IF NOT EXISTS parents (
+    type TEXT NOT NULL, id TEXT NOT NULL, field TEXT NOT NULL, parent_id TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS parents_parent ON parents (type, field, parent_id);
+CREATE INDEX IF NOT EXISTS parents_object ON parents (type, id);
+CREATE TABLE IF NOT EXISTS syncs (type TEXT PRIMARY KEY, synced_at REAL NOT NULL);
+'''
+
+
+def version(obj):
+    """Return what changes whenever a controller object does.
+
+    That is its ``updateAt`` time, or a digest of the object for types
+    the controller does not timestamp.
+    """
+    additional = obj.get('additional')
+    if isinstance(additional, dict) and additional.get('updateAt'):
+        return additional['updateAt']
+    if obj.get('updateAt'):
+        return obj['updateAt']
+    return hashlib.sha1(json.dumps(obj, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def snapshot_path(host, port, cache_dir=None):
+    key = hashlib.sha256(('%s:%s' % (host, port)).encode('utf-8')).hexdigest()
+    return os.path.join(os.path.expanduser(cache_dir or DEFAULT_SNAPSHOT_DIR), key[:32] + '.db')
+
+
+class SnapshotStore:
+    """Local copy of the controller objects of one controller, in SQLite.
+
+    Objects are kept as their JSON body and indexed by id, by name and by
+    the id of each parent, e.g. the LogicPorts of one LogicSwitch. Every
+    type records when it was last read from the controller, so callers
+    can decide whether the copy is recent enough to answer from, and every
+    object its ``version``, so a later read only has to store the objects
+    that changed.
+    """
+
+    def __init__(self, path, timeout=30):
+        directory = os.path.dirname(path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory, 0o700)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        self.path = path
+        self._db = sqlite3.connect(path, timeout=timeout)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+        os.chmod(path, 0o600)
+
+    @classmethod
+    def open_existing(cls, path):
+        """Return the store at ``path``, or None when there is none yet."""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def close(self):
+        self._db.close()
+
+    def _insert(self, resource_type, obj):
+        self._db.execute('INSERT OR REPLACE INTO objects (type, id, name, version, body) VALUES (?, ?, ?, ?, ?)',
+                         (resource_type, obj['id'], obj.get('name'), version(obj), json.dumps(obj)))
+        self._db.execute('DELETE FROM parents WHERE type = ? AND id = ?', (resource_type, obj['id']))
+        self._db.executemany('INSERT INTO parents (type, id, field, parent_id) VALUES (?, ?, ?, ?)',
+                             [(resource_type, obj['id'], field, parent_id)
+                              for field, parent_id in parent_refs(resource_type, obj)])
+
+    def replace(self, resource_type, objs, synced_at=None):
+        """Replace all objects of a type with a complete listing."""
+        with self._db:
+            self._db.execute('DELETE FROM objects WHERE type = ?', (resource_type,))
+            self._db.execute('DELETE FROM parents WHERE type = ?', (resource_type,))
+            for obj in objs:
+                self._insert(resource_type, obj)
+            self._db.execute('INSERT OR REPLACE INTO syncs (type, synced_at) VALUES (?, ?)',
+                             (resource_type, time.time() if synced_at is None else synced_at))
+
+    def apply(self, resource_type, changed, removed, synced_at=None):
+        """Store ``changed`` objects and drop ``removed`` ids after a delta read."""
+        with self._db:
+            for obj in changed:
+                self._insert(resource_type, obj)
+            for obj_id in removed:
+                self._db.execute('DELETE FROM objects WHERE type = ? AND id = ?', (resource_type, obj_id))
+                self._db.execute('DELETE FROM parents WHERE type = ? AND id = ?', (resource_type, obj_id))
+            self._db.execute('INSERT OR REPLACE INTO syncs (type, synced_at) VALUES (?, ?)',
+                             (resource_type, time.time() if synced_at is None else synced_at))
+
+    def versions(self, resource_type):
+        """Map the stored ids of a type to their ``version``."""
+        return dict(self._db.execute('SELECT id, version FROM objects WHERE type = ?', (resource_type,)))
+
+    def put(self, resource_type, obj):
+        """Store one object, merged into the stored copy when there is one."""
+        stored = self.get(resource_type, obj['id'])
+        if stored is not None:
+            stored.update(obj)
+            obj = stored
+        with self._db:
+            self._insert(resource_type, obj)
+
+    def remove(self, resource_type, obj_id):
+        with self._db:
+            self._db.execute('DELETE FROM objects WHERE type = ? AND id = ?', (resource_type, obj_id))
+            self._db.execute('DELETE FROM parents WHERE type = ? AND id = ?', (resource_type, obj_id))
+
+    def synced_at(self, resource_type):
+        row = self._db.execute('SELECT synced_at FROM syncs WHERE type = ?', (resource_type,)).fetchone()
+        return row[0] if row else None
+
+    def fresh(self, resource_type, max_age):
+        synced_at = self.synced_at(resource_type)
+        return synced_at is not None and time.time() - synced_at <= max_age
+
+    def list(self, resource_type):
+        return [json.loads(row[0]) for row in
+                self._db.execute('SELECT body FROM objects WHERE type = ? ORDER BY rowid', (resource_type,))]
+
+    def get(self, resource_type, obj_id):
+        row = self._db.execute('SELECT body FROM objects WHERE type = ? AND id = ?',
+                               (resource_type, obj_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, resource_type, name=None, parents=None):
+        """Return the objects of a type with ``name`` and the given parent ids.
+
+        ``parents`` maps parent id fields, e.g. ``logicSwitchId``, to ids.
+        """
+        sql = 'SELECT body FROM objects o WHERE o.type = ?'
+        args = [resource_type]
+        if name is not None:
+            sql += ' AND o.name = ?'
+            args.append(name)
+        for field, parent_id in sorted((parents or {}).items()):
+            sql += (' AND EXISTS (SELECT 1 FROM parents p WHERE p.type = o.type AND p.id = o.id'
+                    ' AND p.field = ? AND p.parent_id = ?)')
+            args.extend([field, parent_id])
+        return [json.loads(row[0]) for row in self._db.execute(sql + ' ORDER BY o.rowid', args)]
+
+    def ids(self, resource_type, name):
+        return [row[0] for row in self._db.execute('SELECT id FROM objects WHERE type = ? AND name = ?',
+                                                   (resource_type, name))]
+
+
+def open_snapshot(client):
+    """Return the existing snapshot of the client's controller, or None."""
+    host, port = client.endpoint()
+    return SnapshotStore.open_existing(snapshot_path(host, port))
+
+
+def record(client, written=(), removed=()):
+    """Apply ``(type, object)`` writes and ``(type, id)`` deletes to the snapshot.
+
+    Nothing is done when the controller has no snapshot. The snapshot is a
+    cache, so failing to update it does not fail the task; the write has
+    already been made on the controller.
+    """
+    if not written and not removed:
+        return
+    try:
+        store = open_snapshot(client)
+        if store is None:
+            return
+        try:
+            for resource_type, obj in written:
+                store.put(resource_type, obj)
+            for resource_type, obj_id in removed:
+                store.remove(resource_type, obj_id)
+        finally:
+            store.close()
+    except sqlite3.Error:
+        pass
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from .ac_scheduler import TaskGraph
+
+# Per resource type: the fields of a controller object holding the ids of
+# the objects it belongs to, as ``(parent type, path to the field)``.
+PARENTS = {
+    'logicnetwork': [('tenant', ('tenantId',))],
+    'logicrouter': [('logicnetwork', ('logicNetworkId',))],
+    'logicswitch': [('logicnetwork', ('logicNetworkId',))],
+    'logicsubnet': [('logicrouter', ('logicRouterId',))],
+    'logicinterface': [('logicrouter', ('logicRouterId',)), ('logicswitch', ('logicSwitchId',)),
+                       ('logicsubnet', ('ip', 'subnetId'))],
+    'logicport': [('logicswitch', ('logicSwitchId',))],
+    'endport': [('logicport', ('logicPortId',)), ('logicnetwork', ('logicNetworkId',))],
+}
+
+
+def _field(obj, path):
+    for name in path:
+        obj = obj.get(name) if isinstance(obj, dict) else None
+    return obj
+
+
+def parent_ids(resource_type, obj):
+    """Return ``(parent type, parent id)`` pairs of one controller object."""
+    found = []
+    for parent_type, path in PARENTS.get(resource_type, []):
+        value = _field(obj, path)
+        if value:
+            found.append((parent_type, value))
+    return found
+
+
+def parent_fields(resource_type):
+    """Return the names of the parent id fields, e.g. ``subnetId`` for ``ip.subnetId``."""
+    return [path[-1] for dummy, path in PARENTS.get(resource_type, [])]
+
+
+def parent_refs(resource_type, obj):
+    """Return ``(field name, parent id)`` pairs of one controller object."""
+    found = []
+    for dummy, path in PARENTS.get(resource_type, []):
+        value = _field(obj, path)
+        if value:
+            found.append((path[-1], value))
+    return found
+
+
+def descendant_types(root_type):
+    """Return the types that can be found below ``root_type``."""
+    found = []
+    pending = [root_type]
+    while pending:
+        current = pending.pop(0)
+        for child_type in sorted(PARENTS):
+            if child_type not in found and any(p == current for p, dummy in PARENTS[child_type]):
+                found.append(child_type)
+                pending.append(child_type)
+    return found
+
+
+def delete_graph(root_type, root_id, inventory):
+    """Build the ``TaskGraph`` deleting ``root_id`` and everything below it.
+
+    ``inventory`` maps each descendant type to the list of its objects on
+    the controller. An object reachable through any of its parents belongs
+    to the subtree. Every node depends on its children, so the first level
+    holds the leaves and the last one the root.
+    """
+    children = {}
+    for resource_type, objs in inventory.items():
+        for obj in objs:
+            for parent in parent_ids(resource_type, obj):
+                children.setdefault(parent, set()).add((resource_type, obj['id']))
+
+    subtree = set()
+    pending = [(root_type, root_id)]
+    while pending:
+        current = pending.pop()
+        if current not in subtree:
+            subtree.add(current)
+            pending.extend(children.get(current, ()))
+
+    graph = TaskGraph()
+    for resource_type, obj_id in sorted(subtree):
+        deps = ['%s:%s' % child for child in sorted(children.get((resource_type, obj_id), ()))]
+        graph.add('%s:%s' % (resource_type, obj_id), deps, type=resource_type, id=obj_id)
+    return graph
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import binascii
+import re
+import socket
+
+from ansible.module_utils.six import string_types
+
+from .ac_topology import PARENTS, _field
+
+_UUID = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+
+def parse_ip(value):
+    """Return ``(family bits, integer)`` for an IPv4 or IPv6 address, or None."""
+    if not isinstance(value, string_types) or not value:
+        return None
+    for family, bits in ((socket.AF_INET, 32), (socket.AF_INET6, 128)):
+        try:
+            packed = socket.inet_pton(family, value)
+        except (socket.error, ValueError):
+            continue
+        return bits, int(binascii.hexlify(packed), 16)
+    return None
+
+
+def parse_cidr(value):
+    """Return ``(family bits, network, prefix length)`` for a CIDR, or None.
+
+    The address must be the network address, e.g. ``10.1.1.0/24``.
+    """
+    if not isinstance(value, string_types) or value.count('/') != 1:
+        return None
+    address, prefix = value.split('/')
+    parsed = parse_ip(address)
+    if parsed is None or not prefix.isdigit():
+        return None
+    bits, network = parsed
+    length = int(prefix)
+    if length > bits or network & ((1 << (bits - length)) - 1):
+        return None
+    return bits, network, length
+
+
+def _uuid(path):
+    def check(obj):
+        value = _field(obj, path)
+        if value not in (None, '') and not (isinstance(value, string_types) and _UUID.match(value)):
+            return '%s %r is not a UUID' % ('.'.join(path), value)
+    return check
+
+
+def _cidr(obj):
+    if obj.get('cidr') not in (None, '') and parse_cidr(obj['cidr']) is None:
+        return 'cidr %r is not a network address with a prefix length, e.g. 10.1.1.0/24' % obj['cidr']
+
+
+def _gateway(obj):
+    gateway = obj.get('gatewayIp')
+    if gateway in (None, ''):
+        return None
+    parsed = parse_ip(gateway)
+    if parsed is None:
+        return 'gatewayIp %r is not an IP address' % gateway
+    cidr = parse_cidr(obj.get('cidr'))
+    if cidr is not None:
+        bits, network, length = cidr
+        if parsed[0] != bits or parsed[1] >> (bits - length) != network >> (bits - length):
+            return 'gatewayIp %s is not inside cidr %s' % (gateway, obj['cidr'])
+
+
+def _location(obj):
+    if 'accessInfo' not in obj:
+        return None
+    locations = _field(obj, ('accessInfo', 'location'))
+    if not isinstance(locations, list) or not locations:
+        return 'accessInfo.location must hold at least one device port'
+    for index, location in enumerate(locations):
+        if not isinstance(location, dict) or not location.get('portName'):
+            return 'accessInfo.location[%d] has no portName' % index
+        if parse_ip(location.get('deviceIp')) is None:
+            return 'accessInfo.location[%d].deviceIp %r is not an IP address' % (index, location.get('deviceIp'))
+
+
+def _compile(resource_type):
+    checks = [_uuid(('id',))] + [_uuid(path) for dummy, path in PARENTS.get(resource_type, [])]
+    if resource_type == 'logicsubnet':
+        checks.extend([_cidr, _gateway])
+    if resource_type == 'logicport':
+        checks.append(_location)
+    return tuple(checks)
+
+
+# Checks per resource type, put together once at import.
+CHECKS = dict((resource_type, _compile(resource_type)) for resource_type in
+              ['tenant', 'logicnetwork', 'logicrouter', 'logicswitch', 'logicsubnet', 'logicinterface',
+               'logicport', 'endport'])
+
+
+def validate(resource_type, obj):
+    """Return the problems found in one request object, without contacting the controller."""
+    return [message for message in (check(obj) for check in CHECKS[resource_type]) if message]
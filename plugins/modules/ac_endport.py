@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_endport
 short_description: Manages EndPort on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,214 +27,237 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the EndPort exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The EndPort is found by I(endport_id), or else by I(endport_name) and I(logicport_id).
+            - With C(present), the options set in the task are compared with the current EndPort, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the EndPort built from the options, and I(state=present) sends the
+              current EndPort with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current EndPort, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(endport_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its name are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of EndPorts fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of EndPorts returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the EndPorts whose fields have the given values, for example C(name) or C(description).
+            - C(logicNetworkId), C(logicPortId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned EndPort, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its EndPorts were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     endport_id:
         description:
             - AC EndPort id.
+            - When omitted on create, the id is derived from the EndPort's name and LogicPort, so creating it again
+              reuses the id, and an existing EndPort is reported as unchanged instead of failing.
+        type: str
     endport_name:
         description:
             - AC EndPort name.
+        type: str
     endport_desc:
         description:
             - AC EndPort description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
+    logicnetwork_id:
+        description:
+            - AC LogicNetwork id.
+        type: str
     logicport_id:
         description:
             - AC LogicPort id.
+        type: str
+    items:
+        description:
+            - EndPorts to create with I(operation=create), sent as concurrent single requests on at most I(workers) threads.
+            - Options left out of an item are taken from the top-level options of the same name, except I(endport_id).
+            - Every item is reported, and a failed item does not stop the others.
+        type: list
+        elements: dict
+        suboptions:
+            endport_id:
+                description:
+                    - AC EndPort id.
+                type: str
+            endport_name:
+                description:
+                    - AC EndPort name.
+                type: str
+            endport_desc:
+                description:
+                    - AC EndPort description.
+                type: str
+            logicnetwork_id:
+                description:
+                    - AC LogicNetwork id.
+                type: str
+            logicport_id:
+                description:
+                    - AC LogicPort id.
+                type: str
+    workers:
+        description:
+            - Maximum number of concurrent requests when creating I(items).
+        type: int
+        default: 8
 '''
 
 EXAMPLES = '''
-- name: Create EndPort
+- name: Manage EndPort
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "endport_name"
-      prompt: "Please input end port name "
-      private: no
-    - name: "logicnetwork_id"
-      prompt: "Please input logic network id "
-      private: no
-    - name: "endport_desc"
-      prompt: "Please input end port description "
-      private: no
-    - name: "logicport_id"
-      prompt: "Please input logic port id "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_endport:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check endport_name is null
-      fail:
-        msg: "Create EndPort fail! endport_name is null"
-      when: endport_name == ''
-    - name: check logicnetwork_id is null
-      fail:
-        msg: "Create EndPort fail! logicnetwork_id is null"
-      when: logicnetwork_id == ''
-    - name: check logicport_id is null
-      fail:
-        msg: "Create EndPort fail! logicport_id is null"
-      when: logicport_id == ''
+    - name: Make sure endport "{{endport_name}}" exists as described
+      ac_endport:
+        state: present
+        endport_name: "{{endport_name}}"
+        endport_desc: "{{endport_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
+        logicport_id: "{{logicport_id}}"
+      register: endport_result
     - name: Create endport "{{endport_name}}"
-      tags: create_endport
-      vars:
-        endport_info:
-          endPort:
-            id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-            name: "{{endport_name}}"
-            description: "{{endport_desc}}"
-            logicNetworkId: "{{logicnetwork_id}}"
-            logicPortId: "{{logicport_id}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/endports'
-        method: POST
-        body: '{{endport_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_endport:
+        operation: create
+        endport_name: "{{endport_name}}"
+        endport_desc: "{{endport_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
+        logicport_id: "{{logicport_id}}"
       register: endport_result
-    - name: response from create end port
-      debug:
-        msg: "{{endport_result}}"
-
-- name: Update EndPort
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "endport_id"
-      prompt: "Please input the end port id that you want to update "
-      private: no
-    - name: "endport_name"
-      prompt: "Please input end port name "
-      private: no
-    - name: "endport_desc"
-      prompt: "Please input end port description "
-      private: no
-  tasks:
-    - name: check endport_id is null
-      fail:
-        msg: "Update EndPort fail! endport_id is null"
-      when: endport_id == ''
-    - name: check endport_name is null
-      fail:
-        msg: "Update EndPort fail! endport_name is null"
-      when: endport_name == ''
-    - name: Update end port "{{endport_id}}"
-      tags: update_endport
-      vars:
-        endport_info:
-          endPort:
-            id: "{{endport_id}}"
-            name: "{{endport_name}}"
-            description: "{{endport_desc}}"
-            additional:
-              updateAt: "{{now_time}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/endports/endport/{{endport_id}}'
-        method: PUT
-        body: '{{endport_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create three endports with one task
+      ac_endport:
+        operation: create
+        logicnetwork_id: "{{logicnetwork_id}}"
+        logicport_id: "{{logicport_id}}"
+        items:
+          - endport_name: endport-a
+          - endport_name: endport-b
+          - endport_name: endport-c
       register: endport_result
-      ignore_errors: yes
-    - name: response from update a end port
-      debug:
-        msg: "{{endport_result}}"
-
-- name: Query EndPort
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "endport_id"
-      prompt: "Please input the end port id that you want to query "
-      private: no
-  tasks:
-    - name: qeury endports
-      tags: qeury_endports
-      when: endport_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/endports'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: endports_result
-      ignore_errors: yes
-    - name: qeury endport "{{endport_id}}"
-      tags: qeury_endport
-      when: endport_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/endports/endport/{{endport_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Update endport "{{endport_id}}"
+      ac_endport:
+        operation: update
+        endport_id: "{{endport_id}}"
+        endport_name: "{{endport_name}}"
+        endport_desc: "{{endport_desc}}"
+      register: endport_result
+    - name: Query endport "{{endport_id}}"
+      ac_endport:
+        operation: query
+        endport_id: "{{endport_id}}"
+      register: endport_result
+    - name: Query endports
+      ac_endport:
+        operation: query
+      register: endport_result
+    - name: Query the first 100 endports
+      ac_endport:
+        operation: query
+        limit: 100
+      register: endport_result
+    - name: Query the ids and names of the endports with logicPortId "{{logicport_id}}"
+      ac_endport:
+        operation: query
+        filters:
+          logicPortId: "{{logicport_id}}"
+        fields: [id, name]
       register: endport_result
-      ignore_errors: yes
-    - name: response from get endports
-      when: endport_id == ''
-      debug:
-        msg: "{{endports_result.json.endPorts}}"
-    - name: response from query a endport
-      when: endport_id != ''
-      debug:
-        msg: "{{endport_result.json.endPort}}"
-
-- name: Delete EndPort
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "endport_id"
-      prompt: "Please input the end port id that you want to delete "
-      private: no
-  tasks:
-    - name: check endport_id is null
-      fail:
-        msg: "Delete EndPort fail! endport_id is null"
-      when: endport_id == ''
     - name: Delete endport "{{endport_id}}"
-      tags: delete_endport
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/endports/endport/{{endport_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_endport:
+        operation: delete
+        endport_id: "{{endport_id}}"
       register: endport_result
-      ignore_errors: yes
-    - name: response from delete a endport
-      debug:
-        msg: "{{endport_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the EndPort that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+endPort:
+    description:
+        - The EndPort sent to the controller for create and update.
+        - The list of matching EndPorts for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name), C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current EndPort.
+    returned: when state is present and the EndPort was updated
+    type: list
+    elements: str
+diff:
+    description: The EndPort before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('endport'),
+                           required_if=resource_required_if('endport'),
+                           supports_check_mode=True)
+    run_module(module, 'endport')
+
+
+if __name__ == '__main__':
+    main()
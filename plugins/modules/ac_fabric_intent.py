@@ -0,0 +1,336 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: ac_fabric_intent
+short_description: Creates a whole logical fabric on HUAWEI iMaster NCE-Fabric Controller in one task.
+description:
+    - Creates Tenants, LogicNetworks, LogicRouters, LogicSubnets, LogicSwitches, LogicPorts, EndPorts and LogicInterfaces
+      described as one nested tree on HUAWEI iMaster NCE-Fabric Controller(AC).
+    - Objects are created in dependency order. All objects whose parents already exist are sent at the same time, on at most
+      I(workers) concurrent requests, and objects of the same type that support array payloads are sent together in chunks.
+    - Ids are generated before the first request, so every child already carries the ids of its parents. Generated ids are
+      derived from the name of each object, or the CIDR of a subnet, and from the object it belongs to, if any, so running
+      the same intent again finds the objects it created and reports them as existing instead of failing.
+author: ZhiwenZhang (@maomao1995)
+notes:
+  - This module requires installation iMaster NCE-Fabric Controller.
+  - The whole intent is checked before the first request. Ids must be UUIDs, subnet gateways must lie inside their
+    CIDR and ports need a valid device address; every problem is reported at once.
+  - When an object cannot be created its descendants are skipped; the other objects are still created.
+extends_documentation_fragment:
+  - huawei.ac.ac
+options:
+    tenants:
+        description:
+            - Tenants to create, with everything below them.
+        type: list
+        elements: dict
+        required: true
+        suboptions:
+            name:
+                description:
+                    - Tenant name, unique among its siblings; it identifies the Tenant in I(results) and I(ids).
+                type: str
+                required: true
+            description:
+                description:
+                    - Tenant description.
+                type: str
+                default: ''
+            id:
+                description:
+                    - Tenant id, generated when omitted.
+                type: str
+            fabric_id:
+                description:
+                    - Fabric of the Tenant, inherited from the enclosing object when omitted.
+                type: str
+            networks:
+                description:
+                    - LogicNetworks of this Tenant.
+                type: list
+                elements: dict
+                default: []
+                suboptions:
+                    name:
+                        description:
+                            - LogicNetwork name, unique among its siblings; it identifies the LogicNetwork in I(results)
+                              and I(ids).
+                        type: str
+                        required: true
+                    description:
+                        description:
+                            - LogicNetwork description.
+                        type: str
+                        default: ''
+                    id:
+                        description:
+                            - LogicNetwork id, generated when omitted.
+                        type: str
+                    fabric_id:
+                        description:
+                            - Fabric of the LogicNetwork, inherited from the enclosing object when omitted.
+                        type: str
+                    routers:
+                        description:
+                            - LogicRouters of this LogicNetwork.
+                        type: list
+                        elements: dict
+                        default: []
+                        suboptions:
+                            name:
+                                description:
+                                    - LogicRouter name, unique among its siblings; it identifies the LogicRouter in
+                                      I(results) and I(ids).
+                                type: str
+                                required: true
+                            description:
+                                description:
+                                    - LogicRouter description.
+                                type: str
+                                default: ''
+                            id:
+                                description:
+                                    - LogicRouter id, generated when omitted.
+                                type: str
+                            fabric_id:
+                                description:
+                                    - Fabric of the LogicRouter, inherited from the enclosing object when omitted.
+                                type: str
+                            subnets:
+                                description:
+                                    - LogicSubnets of this LogicRouter.
+                                type: list
+                                elements: dict
+                                default: []
+                                suboptions:
+                                    cidr:
+                                        description:
+                                            - Subnet in CIDR notation, unique within its LogicRouter.
+                                        type: str
+                                        required: true
+                                    gateway_ip:
+                                        description:
+                                            - Gateway address of the subnet.
+                                        type: str
+                                        required: true
+                                    id:
+                                        description:
+                                            - LogicSubnet id, generated when omitted.
+                                        type: str
+                    switches:
+                        description:
+                            - LogicSwitches of this LogicNetwork.
+                        type: list
+                        elements: dict
+                        default: []
+                        suboptions:
+                            name:
+                                description:
+                                    - LogicSwitch name, unique among its siblings; it identifies the LogicSwitch in
+                                      I(results) and I(ids).
+                                type: str
+                                required: true
+                            description:
+                                description:
+                                    - LogicSwitch description.
+                                type: str
+                                default: ''
+                            id:
+                                description:
+                                    - LogicSwitch id, generated when omitted.
+                                type: str
+                            ports:
+                                description:
+                                    - LogicPorts of this LogicSwitch.
+                                type: list
+                                elements: dict
+                                default: []
+                                suboptions:
+                                    name:
+                                        description:
+                                            - LogicPort name, unique among its siblings; it identifies the LogicPort in
+                                              I(results) and I(ids).
+                                        type: str
+                                        required: true
+                                    description:
+                                        description:
+                                            - LogicPort description.
+                                        type: str
+                                        default: ''
+                                    id:
+                                        description:
+                                            - LogicPort id, generated when omitted.
+                                        type: str
+                                    device_ip:
+                                        description:
+                                            - Management IP of the device the port belongs to.
+                                        type: str
+                                        required: true
+                                    port_name:
+                                        description:
+                                            - Name of the physical port, e.g. C(10GE1/0/1).
+                                        type: str
+                                        required: true
+                                    endports:
+                                        description:
+                                            - EndPorts attached to this LogicPort.
+                                        type: list
+                                        elements: dict
+                                        default: []
+                                        suboptions:
+                                            name:
+                                                description:
+                                                    - EndPort name, unique among its siblings; it identifies the EndPort
+                                                      in I(results) and I(ids).
+                                                type: str
+                                                required: true
+                                            description:
+                                                description:
+                                                    - EndPort description.
+                                                type: str
+                                                default: ''
+                                            id:
+                                                description:
+                                                    - EndPort id, generated when omitted.
+                                                type: str
+                    interfaces:
+                        description:
+                            - LogicInterfaces connecting a LogicRouter subnet to a LogicSwitch.
+                        type: list
+                        elements: dict
+                        default: []
+                        suboptions:
+                            name:
+                                description:
+                                    - LogicInterface name.
+                                type: str
+                                required: true
+                            id:
+                                description:
+                                    - LogicInterface id, generated when omitted.
+                                type: str
+                            router:
+                                description:
+                                    - Name of a LogicRouter of the same LogicNetwork.
+                                type: str
+                                required: true
+                            switch:
+                                description:
+                                    - Name of a LogicSwitch of the same LogicNetwork.
+                                type: str
+                                required: true
+                            subnet:
+                                description:
+                                    - CIDR of a subnet of I(router).
+                                type: str
+                                required: true
+    fabric_id:
+        description:
+            - Default fabric of Tenants, LogicNetworks and LogicRouters that do not set their own.
+        type: str
+    workers:
+        description:
+            - Maximum number of concurrent requests.
+        type: int
+        default: 8
+    chunk_size:
+        description:
+            - Maximum number of objects sent in one create request to endpoints that accept arrays.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
+'''
+
+EXAMPLES = '''
+- name: Build a fabric
+  hosts: localhost
+  gather_facts: false
+  tasks:
+    - name: Create tenant t1 with one network
+      ac_fabric_intent:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+        fabric_id: "{{fabric_id}}"
+        tenants:
+          - name: t1
+            networks:
+              - name: net1
+                routers:
+                  - name: r1
+                    subnets:
+                      - cidr: 10.1.1.0/24
+                        gateway_ip: 10.1.1.1
+                switches:
+                  - name: web
+                    ports:
+                      - name: web-p1
+                        device_ip: 10.0.0.11
+                        port_name: 10GE1/0/1
+                        endports:
+                          - name: web-vm1
+                interfaces:
+                  - name: web-gw
+                    router: r1
+                    switch: web
+                    subnet: 10.1.1.0/24
+      register: fabric_result
+    - name: Show the id of LogicSwitch web
+      debug:
+        msg: "{{fabric_result.ids.logicswitch['t1/net1/web']}}"
+'''
+
+RETURN = '''
+results:
+    description:
+        - One entry per object, with its C(type), C(path), C(id), C(status) and, when it was not created, C(msg).
+        - The path joins the names from the Tenant down, e.g. C(t1/net1/web); subnets use their CIDR.
+        - C(status) is C(created), C(exists) when the object was already there, C(failed) or C(skipped) when a parent was
+          not created.
+    returned: always
+    type: list
+    elements: dict
+ids:
+    description: Ids of the created and existing objects by type and path.
+    returned: always
+    type: dict
+    sample: {"tenant": {"t1": "8f0ec0c4-..."}, "logicswitch": {"t1/net1/web": "1a2b3c4d-..."}}
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_intent import intent_argument_spec, run_intent
+from ..module_utils.ac_resource import execute
+
+
+def main():
+    module = AnsibleModule(argument_spec=intent_argument_spec(), supports_check_mode=True)
+    execute(module, run_intent)
+
+
+if __name__ == '__main__':
+    main()
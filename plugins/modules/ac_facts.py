@@ -0,0 +1,160 @@
+#!/usr/bin/python
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = '''
+module: ac_facts
+short_description: Gathers the logical network objects of HUAWEI iMaster NCE-Fabric Controller as facts.
+description:
+    - Reads Tenants, LogicNetworks, LogicRouters, LogicSwitches, LogicSubnets, LogicInterfaces, LogicPorts and EndPorts
+      from HUAWEI iMaster NCE-Fabric Controller(AC) and returns them as the C(ac) fact.
+    - The first page of every collection is requested at once. Their C(totalNum) tells which pages remain, and those
+      are requested concurrently as well.
+    - Each type is indexed by id, by name and by the id of each parent, so later tasks can look objects up without
+      querying the controller again.
+author: ZhiwenZhang (@maomao1995)
+notes:
+  - This module requires installation iMaster NCE-Fabric Controller.
+extends_documentation_fragment:
+  - huawei.ac.ac
+options:
+    gather_subset:
+        description:
+            - Object types to gather, or C(all).
+        type: list
+        elements: str
+        choices: [all, tenant, logicnetwork, logicrouter, logicswitch, logicsubnet, logicinterface, logicport, endport]
+        default: [all]
+    workers:
+        description:
+            - Maximum number of concurrent requests.
+        type: int
+        default: 8
+    page_size:
+        description:
+            - Number of objects fetched per request.
+        type: int
+        default: 1000
+    snapshot:
+        description:
+            - Also store the gathered objects in a local SQLite snapshot of the controller under C(~/.ansible/ac_snapshots),
+              indexed by id, name and parent ids, with the time each type was read.
+            - The ac_* modules answer queries from it with I(snapshot_max_age), and keep it up to date with their own changes.
+        type: bool
+        default: false
+    sync:
+        description:
+            - With C(full), every object is read and the snapshot of the gathered types, if any, is rewritten.
+            - With C(delta), the snapshot is used and kept. Objects are compared with it by their C(additional.updateAt) time,
+              or their content when they have none, while the pages are read. Only the new, updated and deleted ones are
+              written to it and reported in I(changes).
+            - C(delta) sets no facts; the objects stay in the snapshot, where I(snapshot_max_age) of the ac_* modules and
+              the C(ac_id) lookup find them.
+            - The controller has no filter on C(updateAt), so C(delta) still reads every page. Unchanged objects are dropped
+              as each page arrives, so only the changed ones are held in memory.
+        type: str
+        choices: [full, delta]
+        default: full
+'''
+
+EXAMPLES = '''
+- name: Gather AC facts
+  hosts: localhost
+  gather_facts: false
+  tasks:
+    - name: Read all logical network objects
+      ac_facts:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+    - name: Show the LogicPorts of LogicSwitch "{{logicswitch_id}}"
+      debug:
+        msg: "{{ ac.logicport.by_logicSwitchId[logicswitch_id] | map('extract', ac.logicport.by_id) | list }}"
+    - name: Read only the Tenants and LogicNetworks
+      ac_facts:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+        gather_subset: [tenant, logicnetwork]
+    - name: Refresh the local snapshot
+      ac_facts:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+        snapshot: true
+    - name: Find LogicSwitch web without asking the controller
+      ac_logicswitch:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+        operation: query
+        filters:
+          name: web
+        snapshot_max_age: 3600
+    - name: Refresh the snapshot with the objects changed since the last refresh
+      ac_facts:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        token: "{{token_id}}"
+        sync: delta
+      register: ac_delta
+    - name: Show the LogicPorts changed since the last refresh
+      debug:
+        msg: "{{ ac_delta.changes.logicport.changed }}"
+'''
+
+RETURN = '''
+ansible_facts:
+    description: Facts to add to ansible_facts.
+    returned: when I(sync=full)
+    type: complex
+    contains:
+        ac:
+            description:
+                - One entry per gathered type, e.g. C(logicport), holding the indexes of its objects.
+                - C(by_id) maps ids to objects, C(by_name) maps names to lists of ids.
+                - One C(by_<field>) index per parent maps parent ids to lists of ids, e.g. C(by_tenantId) for LogicNetworks,
+                  C(by_logicNetworkId) for LogicRouters, LogicSwitches and EndPorts, C(by_logicRouterId) for LogicSubnets
+                  and LogicInterfaces, C(by_logicSwitchId) for LogicInterfaces and LogicPorts, C(by_subnetId) for
+                  LogicInterfaces and C(by_logicPortId) for EndPorts.
+            returned: when I(sync=full)
+            type: dict
+changes:
+    description:
+        - Per gathered type, the ids of the objects that were new or updated (C(changed)) and deleted (C(removed))
+          since the snapshot was last refreshed.
+    returned: when I(sync=delta)
+    type: dict
+    sample: {"logicport": {"changed": ["1a2b3c4d-..."], "removed": []}}
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_facts import facts_argument_spec, run_facts
+from ..module_utils.ac_resource import execute
+
+
+def main():
+    module = AnsibleModule(argument_spec=facts_argument_spec(), supports_check_mode=True)
+    execute(module, run_facts)
+
+
+if __name__ == '__main__':
+    main()
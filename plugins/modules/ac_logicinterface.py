@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicinterface
 short_description: Manages LogicInterface on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,175 +27,210 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicInterface exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicInterface is found by I(logicinterface_id), or else by I(logicinterface_name) and I(logicrouter_id).
+            - With C(present), the options set in the task are compared with the current LogicInterface, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing; nothing is written when it already matches.
+            - LogicInterfaces cannot be updated. When a field of an existing LogicInterface differs, the task fails and names
+              the fields.
+        type: str
+        choices: [present, absent]
+    page_size:
+        description:
+            - Number of LogicInterfaces fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicInterfaces returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicInterfaces whose fields have the given values, for example C(name) or C(interfaceType).
+            - C(logicRouterId), C(logicSwitchId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicInterface, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicInterfaces were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicinterface_id:
         description:
             - AC LogicInterface id.
+            - When omitted on create, the id is derived from the LogicInterface's name and LogicRouter, so creating it again
+              reuses the id, and an existing LogicInterface is reported as unchanged instead of failing.
+        type: str
     logicinterface_name:
         description:
             - AC LogicInterface name.
+        type: str
     logicrouter_id:
         description:
             - AC LogicRouter id.
+        type: str
     logicswitch_id:
         description:
             - AC LogicSwitch id.
+        type: str
     logicsubnet_id:
         description:
             - AC LogicSubnet id.
+        type: str
+    items:
+        description:
+            - LogicInterfaces to create with I(operation=create), sent in chunks of at most I(chunk_size) items and I(chunk_bytes) bytes per request.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicinterface_id).
+            - When the controller rejects a chunk because of its content, the chunk is split in half until the rejected items
+              are isolated; the other items are still created.
+        type: list
+        elements: dict
+        suboptions:
+            logicinterface_id:
+                description:
+                    - AC LogicInterface id.
+                type: str
+            logicinterface_name:
+                description:
+                    - AC LogicInterface name.
+                type: str
+            logicrouter_id:
+                description:
+                    - AC LogicRouter id.
+                type: str
+            logicswitch_id:
+                description:
+                    - AC LogicSwitch id.
+                type: str
+            logicsubnet_id:
+                description:
+                    - AC LogicSubnet id.
+                type: str
+    chunk_size:
+        description:
+            - Maximum number of LogicInterfaces sent in one create request.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
 '''
 
 EXAMPLES = '''
-- name: Create LogicInterface
+- name: Manage LogicInterface
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicinterface_name"
-      prompt: "Please input logic interface name "
-      private: no
-    - name: "logicrouter_id"
-      prompt: "Please input logic router id "
-      private: no
-    - name: "logicswitch_id"
-      prompt: "Please input logic switch id "
-      private: no
-    - name: "logicsubnet_id"
-      prompt: "Please input logic subnet id "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicinterface:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicinterface_name is null
-      fail:
-        msg: "Create LogicInterface fail! logicinterface_name is null"
-      when: logicinterface_name == ''
-    - name: check logicrouter_id is null
-      fail:
-        msg: "Create LogicInterface fail! logicrouter_id is null"
-      when: logicrouter_id == ''
-    - name: check logicswitch_id is null
-      fail:
-        msg: "Create LogicInterface fail! logicswitch_id is null"
-      when: logicswitch_id == ''
-    - name: check logicsubnet_id is null
-      fail:
-        msg: "Create LogicInterface fail! logicsubnet_id is null"
-      when: logicsubnet_id == ''
+    - name: Make sure logicinterface "{{logicinterface_name}}" exists as described
+      ac_logicinterface:
+        state: present
+        logicinterface_name: "{{logicinterface_name}}"
+        logicrouter_id: "{{logicrouter_id}}"
+        logicswitch_id: "{{logicswitch_id}}"
+        logicsubnet_id: "{{logicsubnet_id}}"
+      register: logicinterface_result
     - name: Create logicinterface "{{logicinterface_name}}"
-      tags: create_logicinterface
-      vars:
-        logicinterface_info:
-          id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-          name: "{{logicinterface_name}}"
-          interfaceType: "RouterInterface"
-          logicRouterId: "{{logicrouter_id}}"
-          logicSwitchId: "{{logicswitch_id}}"
-          ip:
-            subnetId: "{{logicsubnet_id}}"
-          additional:
-            producer: "default"
-            createAt: "{{now_time}}"
-            updateAt: "{{now_time}}"
-        logicinterface_infos:
-          interface: [ "{{logicinterface_info}}" ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/interfaces'
-        method: POST
-        body: '{{logicinterface_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicinterface:
+        operation: create
+        logicinterface_name: "{{logicinterface_name}}"
+        logicrouter_id: "{{logicrouter_id}}"
+        logicswitch_id: "{{logicswitch_id}}"
+        logicsubnet_id: "{{logicsubnet_id}}"
       register: logicinterface_result
-    - name: response from create logic interface
-      debug:
-        msg: "{{logicinterface_result}}"
-
-- name: Query LogicInterface
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicinterface_id"
-      prompt: "Please input the logic interface id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicinterfaces
-      tags: qeury_logicinterfaces
-      when: logicinterface_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/interfaces'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicinterfaces_result
-      ignore_errors: yes
-    - name: qeury logicinterface "{{logicinterface_id}}"
-      tags: qeury_logicinterface
-      when: logicinterface_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/interfaces/interface/{{logicinterface_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Query logicinterface "{{logicinterface_id}}"
+      ac_logicinterface:
+        operation: query
+        logicinterface_id: "{{logicinterface_id}}"
+      register: logicinterface_result
+    - name: Query logicinterfaces
+      ac_logicinterface:
+        operation: query
+      register: logicinterface_result
+    - name: Query the first 100 logicinterfaces
+      ac_logicinterface:
+        operation: query
+        limit: 100
+      register: logicinterface_result
+    - name: Query the ids and names of the logicinterfaces with logicSwitchId "{{logicswitch_id}}"
+      ac_logicinterface:
+        operation: query
+        filters:
+          logicSwitchId: "{{logicswitch_id}}"
+        fields: [id, name]
       register: logicinterface_result
-      ignore_errors: yes
-    - name: response from get logicinterfaces
-      when: logicinterface_id == ''
-      debug:
-        msg: "{{logicinterfaces_result.json.interface}}"
-    - name: response from query a logicinterface
-      when: logicinterface_id != ''
-      debug:
-        msg: "{{logicinterface_result.json.interface}}"
-
-- name: Delete LogicInterface
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicinterface_id"
-      prompt: "Please input the logic interface id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicinterface_id is null
-      fail:
-        msg: "Delete LogicInterface fail! logicinterface_id is null"
-      when: logicinterface_id == ''
     - name: Delete logicinterface "{{logicinterface_id}}"
-      tags: delete_logicinterface
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/interfaces/interface/{{logicinterface_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicinterface:
+        operation: delete
+        logicinterface_id: "{{logicinterface_id}}"
       register: logicinterface_result
-      ignore_errors: yes
-    - name: response from delete a logicinterface
-      debug:
-        msg: "{{logicinterface_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicInterface that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+interface:
+    description:
+        - The LogicInterface sent to the controller for create and update.
+        - The list of matching LogicInterfaces for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name) when it has one, C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+diff:
+    description: The LogicInterface before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicinterface'),
+                           required_if=resource_required_if('logicinterface'),
+                           supports_check_mode=True)
+    run_module(module, 'logicinterface')
+
+
+if __name__ == '__main__':
+    main()
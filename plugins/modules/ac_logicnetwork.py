@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicnetwork
 short_description: Manages LogicNetwork on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,221 +27,255 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicNetwork exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicNetwork is found by I(logicnetwork_id), or else by I(logicnetwork_name) and I(tenant_id).
+            - With C(present), the options set in the task are compared with the current LogicNetwork, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the LogicNetwork built from the options, and I(state=present) sends the
+              current LogicNetwork with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current LogicNetwork, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(logicnetwork_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its name are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of LogicNetworks fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicNetworks returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicNetworks whose fields have the given values, for example C(name) or C(fabricId).
+            - C(tenantId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicNetwork, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicNetworks were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicnetwork_id:
         description:
             - AC LogicNetwork id.
+            - When omitted on create, the id is derived from the LogicNetwork's name and Tenant, so creating it again
+              reuses the id, and an existing LogicNetwork is reported as unchanged instead of failing.
+        type: str
     logicnetwork_name:
         description:
             - AC LogicNetwork name.
+        type: str
     logicnetwork_desc:
         description:
             - AC LogicNetwork description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
     fabric_id:
         description:
             - AC Fabric id.
+        type: str
     tenant_id:
         description:
             - AC Tenant id.
+        type: str
+    items:
+        description:
+            - LogicNetworks to create with I(operation=create), sent as concurrent single requests on at most I(workers) threads.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicnetwork_id).
+            - Every item is reported, and a failed item does not stop the others.
+        type: list
+        elements: dict
+        suboptions:
+            logicnetwork_id:
+                description:
+                    - AC LogicNetwork id.
+                type: str
+            logicnetwork_name:
+                description:
+                    - AC LogicNetwork name.
+                type: str
+            logicnetwork_desc:
+                description:
+                    - AC LogicNetwork description.
+                type: str
+            fabric_id:
+                description:
+                    - AC Fabric id.
+                type: str
+            tenant_id:
+                description:
+                    - AC Tenant id.
+                type: str
+    cascade:
+        description:
+            - With I(operation=delete), also delete every object below the LogicNetwork, from EndPorts up, before the LogicNetwork itself.
+            - The collections of all types below it are read once, concurrently; each level is then deleted in parallel.
+            - An object is only deleted once everything below it is gone.
+        type: bool
+        default: false
+    workers:
+        description:
+            - Maximum number of concurrent requests when I(cascade=true) or when creating I(items).
+        type: int
+        default: 8
 '''
 
 EXAMPLES = '''
-- name: Create LogicNetwork
+- name: Manage LogicNetwork
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicnetwork_name"
-      prompt: "Please input logic network name "
-      private: no
-    - name: "tenant_id"
-      prompt: "Please input tenant id "
-      private: no
-    - name: "fabric_id"
-      prompt: "Please input fabric id "
-      private: no
-    - name: "logicnetwork_desc"
-      prompt: "Please input logic network description "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicnetwork:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicnetwork_name is null
-      fail:
-        msg: "Create LogicNetwork fail! logicnetwork_name is null"
-      when: logicnetwork_name == ''
-    - name: check tenant_id is null
-      fail:
-        msg: "Create LogicNetwork fail! tenant_id is null"
-      when: tenant_id == ''
-    - name: check fabric_id is null
-      fail:
-        msg: "Create LogicNetwork fail! fabric_id is null"
-      when: fabric_id == ''
-    - name: Create logic network "{{logicnetwork_name}}"
-      tags: create_logicnetwork
-      vars:
-        logicnetwork_info:
-          network:
-            id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-            name: "{{logicnetwork_name}}"
-            description: "{{logicnetwork_desc}}"
-            tenantId: "{{tenant_id}}"
-            fabricId: ["{{fabric_id}}"]
-            additional:
-              producer: "default"
-              createAt: "{{now_time}}"
-              updateAt: "{{now_time}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/networks'
-        method: POST
-        body: '{{logicnetwork_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+    - name: Make sure logicnetwork "{{logicnetwork_name}}" exists as described
+      ac_logicnetwork:
+        state: present
+        logicnetwork_name: "{{logicnetwork_name}}"
+        logicnetwork_desc: "{{logicnetwork_desc}}"
+        tenant_id: "{{tenant_id}}"
+        fabric_id: "{{fabric_id}}"
       register: logicnetwork_result
-    - name: response from create logic network
-      debug:
-        msg: "{{logicnetwork_result}}"
-
-- name: Update LogicNetwork
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicnetwork_id"
-      prompt: "Please input the logic network id that you want to update "
-      private: no
-    - name: "logicnetwork_name"
-      prompt: "Please input logic network name "
-      private: no
-    - name: "logicnetwork_desc"
-      prompt: "Please input logic network description "
-      private: no
-  tasks:
-    - name: check logicnetwork_id is null
-      fail:
-        msg: "Update LogicNetwork fail! logicnetwork_id is null"
-      when: logicnetwork_id == ''
-    - name: check logicnetwork_name is null
-      fail:
-        msg: "Update LogicNetwork fail! logicnetwork_name is null"
-      when: logicnetwork_name == ''
-    - name: Update logic network "{{logicnetwork_id}}"
-      tags: update_logicnetwork
-      vars:
-        logicnetwork_info:
-          network:
-            id: "{{logicnetwork_id}}"
-            name: "{{logicnetwork_name}}"
-            description: "{{logicnetwork_desc}}"
-            additional:
-              updateAt: "{{now_time}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/networks/network/{{logicnetwork_id}}'
-        method: PUT
-        body: '{{logicnetwork_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create logicnetwork "{{logicnetwork_name}}"
+      ac_logicnetwork:
+        operation: create
+        logicnetwork_name: "{{logicnetwork_name}}"
+        logicnetwork_desc: "{{logicnetwork_desc}}"
+        tenant_id: "{{tenant_id}}"
+        fabric_id: "{{fabric_id}}"
       register: logicnetwork_result
-      ignore_errors: yes
-    - name: response from update a logic network
-      debug:
-        msg: "{{logicnetwork_result}}"
-
-- name: Query LogicNetwork
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicnetwork_id"
-      prompt: "Please input the logicnetwork id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicnetworks
-      tags: qeury_logicnetworks
-      when: logicnetwork_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/networks'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicnetworks_result
-      ignore_errors: yes
-    - name: qeury logicnetwork "{{logicnetwork_id}}"
-      tags: qeury_logicnetwork
-      when: logicnetwork_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/networks/network/{{logicnetwork_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create three logicnetworks with one task
+      ac_logicnetwork:
+        operation: create
+        tenant_id: "{{tenant_id}}"
+        fabric_id: "{{fabric_id}}"
+        items:
+          - logicnetwork_name: network-a
+          - logicnetwork_name: network-b
+          - logicnetwork_name: network-c
+      register: logicnetwork_result
+    - name: Update logicnetwork "{{logicnetwork_id}}"
+      ac_logicnetwork:
+        operation: update
+        logicnetwork_id: "{{logicnetwork_id}}"
+        logicnetwork_name: "{{logicnetwork_name}}"
+        logicnetwork_desc: "{{logicnetwork_desc}}"
+      register: logicnetwork_result
+    - name: Query logicnetwork "{{logicnetwork_id}}"
+      ac_logicnetwork:
+        operation: query
+        logicnetwork_id: "{{logicnetwork_id}}"
+      register: logicnetwork_result
+    - name: Query logicnetworks
+      ac_logicnetwork:
+        operation: query
+      register: logicnetwork_result
+    - name: Query the first 100 logicnetworks
+      ac_logicnetwork:
+        operation: query
+        limit: 100
+      register: logicnetwork_result
+    - name: Query the ids and names of the logicnetworks with tenantId "{{tenant_id}}"
+      ac_logicnetwork:
+        operation: query
+        filters:
+          tenantId: "{{tenant_id}}"
+        fields: [id, name]
       register: logicnetwork_result
-      ignore_errors: yes
-    - name: response from get logicnetworks
-      when: logicnetwork_id == ''
-      debug:
-        msg: "{{logicnetworks_result.json.network}}"
-    - name: response from query a logicnetwork
-      when: logicnetwork_id != ''
-      debug:
-        msg: "{{logicnetwork_result.json.network}}"
-
-- name: Delete LogicNetwork
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicnetwork_id"
-      prompt: "Please input the logicnetwork id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicnetwork_id is null
-      fail:
-        msg: "Delete LogicNetwork fail! logicnetwork_id is null"
-      when: logicnetwork_id == ''
     - name: Delete logicnetwork "{{logicnetwork_id}}"
-      tags: delete_logicnetwork
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/networks/network/{{logicnetwork_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicnetwork:
+        operation: delete
+        logicnetwork_id: "{{logicnetwork_id}}"
+      register: logicnetwork_result
+    - name: Delete logicnetwork "{{logicnetwork_id}}" and everything below it
+      ac_logicnetwork:
+        operation: delete
+        logicnetwork_id: "{{logicnetwork_id}}"
+        cascade: true
       register: logicnetwork_result
-      ignore_errors: yes
-    - name: response from delete a logicnetwork
-      debug:
-        msg: "{{logicnetwork_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicNetwork that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+network:
+    description:
+        - The LogicNetwork sent to the controller for create and update.
+        - The list of matching LogicNetworks for query.
+    returned: when operation is not delete
+    type: raw
+deleted:
+    description: With I(cascade=true), one entry per deleted object with its C(type), C(id), C(status) and, when it was not deleted, C(msg).
+    returned: when operation is delete and I(cascade=true)
+    type: list
+    elements: dict
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name), C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current LogicNetwork.
+    returned: when state is present and the LogicNetwork was updated
+    type: list
+    elements: str
+diff:
+    description: The LogicNetwork before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicnetwork'),
+                           required_if=resource_required_if('logicnetwork'),
+                           supports_check_mode=True)
+    run_module(module, 'logicnetwork')
+
+
+if __name__ == '__main__':
+    main()
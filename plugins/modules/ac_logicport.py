@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicport
 short_description: Manages LogicPort on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,279 +27,271 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids and device addresses are checked before any request is made. All items of I(items) are checked before the
+    first request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicPort exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicPort is found by I(logicport_id), or else by I(logicport_name) and I(logicswitch_id).
+            - With C(present), the options set in the task are compared with the current LogicPort, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the LogicPort built from the options, and I(state=present) sends the
+              current LogicPort with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current LogicPort, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(logicport_id) is required then.
+            - LogicPort updates must hold the whole LogicPort, so with C(minimal) the current LogicPort is sent with the changes
+              merged in. The copy already read is used, so no extra request is made for it.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of LogicPorts fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicPorts returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicPorts whose fields have the given values, for example C(name) or C(description).
+            - C(logicSwitchId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicPort, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicPorts were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicport_id:
         description:
             - AC LogicPort id.
+            - When omitted on create, the id is derived from the LogicPort's name and LogicSwitch, so creating it again
+              reuses the id, and an existing LogicPort is reported as unchanged instead of failing.
+        type: str
     logicport_name:
         description:
             - AC LogicPort name.
+        type: str
     logicport_desc:
         description:
             - AC LogicPort description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
     fabric_id:
         description:
             - AC Fabric id.
+        type: str
     logicswitch_id:
         description:
             - AC LogicSwitch id.
+        type: str
     device_ip:
         description:
             - AC Device manage ip.
+        type: str
     port_name:
         description:
             - AC Device port name.
+        type: str
+    items:
+        description:
+            - LogicPorts to create with I(operation=create), sent in chunks of at most I(chunk_size) items and I(chunk_bytes) bytes per request.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicport_id).
+            - When the controller rejects a chunk because of its content, the chunk is split in half until the rejected items
+              are isolated; the other items are still created.
+        type: list
+        elements: dict
+        aliases: [ports]
+        suboptions:
+            logicport_id:
+                description:
+                    - AC LogicPort id.
+                type: str
+            logicport_name:
+                description:
+                    - AC LogicPort name.
+                type: str
+            logicport_desc:
+                description:
+                    - AC LogicPort description.
+                type: str
+            fabric_id:
+                description:
+                    - AC Fabric id.
+                type: str
+            logicswitch_id:
+                description:
+                    - AC LogicSwitch id.
+                type: str
+            device_ip:
+                description:
+                    - AC Device manage ip.
+                type: str
+            port_name:
+                description:
+                    - AC Device port name.
+                type: str
+    chunk_size:
+        description:
+            - Maximum number of LogicPorts sent in one create request.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
 '''
 
 EXAMPLES = '''
-- name: Create LogicPort
+- name: Manage LogicPort
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicport_name"
-      prompt: "Please input logic port name "
-      private: no
-    - name: "logicswitch_id"
-      prompt: "Please input logic switch id "
-      private: no
-    - name: "logicport_desc"
-      prompt: "Please input logic port description "
-      private: no
-    - name: "device_ip"
-      prompt: "Please input device ip "
-      private: no
-    - name: "port_name"
-      prompt: "Please input port name "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicport:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicport_name is null
-      fail:
-        msg: "Create LogicPort fail! logicport_name is null"
-      when: logicport_name == ''
-    - name: check logicswitch_id is null
-      fail:
-        msg: "Create LogicPort fail! logicswitch_id is null"
-      when: logicswitch_id == ''
-    - name: check device_ip is null
-      fail:
-        msg: "Create LogicPort fail! device_ip is null"
-      when: device_ip == ''
-    - name: check port_name is null
-      fail:
-        msg: "Create LogicPort fail! port_name is null"
-      when: port_name == ''
+    - name: Make sure logicport "{{logicport_name}}" exists as described
+      ac_logicport:
+        state: present
+        logicport_name: "{{logicport_name}}"
+        logicport_desc: "{{logicport_desc}}"
+        logicswitch_id: "{{logicswitch_id}}"
+        device_ip: "{{device_ip}}"
+        port_name: "{{port_name}}"
+      register: logicport_result
     - name: Create logicport "{{logicport_name}}"
-      tags: create_logicport
-      vars:
-        location_info:
-          deviceIp: "{{device_ip}}"
-          portName: "{{port_name}}"
-        logicport_info:
-          id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-          name: "{{logicport_name}}"
-          description: "{{logicport_desc}}"
-          logicSwitchId: "{{logicswitch_id}}"
-          accessInfo:
-            mode: "UNI"
-            type: "UNTAG"
-            location: [ "{{location_info}}" ]
-          additional:
-            producer: "default"
-            createAt: "{{now_time}}"
-            updateAt: "{{now_time}}"
-        logicport_infos:
-          port: [ '{{logicport_info}}' ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/ports'
-        method: POST
-        body: '{{logicport_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicport:
+        operation: create
+        logicport_name: "{{logicport_name}}"
+        logicport_desc: "{{logicport_desc}}"
+        logicswitch_id: "{{logicswitch_id}}"
+        device_ip: "{{device_ip}}"
+        port_name: "{{port_name}}"
       register: logicport_result
-    - name: response from create logic port
-      debug:
-        msg: "{{logicport_result}}"
-
-- name: Update LogicPort
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicport_id"
-      prompt: "Please input the logic port id that you want to update "
-      private: no
-    - name: "logicswitch_id"
-      prompt: "Please input logicswitch id "
-      private: no
-    - name: "fabric_id"
-      prompt: "Please input fabric id "
-      private: no
-    - name: "logicport_name"
-      prompt: "Please input logic port name "
-      private: no
-    - name: "logicport_desc"
-      prompt: "Please input logic port description "
-      private: no
-    - name: "device_ip"
-      prompt: "Please input device ip "
-      private: no
-    - name: "port_name"
-      prompt: "Please input port name "
-      private: no
-  tasks:
-    - name: check logicport_id is null
-      fail:
-        msg: "Update LogicPort fail! logicport_id is null"
-      when: logicport_id == ''
-    - name: check logicswitch_id is null
-      fail:
-        msg: "Update LogicPort fail! logicswitch_id is null"
-      when: logicswitch_id == ''
-    - name: check fabric_id is null
-      fail:
-        msg: "Update LogicPort fail! fabric_id is null"
-      when: fabric_id == ''
-    - name: check logicport_name is null
-      fail:
-        msg: "Update LogicPort fail! logicport_name is null"
-      when: logicport_name == ''
-    - name: check device_ip is null
-      fail:
-        msg: "Update LogicPort fail! device_ip is null"
-      when: device_ip == ''
-    - name: check port_name is null
-      fail:
-        msg: "Update LogicPort fail! port_name is null"
-      when: port_name == ''
-    - name: Update logic port "{{logicport_id}}"
-      tags: update_logicport
-      vars:
-        location_info:
-          deviceIp: "{{device_ip}}"
-          portName: "{{port_name}}"
-        logicport_info:
-          id: "{{logicport_id}}"
-          name: "{{logicport_name}}"
-          description: "{{logicport_desc}}"
-          fabricId: "{{fabric_id}}"
-          logicSwitchId: "{{logicswitch_id}}"
-          accessInfo:
-            mode: "UNI"
-            type: "UNTAG"
-            location: [ "{{location_info}}" ]
-          additional:
-            updateAt: "{{now_time}}"
-        logicport_infos:
-          port: [ '{{logicport_info}}' ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/ports/port/{{logicport_id}}'
-        method: PUT
-        body: '{{logicport_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create the logic ports of a rack, 50 per request
+      ac_logicport:
+        operation: create
+        logicswitch_id: "{{logicswitch_id}}"
+        chunk_size: 50
+        items:
+          - logicport_name: rack1-host1
+            device_ip: 10.1.1.1
+            port_name: 10GE1/0/1
+          - logicport_name: rack1-host2
+            device_ip: 10.1.1.1
+            port_name: 10GE1/0/2
       register: logicport_result
-      ignore_errors: yes
-    - name: response from update a logic port
-      debug:
-        msg: "{{logicport_result}}"
-
-- name: Query LogicPort
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicport_id"
-      prompt: "Please input the logic port id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicports
-      tags: qeury_logicports
-      when: logicport_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/ports'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicports_result
-      ignore_errors: yes
-    - name: qeury logicport "{{logicport_id}}"
-      tags: qeury_logicport
-      when: logicport_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/ports/port/{{logicport_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Update logicport "{{logicport_id}}"
+      ac_logicport:
+        operation: update
+        logicport_id: "{{logicport_id}}"
+        logicport_name: "{{logicport_name}}"
+        logicport_desc: "{{logicport_desc}}"
+        fabric_id: "{{fabric_id}}"
+        logicswitch_id: "{{logicswitch_id}}"
+        device_ip: "{{device_ip}}"
+        port_name: "{{port_name}}"
+      register: logicport_result
+    - name: Query logicport "{{logicport_id}}"
+      ac_logicport:
+        operation: query
+        logicport_id: "{{logicport_id}}"
+      register: logicport_result
+    - name: Query logicports
+      ac_logicport:
+        operation: query
+      register: logicport_result
+    - name: Query the first 100 logicports
+      ac_logicport:
+        operation: query
+        limit: 100
+      register: logicport_result
+    - name: Query the ids and names of the logicports with logicSwitchId "{{logicswitch_id}}"
+      ac_logicport:
+        operation: query
+        filters:
+          logicSwitchId: "{{logicswitch_id}}"
+        fields: [id, name]
       register: logicport_result
-      ignore_errors: yes
-    - name: response from get logicports
-      when: logicport_id == ''
-      debug:
-        msg: "{{logicports_result.json.port}}"
-    - name: response from query a logicport
-      when: logicport_id != ''
-      debug:
-        msg: "{{logicport_result.json.port}}"
-
-- name: Delete LogicPort
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicport_id"
-      prompt: "Please input the logic port id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicport_id is null
-      fail:
-        msg: "Delete LogicPort fail! logicport_id is null"
-      when: logicport_id == ''
     - name: Delete logicport "{{logicport_id}}"
-      tags: delete_logicport
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/ports/port/{{logicport_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicport:
+        operation: delete
+        logicport_id: "{{logicport_id}}"
       register: logicport_result
-      ignore_errors: yes
-    - name: response from delete a logicport
-      debug:
-        msg: "{{logicport_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicPort that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+port:
+    description:
+        - The LogicPort sent to the controller for create and update.
+        - The list of matching LogicPorts for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name), C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+    sample: [{"id": "7f1c...", "name": "rack1-host1", "status": "created"}]
+differences:
+    description: With I(state=present), the fields that differed from the current LogicPort.
+    returned: when state is present and the LogicPort was updated
+    type: list
+    elements: str
+diff:
+    description: The LogicPort before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicport'),
+                           required_if=resource_required_if('logicport'),
+                           supports_check_mode=True)
+    run_module(module, 'logicport')
+
+
+if __name__ == '__main__':
+    main()
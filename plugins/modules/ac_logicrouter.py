@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicrouter
 short_description: Manages LogicRouter on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,225 +27,237 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicRouter exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicRouter is found by I(logicrouter_id), or else by I(logicrouter_name) and I(logicnetwork_id).
+            - With C(present), the options set in the task are compared with the current LogicRouter, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the LogicRouter built from the options, and I(state=present) sends the
+              current LogicRouter with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current LogicRouter, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(logicrouter_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its name are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of LogicRouters fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicRouters returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicRouters whose fields have the given values, for example C(name) or C(description).
+            - C(logicNetworkId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicRouter, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicRouters were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicrouter_id:
         description:
             - AC LogicRouter id.
+            - When omitted on create, the id is derived from the LogicRouter's name and LogicNetwork, so creating it again
+              reuses the id, and an existing LogicRouter is reported as unchanged instead of failing.
+        type: str
     logicrouter_name:
         description:
             - AC LogicRouter name.
+        type: str
     logicrouter_desc:
         description:
             - AC LogicRouter description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
     fabric_id:
         description:
             - AC Fabric id.
+        type: str
     logicnetwork_id:
         description:
             - AC LogicNetwork id.
+        type: str
+    items:
+        description:
+            - LogicRouters to create with I(operation=create), sent as concurrent single requests on at most I(workers) threads.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicrouter_id).
+            - Every item is reported, and a failed item does not stop the others.
+        type: list
+        elements: dict
+        suboptions:
+            logicrouter_id:
+                description:
+                    - AC LogicRouter id.
+                type: str
+            logicrouter_name:
+                description:
+                    - AC LogicRouter name.
+                type: str
+            logicrouter_desc:
+                description:
+                    - AC LogicRouter description.
+                type: str
+            fabric_id:
+                description:
+                    - AC Fabric id.
+                type: str
+            logicnetwork_id:
+                description:
+                    - AC LogicNetwork id.
+                type: str
+    workers:
+        description:
+            - Maximum number of concurrent requests when creating I(items).
+        type: int
+        default: 8
 '''
 
 EXAMPLES = '''
-- name: Create LogicRouter
+- name: Manage LogicRouter
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicrouter_name"
-      prompt: "Please input logic router name "
-      private: no
-    - name: "logicnetwork_id"
-      prompt: "Please input logic network id "
-      private: no
-    - name: "logicrouter_desc"
-      prompt: "Please input logic router description "
-      private: no
-    - name: "fabric_id"
-      prompt: "Please input fabric id "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicrouter:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicrouter_name is null
-      fail:
-        msg: "Create LogicRouter fail! logicrouter_name is null"
-      when: logicrouter_name == ''
-    - name: check logicnetwork_id is null
-      fail:
-        msg: "Create LogicRouter fail! logicnetwork_id is null"
-      when: logicnetwork_id == ''
-    - name: check fabric_id is null
-      fail:
-        msg: "Create LogicRouter fail! fabric_id is null"
-      when: fabric_id == ''
+    - name: Make sure logicrouter "{{logicrouter_name}}" exists as described
+      ac_logicrouter:
+        state: present
+        logicrouter_name: "{{logicrouter_name}}"
+        logicrouter_desc: "{{logicrouter_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
+        fabric_id: "{{fabric_id}}"
+      register: logicrouter_result
     - name: Create logicrouter "{{logicrouter_name}}"
-      tags: create_logicrouter
-      vars:
-        routerLocation_info:
-          fabricId: "{{fabric_id}}"
-          fabricRole: "master"
-        logicrouter_info:
-          router:
-            id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-            name: "{{logicrouter_name}}"
-            description: "{{logicrouter_desc}}"
-            logicNetworkId: "{{logicnetwork_id}}"
-            type: "Normal"
-            routerLocations: ["{{routerLocation_info}}"]
-            additional:
-              producer: "default"
-              createAt: "{{now_time}}"
-              updateAt: "{{now_time}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/routers'
-        method: POST
-        body: '{{logicrouter_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicrouter:
+        operation: create
+        logicrouter_name: "{{logicrouter_name}}"
+        logicrouter_desc: "{{logicrouter_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
+        fabric_id: "{{fabric_id}}"
       register: logicrouter_result
-    - name: response from create logic router
-      debug:
-        msg: "{{logicrouter_result}}"
-
-- name: Update LogicRouter
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicrouter_id"
-      prompt: "Please input the logic router id that you want to update "
-      private: no
-    - name: "logicrouter_name"
-      prompt: "Please input logic router name "
-      private: no
-    - name: "logicrouter_desc"
-      prompt: "Please input logic router description "
-      private: no
-  tasks:
-    - name: check logicrouter_id is null
-      fail:
-        msg: "Update LogicRouter fail! logicrouter_id is null"
-      when: logicrouter_id == ''
-    - name: check logicrouter_name is null
-      fail:
-        msg: "Update LogicRouter fail! logicrouter_name is null"
-      when: logicrouter_name == ''
-    - name: Update logic router "{{logicrouter_id}}"
-      tags: update_logicrouter
-      vars:
-        logicrouter_info:
-          router:
-            id: "{{logicrouter_id}}"
-            name: "{{logicrouter_name}}"
-            description: "{{logicrouter_desc}}"
-            additional:
-              updateAt: "{{now_time}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/routers/router/{{logicrouter_id}}'
-        method: PUT
-        body: '{{logicrouter_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create three logicrouters with one task
+      ac_logicrouter:
+        operation: create
+        logicnetwork_id: "{{logicnetwork_id}}"
+        fabric_id: "{{fabric_id}}"
+        items:
+          - logicrouter_name: router-a
+          - logicrouter_name: router-b
+          - logicrouter_name: router-c
       register: logicrouter_result
-      ignore_errors: yes
-    - name: response from update a logic router
-      debug:
-        msg: "{{logicrouter_result}}"
-
-- name: Query LogicRouter
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicrouter_id"
-      prompt: "Please input the logic router id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicrouters
-      tags: qeury_logicrouters
-      when: logicrouter_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/routers'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicrouters_result
-      ignore_errors: yes
-    - name: qeury logicrouter "{{logicrouter_id}}"
-      tags: qeury_logicrouter
-      when: logicrouter_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/routers/router/{{logicrouter_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Update logicrouter "{{logicrouter_id}}"
+      ac_logicrouter:
+        operation: update
+        logicrouter_id: "{{logicrouter_id}}"
+        logicrouter_name: "{{logicrouter_name}}"
+        logicrouter_desc: "{{logicrouter_desc}}"
+      register: logicrouter_result
+    - name: Query logicrouter "{{logicrouter_id}}"
+      ac_logicrouter:
+        operation: query
+        logicrouter_id: "{{logicrouter_id}}"
+      register: logicrouter_result
+    - name: Query logicrouters
+      ac_logicrouter:
+        operation: query
+      register: logicrouter_result
+    - name: Query the first 100 logicrouters
+      ac_logicrouter:
+        operation: query
+        limit: 100
+      register: logicrouter_result
+    - name: Query the ids and names of the logicrouters with logicNetworkId "{{logicnetwork_id}}"
+      ac_logicrouter:
+        operation: query
+        filters:
+          logicNetworkId: "{{logicnetwork_id}}"
+        fields: [id, name]
       register: logicrouter_result
-      ignore_errors: yes
-    - name: response from get logicrouters
-      when: logicrouter_id == ''
-      debug:
-        msg: "{{logicrouters_result.json.router}}"
-    - name: response from query a logicrouter
-      when: logicrouter_id != ''
-      debug:
-        msg: "{{logicrouter_result.json.router}}"
-
-- name: Delete LogicRouter
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicrouter_id"
-      prompt: "Please input the logic router id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicrouter_id is null
-      fail:
-        msg: "Delete LogicRouter fail! logicrouter_id is null"
-      when: logicrouter_id == ''
     - name: Delete logicrouter "{{logicrouter_id}}"
-      tags: delete_logicrouter
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/routers/router/{{logicrouter_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicrouter:
+        operation: delete
+        logicrouter_id: "{{logicrouter_id}}"
       register: logicrouter_result
-      ignore_errors: yes
-    - name: response from delete a logicrouter
-      debug:
-        msg: "{{logicrouter_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicRouter that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+router:
+    description:
+        - The LogicRouter sent to the controller for create and update.
+        - The list of matching LogicRouters for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name), C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current LogicRouter.
+    returned: when state is present and the LogicRouter was updated
+    type: list
+    elements: str
+diff:
+    description: The LogicRouter before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicrouter'),
+                           required_if=resource_required_if('logicrouter'),
+                           supports_check_mode=True)
+    run_module(module, 'logicrouter')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicsubnet
 short_description: Manages LogicSubnet on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,220 +27,232 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids, CIDRs and gateway addresses are checked before any request is made. All items of I(items) are checked
+    before the first request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicSubnet exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicSubnet is found by I(logicsubnet_id), or else by I(cidr) and I(logicrouter_id).
+            - With C(present), the options set in the task are compared with the current LogicSubnet, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the LogicSubnet built from the options, and I(state=present) sends the
+              current LogicSubnet with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current LogicSubnet, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(logicsubnet_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its C(cidr) and C(gatewayIp) are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of LogicSubnets fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicSubnets returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicSubnets whose fields have the given values, for example C(cidr) or C(gatewayIp).
+            - C(logicRouterId) is also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicSubnet, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicSubnets were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicsubnet_id:
         description:
             - AC LogicSubnet id.
+            - When omitted on create, the id is derived from the LogicSubnet's CIDR and LogicRouter, so creating it again
+              reuses the id, and an existing LogicSubnet is reported as unchanged instead of failing.
+        type: str
     logicrouter_id:
         description:
             - AC LogicRouter id.
+        type: str
     cidr:
         description:
-            - AC LogicSubnet cidr.
+            - AC LogicSubnet cidr, a network address with a prefix length such as C(10.1.1.0/24).
+        type: str
     gateway_ip:
         description:
-            - AC LogicSubnet gateway ip.
+            - AC LogicSubnet gateway ip, which must lie inside I(cidr).
+        type: str
+    items:
+        description:
+            - LogicSubnets to create with I(operation=create), sent in chunks of at most I(chunk_size) items and I(chunk_bytes) bytes per request.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicsubnet_id).
+            - When the controller rejects a chunk because of its content, the chunk is split in half until the rejected items
+              are isolated; the other items are still created.
+        type: list
+        elements: dict
+        suboptions:
+            logicsubnet_id:
+                description:
+                    - AC LogicSubnet id.
+                type: str
+            logicrouter_id:
+                description:
+                    - AC LogicRouter id.
+                type: str
+            cidr:
+                description:
+                    - AC LogicSubnet cidr.
+                type: str
+            gateway_ip:
+                description:
+                    - AC LogicSubnet gateway ip.
+                type: str
+    chunk_size:
+        description:
+            - Maximum number of LogicSubnets sent in one create request.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
 '''
 
 EXAMPLES = '''
-- name: Create LogicSubnet
+- name: Manage LogicSubnet
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicrouter_id"
-      prompt: "Please input logic router id "
-      private: no
-    - name: "cidr"
-      prompt: "Please input cidr "
-      private: no
-    - name: "gateway_ip"
-      prompt: "Please input gateway ip "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicsubnet:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicrouter_id is null
-      fail:
-        msg: "Create LogicSubnet fail! logicrouter_id is null"
-      when: logicrouter_id == ''
-    - name: check cidr is null
-      fail:
-        msg: "Create LogicSubnet fail! cidr is null"
-      when: cidr == ''
-    - name: check gateway_ip is null
-      fail:
-        msg: "Create LogicSubnet fail! gateway_ip is null"
-      when: gateway_ip == ''
-    - name: Create logicsubnet "{{logicsubnet_name}}"
-      tags: create_logicsubnet
-      vars:
-        logicsubnet_info:
-          id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-          cidr: "{{cidr}}"
-          gatewayIp: "{{gateway_ip}}"
-          logicRouterId: "{{logicrouter_id}}"
-          additional:
-            producer: "default"
-            createAt: "{{now_time}}"
-            updateAt: "{{now_time}}"
-        logicsubnet_infos:
-          subnet: [ "{{logicsubnet_info}}" ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/subnets'
-        method: POST
-        body: '{{logicsubnet_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+    - name: Make sure logicsubnet "{{cidr}}" exists as described
+      ac_logicsubnet:
+        state: present
+        logicrouter_id: "{{logicrouter_id}}"
+        cidr: "{{cidr}}"
+        gateway_ip: "{{gateway_ip}}"
       register: logicsubnet_result
-    - name: response from create logic subnet
-      debug:
-        msg: "{{logicsubnet_result}}"
-
-- name: Update LogicSubnet
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicsubnet_id"
-      prompt: "Please input the logic subnet id that you want to update "
-      private: no
-    - name: "cidr"
-      prompt: "Please input cidr "
-      private: no
-    - name: "gateway_ip"
-      prompt: "Please input gateway ip "
-      private: no
-  tasks:
-    - name: check logicsubnet_id is null
-      fail:
-        msg: "Update LogicSubnet fail! logicsubnet_id is null"
-      when: logicsubnet_id == ''
-    - name: check cidr is null
-      fail:
-        msg: "Update LogicSubnet fail! cidr is null"
-      when: cidr == ''
-    - name: check gateway_ip is null
-      fail:
-        msg: "Update LogicSubnet fail! gateway_ip is null"
-      when: gateway_ip == ''
-    - name: Update logic subnet "{{logicsubnet_id}}"
-      tags: update_logicsubnet
-      vars:
-        logicsubnet_info:
-          id: "{{logicsubnet_id}}"
-          cidr: "{{cidr}}"
-          gatewayIp: "{{gateway_ip}}"
-          additional:
-            updateAt: "{{now_time}}"
-        logicsubnet_infos:
-          subnet: [ "{{logicsubnet_info}}" ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/subnets/subnet/{{logicsubnet_id}}'
-        method: PUT
-        body: '{{logicsubnet_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create logicsubnets
+      ac_logicsubnet:
+        operation: create
+        logicrouter_id: "{{logicrouter_id}}"
+        cidr: "{{cidr}}"
+        gateway_ip: "{{gateway_ip}}"
       register: logicsubnet_result
-      ignore_errors: yes
-    - name: response from update a logic subnet
-      debug:
-        msg: "{{logicsubnet_result}}"
-
-- name: Query LogicSubnet
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicsubnet_id"
-      prompt: "Please input the logic subnet id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicsubnets
-      tags: qeury_logicsubnets
-      when: logicsubnet_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/subnets'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicsubnets_result
-      ignore_errors: yes
-    - name: qeury logicsubnet "{{logicsubnet_id}}"
-      tags: qeury_logicsubnet
-      when: logicsubnet_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/subnets/subnet/{{logicsubnet_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Create the subnets of a router in one request
+      ac_logicsubnet:
+        operation: create
+        logicrouter_id: "{{logicrouter_id}}"
+        items:
+          - cidr: 192.168.10.0/24
+            gateway_ip: 192.168.10.1
+          - cidr: 192.168.11.0/24
+            gateway_ip: 192.168.11.1
+      register: logicsubnet_result
+    - name: Update logicsubnet "{{logicsubnet_id}}"
+      ac_logicsubnet:
+        operation: update
+        logicsubnet_id: "{{logicsubnet_id}}"
+        cidr: "{{cidr}}"
+        gateway_ip: "{{gateway_ip}}"
+      register: logicsubnet_result
+    - name: Query logicsubnet "{{logicsubnet_id}}"
+      ac_logicsubnet:
+        operation: query
+        logicsubnet_id: "{{logicsubnet_id}}"
+      register: logicsubnet_result
+    - name: Query logicsubnets
+      ac_logicsubnet:
+        operation: query
+      register: logicsubnet_result
+    - name: Query the first 100 logicsubnets
+      ac_logicsubnet:
+        operation: query
+        limit: 100
+      register: logicsubnet_result
+    - name: Query the ids and names of the logicsubnets with logicRouterId "{{logicrouter_id}}"
+      ac_logicsubnet:
+        operation: query
+        filters:
+          logicRouterId: "{{logicrouter_id}}"
+        fields: [id, name]
       register: logicsubnet_result
-      ignore_errors: yes
-    - name: response from get logicsubnets
-      when: logicsubnet_id == ''
-      debug:
-        msg: "{{logicsubnets_result.json.subnet}}"
-    - name: response from query a logicsubnet
-      when: logicsubnet_id != ''
-      debug:
-        msg: "{{logicsubnet_result.json.subnet}}"
-
-- name: Delete LogicSubnet
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicsubnet_id"
-      prompt: "Please input the logic subnet id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicsubnet_id is null
-      fail:
-        msg: "Delete LogicSubnet fail! logicsubnet_id is null"
-      when: logicsubnet_id == ''
     - name: Delete logicsubnet "{{logicsubnet_id}}"
-      tags: delete_logicsubnet
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/subnets/subnet/{{logicsubnet_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicsubnet:
+        operation: delete
+        logicsubnet_id: "{{logicsubnet_id}}"
       register: logicsubnet_result
-      ignore_errors: yes
-    - name: response from delete a logicsubnet
-      debug:
-        msg: "{{logicsubnet_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicSubnet that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+subnet:
+    description:
+        - The LogicSubnet sent to the controller for create and update.
+        - The list of matching LogicSubnets for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name) when it has one, C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current LogicSubnet.
+    returned: when state is present and the LogicSubnet was updated
+    type: list
+    elements: str
+diff:
+    description: The LogicSubnet before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicsubnet'),
+                           required_if=resource_required_if('logicsubnet'),
+                           supports_check_mode=True)
+    run_module(module, 'logicsubnet')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_logicswitch
 short_description: Manages LogicSwitch on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,213 +27,223 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the LogicSwitch exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The LogicSwitch is found by I(logicswitch_id), or else by I(logicswitch_name) and I(logicnetwork_id).
+            - With C(present), the options set in the task are compared with the current LogicSwitch, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the LogicSwitch built from the options, and I(state=present) sends the
+              current LogicSwitch with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current LogicSwitch, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(logicswitch_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its name are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of LogicSwitches fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of LogicSwitches returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the LogicSwitches whose fields have the given values, for example C(name) or C(description).
+            - C(logicNetworkId) and C(name) are also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned LogicSwitch, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its LogicSwitches were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     logicswitch_id:
         description:
             - AC LogicSwitch id.
+            - When omitted on create, the id is derived from the LogicSwitch's name and LogicNetwork, so creating it again
+              reuses the id, and an existing LogicSwitch is reported as unchanged instead of failing.
+        type: str
     logicswitch_name:
         description:
             - AC LogicSwitch name.
+        type: str
     logicswitch_desc:
         description:
             - AC LogicSwitch description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
     logicnetwork_id:
         description:
             - AC LogicNetwork id.
+        type: str
+    items:
+        description:
+            - LogicSwitches to create with I(operation=create), sent in chunks of at most I(chunk_size) items and I(chunk_bytes) bytes per request.
+            - Options left out of an item are taken from the top-level options of the same name, except I(logicswitch_id).
+            - When the controller rejects a chunk because of its content, the chunk is split in half until the rejected items
+              are isolated; the other items are still created.
+        type: list
+        elements: dict
+        suboptions:
+            logicswitch_id:
+                description:
+                    - AC LogicSwitch id.
+                type: str
+            logicswitch_name:
+                description:
+                    - AC LogicSwitch name.
+                type: str
+            logicswitch_desc:
+                description:
+                    - AC LogicSwitch description.
+                type: str
+            logicnetwork_id:
+                description:
+                    - AC LogicNetwork id.
+                type: str
+    chunk_size:
+        description:
+            - Maximum number of LogicSwitches sent in one create request.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
 '''
 
 EXAMPLES = '''
-- name: Create LogicSwitch
+- name: Manage LogicSwitch
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicswitch_name"
-      prompt: "Please input logic switch name "
-      private: no
-    - name: "logicnetwork_id"
-      prompt: "Please input logic network id "
-      private: no
-    - name: "logicswitch_desc"
-      prompt: "Please input logic switch description "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_logicswitch:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check logicswitch_name is null
-      fail:
-        msg: "Create LogicSwitch fail! logicswitch_name is null"
-      when: logicswitch_name == ''
-    - name: check logicnetwork_id is null
-      fail:
-        msg: "Create LogicSwitch fail! logicnetwork_id is null"
-      when: logicnetwork_id == ''
+    - name: Make sure logicswitch "{{logicswitch_name}}" exists as described
+      ac_logicswitch:
+        state: present
+        logicswitch_name: "{{logicswitch_name}}"
+        logicswitch_desc: "{{logicswitch_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
+      register: logicswitch_result
     - name: Create logicswitch "{{logicswitch_name}}"
-      tags: create_logicswitch
-      vars:
-        logicswitch_info:
-          id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-          name: "{{logicswitch_name}}"
-          description: "{{logicswitch_desc}}"
-          logicNetworkId: "{{logicnetwork_id}}"
-          additional:
-            producer: "default"
-            createAt: "{{now_time}}"
-            updateAt: "{{now_time}}"
-        logicswitch_infos:
-          switch: [ "{{logicswitch_info}}" ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/switchs'
-        method: POST
-        body: '{{logicswitch_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicswitch:
+        operation: create
+        logicswitch_name: "{{logicswitch_name}}"
+        logicswitch_desc: "{{logicswitch_desc}}"
+        logicnetwork_id: "{{logicnetwork_id}}"
       register: logicswitch_result
-    - name: response from create logic switch
-      debug:
-        msg: "{{logicswitch_result}}"
-
-- name: Update LogicSwitch
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicswitch_id"
-      prompt: "Please input the logic switch id that you want to update "
-      private: no
-    - name: "logicswitch_name"
-      prompt: "Please input logic switch name "
-      private: no
-    - name: "logicswitch_desc"
-      prompt: "Please input logic switch description "
-      private: no
-  tasks:
-    - name: check logicswitch_id is null
-      fail:
-        msg: "Update LogicSwitch fail! logicswitch_id is null"
-      when: logicswitch_id == ''
-    - name: check logicswitch_name is null
-      fail:
-        msg: "Update LogicSwitch fail! logicswitch_name is null"
-      when: logicswitch_name == ''
-    - name: Update logic switch "{{logicswitch_id}}"
-      tags: update_logicswitch
-      vars:
-        logicswitch_info:
-          id: "{{logicswitch_id}}"
-          name: "{{logicswitch_name}}"
-          description: "{{logicswitch_desc}}"
-          logicNetworkId: ""
-          additional:
-            updateAt: "{{now_time}}"
-        logicswitch_infos:
-          switch: [ "{{logicswitch_info}}" ]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/switchs/switch/{{logicswitch_id}}'
-        method: PUT
-        body: '{{logicswitch_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Update logicswitch "{{logicswitch_id}}"
+      ac_logicswitch:
+        operation: update
+        logicswitch_id: "{{logicswitch_id}}"
+        logicswitch_name: "{{logicswitch_name}}"
+        logicswitch_desc: "{{logicswitch_desc}}"
       register: logicswitch_result
-      ignore_errors: yes
-    - name: response from update a logic switch
-      debug:
-        msg: "{{logicswitch_result}}"
-
-- name: Query LogicSwitch
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicswitch_id"
-      prompt: "Please input the logic switch id that you want to query "
-      private: no
-  tasks:
-    - name: qeury logicswitchs
-      tags: qeury_logicswitchs
-      when: logicswitch_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/switchs'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: logicswitchs_result
-      ignore_errors: yes
-    - name: qeury logicswitch "{{logicswitch_id}}"
-      tags: qeury_logicswitch
-      when: logicswitch_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/switchs/switch/{{logicswitch_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Query logicswitch "{{logicswitch_id}}"
+      ac_logicswitch:
+        operation: query
+        logicswitch_id: "{{logicswitch_id}}"
+      register: logicswitch_result
+    - name: Query logicswitchs
+      ac_logicswitch:
+        operation: query
+      register: logicswitch_result
+    - name: Query the first 100 logicswitchs
+      ac_logicswitch:
+        operation: query
+        limit: 100
+      register: logicswitch_result
+    - name: Query the ids and names of the logicswitches with logicNetworkId "{{logicnetwork_id}}"
+      ac_logicswitch:
+        operation: query
+        filters:
+          logicNetworkId: "{{logicnetwork_id}}"
+        fields: [id, name]
       register: logicswitch_result
-      ignore_errors: yes
-    - name: response from get logicswitchs
-      when: logicswitch_id == ''
-      debug:
-        msg: "{{logicswitchs_result.json.switch}}"
-    - name: response from query a logicswitch
-      when: logicswitch_id != ''
-      debug:
-        msg: "{{logicswitch_result.json.switch}}"
-
-- name: Delete LogicSwitch
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "logicswitch_id"
-      prompt: "Please input the logic switch id that you want to delete "
-      private: no
-  tasks:
-    - name: check logicswitch_id is null
-      fail:
-        msg: "Delete LogicSwitch fail! logicswitch_id is null"
-      when: logicswitch_id == ''
     - name: Delete logicswitch "{{logicswitch_id}}"
-      tags: delete_logicswitch
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/logicnetwork/switchs/switch/{{logicswitch_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_logicswitch:
+        operation: delete
+        logicswitch_id: "{{logicswitch_id}}"
       register: logicswitch_result
-      ignore_errors: yes
-    - name: response from delete a logicswitch
-      debug:
-        msg: "{{logicswitch_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the LogicSwitch that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+switch:
+    description:
+        - The LogicSwitch sent to the controller for create and update.
+        - The list of matching LogicSwitchs for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name) when it has one, C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current LogicSwitch.
+    returned: when state is present and the LogicSwitch was updated
+    type: list
+    elements: str
+diff:
+    description: The LogicSwitch before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('logicswitch'),
+                           required_if=resource_required_if('logicswitch'),
+                           supports_check_mode=True)
+    run_module(module, 'logicswitch')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,9 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_tenant
 short_description: Manages Tenant on HUAWEI iMaster NCE-Fabric Controller.
@@ -24,217 +27,262 @@ description:
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
-  - This module depends on module 'GET_TOKEN'.
+  - Ids are checked to be UUIDs before any request is made. All items of I(items) are checked before the first
+    request and every problem is reported at once.
   - This module also works with C(local) connections for legacy playbooks.
+extends_documentation_fragment:
+  - huawei.ac.ac
 options:
+    operation:
+        description:
+            - Operation to run against the controller.
+        type: str
+        choices: [create, update, query, delete]
+        default: query
+    state:
+        description:
+            - Make the Tenant exist as described (C(present)) or not exist (C(absent)). When set, I(operation) is ignored.
+            - The Tenant is found by I(tenant_id), or else by I(tenant_name).
+            - With C(present), the options set in the task are compared with the current Tenant, ignoring the fields the
+              controller maintains such as C(additional). It is created when missing and updated in place when a field differs;
+              nothing is written when it already matches.
+        type: str
+        choices: [present, absent]
+    update_mode:
+        description:
+            - How updates are sent, with I(operation=update) or I(state=present).
+            - With C(full), I(operation=update) sends the Tenant built from the options, and I(state=present) sends the
+              current Tenant with the changes merged in.
+            - With C(minimal), I(operation=update) first reads the current Tenant, from the snapshot when I(snapshot_max_age)
+              allows it, and writes nothing when it already matches. Only I(tenant_id) is required then.
+            - With C(minimal), only the id, the changed top-level fields and its name are sent.
+        type: str
+        choices: [full, minimal]
+        default: full
+    page_size:
+        description:
+            - Number of Tenants fetched per request when querying without an id.
+            - Pages are requested one after the other with C(pageIndex) and C(pageSize) and only until I(limit) is reached.
+        type: int
+        default: 1000
+    limit:
+        description:
+            - Maximum number of Tenants returned when querying without an id.
+            - By default all of them are returned.
+        type: int
+    filters:
+        description:
+            - Return only the Tenants whose fields have the given values, for example C(name) or C(description).
+            - C(name) is also passed to the controller; every field is matched while the pages are read.
+            - A field holding a list matches when one of its values does.
+        type: dict
+        default: {}
+    fields:
+        description:
+            - Keep only these keys of each returned Tenant, to keep registered results small.
+        type: list
+        elements: str
+    snapshot_max_age:
+        description:
+            - Answer queries from the local snapshot written by M(huawei.ac.ac_facts) with I(snapshot=true) when its Tenants were read
+              from the controller at most this many seconds ago. Name and parent id filters use the indexes of the snapshot.
+            - Otherwise, and by default, the controller is queried.
+            - Creates, updates and deletes made by the modules are applied to an existing snapshot as well.
+        type: int
     tenant_id:
         description:
             - AC Tenant id.
+            - When omitted on create, the id is derived from the Tenant's name, so creating it again
+              reuses the id, and an existing Tenant is reported as unchanged instead of failing.
+        type: str
     tenant_name:
         description:
             - AC Tenant name.
+        type: str
     tenant_desc:
         description:
             - AC Tenant description.
+            - Empty when an object is created without it. Updates and I(state) leave the description alone when it is not set.
+        type: str
     fabric_id:
         description:
             - AC Fabric id.
+        type: str
+    items:
+        description:
+            - Tenants to create with I(operation=create), sent in chunks of at most I(chunk_size) items and I(chunk_bytes) bytes per request.
+            - Options left out of an item are taken from the top-level options of the same name, except I(tenant_id).
+            - When the controller rejects a chunk because of its content, the chunk is split in half until the rejected items
+              are isolated; the other items are still created.
+        type: list
+        elements: dict
+        suboptions:
+            tenant_id:
+                description:
+                    - AC Tenant id.
+                type: str
+            tenant_name:
+                description:
+                    - AC Tenant name.
+                type: str
+            tenant_desc:
+                description:
+                    - AC Tenant description.
+                type: str
+            fabric_id:
+                description:
+                    - AC Fabric id.
+                type: str
+    chunk_size:
+        description:
+            - Maximum number of Tenants sent in one create request.
+        type: int
+        default: 100
+    chunk_bytes:
+        description:
+            - Maximum size in bytes of the JSON body of one create request.
+        type: int
+        default: 1048576
+    cascade:
+        description:
+            - With I(operation=delete), also delete every object below the Tenant, from EndPorts up, before the Tenant itself.
+            - The collections of all types below it are read once, concurrently; each level is then deleted in parallel.
+            - An object is only deleted once everything below it is gone.
+        type: bool
+        default: false
+    workers:
+        description:
+            - Maximum number of concurrent requests when I(cascade=true).
+        type: int
+        default: 8
 '''
 
 EXAMPLES = '''
-- name: Create Tenant
+- name: Manage Tenant
   hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "tenant_name"
-      prompt: "Please input tenant name "
-      private: no
-    - name: "tenant_desc"
-      prompt: "Please input tenant description "
-      private: no
-    - name: "fabric_id"
-      prompt: "Please input fabric id "
-      private: no
+  gather_facts: false
+  module_defaults:
+    ac_tenant:
+      north_ip: "{{north_ip}}"
+      north_port: "{{north_port}}"
+      token: "{{token_id}}"
   tasks:
-    - name: check tenant_name is null
-      fail:
-        msg: "Create Tenant fail! tenant_name is null"
-      when: tenant_name == ''
-    - name: fabric_id is not null
-      when: fabric_id != ''
-      vars:
-        fabricIds: ["{{fabric_id}}"]
-      debug: var=fabricIds
-    - name: fabric_id is null
-      when: fabric_id == ''
-      vars:
-        fabricIds: []
-      debug: var=fabricIds
+    - name: Make sure tenant "{{tenant_name}}" exists as described
+      ac_tenant:
+        state: present
+        tenant_name: "{{tenant_name}}"
+        tenant_desc: "{{tenant_desc}}"
+        fabric_id: "{{fabric_id}}"
+      register: tenant_result
     - name: Create tenant "{{tenant_name}}"
-      tags: create_tenant
-      vars:
-        tenant_info:
-          id: "{{ansible_date_time.iso8601_micro | to_uuid}}"
-          name: "{{tenant_name}}"
-          description: "{{tenant_desc}}"
-          producer: "default"
-          createAt: "{{now_time}}"
-          updateAt: "{{now_time}}"
-          resPool:
-            fabricIds: "{{fabric_id}}"
-        tenant_infos:
-          tenant: ["{{tenant_info}}"]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/tenants'
-        method: POST
-        body: '{{tenant_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+      ac_tenant:
+        operation: create
+        tenant_name: "{{tenant_name}}"
+        tenant_desc: "{{tenant_desc}}"
+        fabric_id: "{{fabric_id}}"
       register: tenant_result
-    - name: response from create tenant
-      debug:
-        msg: "{{tenant_result}}"
-
-- name: Update Tenant
-  hosts: localhost
-  serial: True
-  vars:
-    now_time: "{{ansible_date_time.date}} {{ansible_date_time.time}}"
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "tenant_id"
-      prompt: "Please input the tenant id that you want to update "
-      private: no
-    - name: "tenant_name"
-      prompt: "Please input tenant name "
-      private: no
-    - name: "tenant_desc"
-      prompt: "Please input tenant description "
-      private: no
-  tasks:
-    - name: check tenant_id is null
-      fail:
-        msg: "Update Tenant fail! tenant_id is null"
-      when: tenant_id == ''
-    - name: check tenant_name is null
-      fail:
-        msg: "Update Tenant fail! tenant_name is null"
-      when: tenant_name == ''
     - name: Update tenant "{{tenant_id}}"
-      tags: update_tenant
-      vars:
-        tenant_info:
-          id: "{{tenant_id}}"
+      ac_tenant:
+        operation: update
+        tenant_id: "{{tenant_id}}"
+        tenant_name: "{{tenant_name}}"
+        tenant_desc: "{{tenant_desc}}"
+      register: tenant_result
+    - name: Query tenant "{{tenant_id}}"
+      ac_tenant:
+        operation: query
+        tenant_id: "{{tenant_id}}"
+      register: tenant_result
+    - name: Query tenants
+      ac_tenant:
+        operation: query
+      register: tenant_result
+    - name: Query the first 100 tenants
+      ac_tenant:
+        operation: query
+        limit: 100
+      register: tenant_result
+    - name: Query the ids and names of the tenants with name "{{tenant_name}}"
+      ac_tenant:
+        operation: query
+        filters:
           name: "{{tenant_name}}"
-          description: "{{tenant_desc}}"
-          updateAt: "{{now_time}}"
-        tenant_infos:
-          tenant: ["{{tenant_info}}"]
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/tenants/tenant/{{tenant_id}}'
-        method: PUT
-        body: '{{tenant_infos}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+        fields: [id, name]
       register: tenant_result
-      ignore_errors: yes
-    - name: response from update a tenant
-      debug:
-        msg: "{{tenant_result}}"
-
-- name: Query Tenant
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "tenant_id"
-      prompt: "Please input the tenant id that you want to query "
-      private: no
-  tasks:
-    - name: qeury tenants
-      tags: qeury_tenants
-      when: tenant_id == ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/tenants'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
-      register: tenants_result
-      ignore_errors: yes
-    - name: qeury tenant "{{tenant_id}}"
-      tags: qeury_tenant
-      when: tenant_id != ''
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/tenants/tenant/{{tenant_id}}'
-        method: GET
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 200
+    - name: Delete tenant "{{tenant_id}}"
+      ac_tenant:
+        operation: delete
+        tenant_id: "{{tenant_id}}"
+      register: tenant_result
+    - name: Delete tenant "{{tenant_id}}" and everything below it
+      ac_tenant:
+        operation: delete
+        tenant_id: "{{tenant_id}}"
+        cascade: true
       register: tenant_result
-      ignore_errors: yes
-    - name: response from get tenants
-      when: tenant_id == ''
-      debug:
-        msg: "{{tenants_result.json.tenant}}"
-    - name: response from query a tenant
-      when: tenant_id != ''
-      debug:
-        msg: "{{tenant_result.json.tenant}}"
 
-- name: Delete Tenant
-  hosts: localhost
-  serial: True
-  vars:
-    token_id: "{{lookup('file','/tmp/ansible-temp')}}"
-  vars_prompt:
-    - name: "tenant_id"
-      prompt: "Please input the tenant id that you want to delete "
-      private: no
+# Inventory for the httpapi connection:
+# [ac]
+# controller ansible_host=192.0.2.10 ansible_user=admin ansible_password=secret
+# [ac:vars]
+# ansible_connection=ansible.netcommon.httpapi
+# ansible_network_os=huawei.ac.ac
+# ansible_httpapi_validate_certs=false
+- name: Query Tenants over the persistent session
+  hosts: ac
+  gather_facts: false
   tasks:
-    - name: check tenant_id is null
-      fail:
-        msg: "Delete Tenant fail! tenant_id is null"
-      when: tenant_id == ''
-    - name: Delete tenant "{{tenant_id}}"
-      tags: delete_tenant
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/dc/v3/tenants/tenant/{{tenant_id}}'
-        method: DELETE
-        validate_certs: False
-        return_content: yes
-        headers:
-          X-ACCESS-TOKEN: "{{token_id}}"
-          Accept: application/json
-          Content_Type: application/json
-        status_code: 204
+    - name: Query tenants
+      ac_tenant:
+        operation: query
       register: tenant_result
-      ignore_errors: yes
-    - name: response from delete a tenant
-      debug:
-        msg: "{{tenant_result}}"
 '''
+
+RETURN = '''
+id:
+    description: Id of the Tenant that was created, updated or deleted.
+    returned: when operation is create, update or delete
+    type: str
+tenant:
+    description:
+        - The Tenant sent to the controller for create and update.
+        - The list of matching Tenants for query.
+    returned: when operation is not delete
+    type: raw
+results:
+    description:
+        - One entry per item of I(items), with its C(id), C(name) when it has one, C(status) and, when it failed, C(msg).
+        - C(status) is C(created), C(exists) when an object with the same id was already there, or C(failed).
+    returned: when I(items) is used
+    type: list
+    elements: dict
+deleted:
+    description: With I(cascade=true), one entry per deleted object with its C(type), C(id), C(status) and, when it was not deleted, C(msg).
+    returned: when operation is delete and I(cascade=true)
+    type: list
+    elements: dict
+differences:
+    description: With I(state=present), the fields that differed from the current Tenant.
+    returned: when state is present and the Tenant was updated
+    type: list
+    elements: str
+diff:
+    description: The Tenant before and after the change, shown with C(--diff).
+    returned: when I(state) is set and something changed
+    type: dict
+'''
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_resource import resource_argument_spec, resource_required_if, run_module
+
+
+def main():
+    module = AnsibleModule(argument_spec=resource_argument_spec('tenant'),
+                           required_if=resource_required_if('tenant'),
+                           supports_check_mode=True)
+    run_module(module, 'tenant')
+
+
+if __name__ == '__main__':
+    main()
@@ -16,29 +16,79 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
 DOCUMENTATION = '''
 module: ac_token
 short_description: Get Token from HUAWEI iMaster NCE-Fabric Controller.
 description:
-    - Get Tenant from HUAWEI iMaster NCE-Fabric Controller(AC).
+    - Get Token from HUAWEI iMaster NCE-Fabric Controller(AC).
 author: ZhiwenZhang (@maomao1995)
 notes:
   - This module requires installation iMaster NCE-Fabric Controller.
   - This module is dependent by other modules.
   - This module also works with C(local) connections for legacy playbooks.
 options:
+    operation:
+        description:
+            - C(create) returns a valid token, logging in only when no cached token can be reused.
+            - C(delete) logs out I(token) and drops it from the cache.
+        type: str
+        choices: [create, delete]
+        default: create
     userName:
         description:
             - AC User name.
+        type: str
+        aliases: [username]
     password:
         description:
             - AC User password.
+        type: str
+    token:
+        description:
+            - Token to delete.
+        type: str
+        aliases: [token_id]
+    token_cache:
+        description:
+            - Reuse the token cached under C(~/.ansible/ac_tokens) while it is valid and refresh it before it expires,
+              instead of creating a new one on every run.
+            - The cache is shared safely by all forks, unlike a token file such as I(dest).
+        type: bool
+        default: true
+    dest:
+        description:
+            - File the new token is written to, readable by the owner only.
+            - Kept for playbooks that read the token with C(lookup('file', ...)).
+        type: path
+    north_ip:
+        description:
+            - Address of the AC northbound interface.
+        type: str
+        required: true
+    north_port:
+        description:
+            - Port of the AC northbound interface.
+        type: int
+        default: 18002
+    validate_certs:
+        description:
+            - Whether to validate the controller TLS certificate.
+        type: bool
+        default: false
+    timeout:
+        description:
+            - Socket timeout in seconds.
+        type: int
+        default: 30
 '''
 
 EXAMPLES = '''
 - name: Get Token
   hosts: localhost
-  serial: True
+  gather_facts: false
   vars_prompt:
     - name: "userName"
       prompt: "Please input userName "
@@ -47,61 +97,95 @@ EXAMPLES = '''
       prompt: "Please input password "
       echo: no
   tasks:
-    - name: delete old access token
-      tags: always
-      vars:
-        token_info:
-          token: "{{lookup('file','/tmp/ansible-temp')}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/v2/tokens'
-        method: DELETE
-        body: '{{token_info}}'
-        body_format: json
-        validate_certs: False
-        headers:
-          Accept: application/json
-      ignore_errors: yes
-    - name: get access token
-      tags: always
-      vars:
-        auth_user:
-          userName: '{{userName}}'
-          password: '{{password}}'
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/v2/tokens'
-        method: POST
-        body: '{{auth_user}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          Accept: application/json
-        status_code: 200
+    - name: get access token, reusing the cached one while it is valid
+      ac_token:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        userName: "{{userName}}"
+        password: "{{password}}"
       register: token_result
-    - local_action: copy content='{{token_result.json.data.token_id}}' dest="/tmp/ansible-temp"
+    - name: keep the token for later plays
+      set_fact:
+        token_id: "{{token_result.token_id}}"
+        cacheable: yes
 
 - name: Delete Token
   hosts: localhost
-  serial: True
+  gather_facts: false
   tasks:
     - name: delete access token
-      tags: always
-      vars:
-        token_info:
-          token: "{{lookup('file','/tmp/ansible-temp')}}"
-      uri:
-        url: 'https://{{north_ip}}:{{north_port}}/controller/v2/tokens'
-        method: DELETE
-        body: '{{token_info}}'
-        body_format: json
-        validate_certs: False
-        return_content: yes
-        headers:
-          Accept: application/json
-        status_code: 200
-      register: token_result
-    - name: response from delete access token
-      tags: always
-      debug:
-        msg: "{{token_result.json}}"
+      ac_token:
+        north_ip: "{{north_ip}}"
+        north_port: "{{north_port}}"
+        operation: delete
+        token: "{{token_id}}"
 '''
+
+RETURN = '''
+token_id:
+    description: The new access token.
+    returned: when operation is create
+    type: str
+expires:
+    description: Time, in seconds since the epoch, after which the token is no longer handed out.
+    returned: when operation is create
+    type: float
+'''
+
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.ac_auth import TokenCache, TokenManager, token_cache_path
+from ..module_utils.ac_client import ACClient, ACClientError, DEFAULT_PORT
+
+
+def write_token(path, token):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token)
+
+
+def main():
+    argument_spec = dict(
+        operation=dict(type='str', default='create', choices=['create', 'delete']),
+        userName=dict(type='str', aliases=['username']),
+        password=dict(type='str', no_log=True),
+        token=dict(type='str', no_log=True, aliases=['token_id']),
+        token_cache=dict(type='bool', default=True),
+        dest=dict(type='path'),
+        north_ip=dict(type='str', required=True),
+        north_port=dict(type='int', default=DEFAULT_PORT),
+        validate_certs=dict(type='bool', default=False),
+        timeout=dict(type='int', default=30),
+    )
+    module = AnsibleModule(argument_spec=argument_spec,
+                           required_if=[('operation', 'create', ['userName', 'password']),
+                                        ('operation', 'delete', ['token'])])
+    params = module.params
+    client = ACClient(params['north_ip'], params['north_port'],
+                      validate_certs=params['validate_certs'], timeout=params['timeout'])
+    cache = None
+    if params['token_cache'] and params['userName']:
+        cache = TokenCache(token_cache_path(params['north_ip'], params['north_port'], params['userName']))
+    manager = TokenManager(client, params['userName'], params['password'], cache=cache)
+    result = dict(changed=True)
+    try:
+        if params['operation'] == 'create':
+            token = manager.token()
+            # client.token is only set when the manager had to log in.
+            result.update(changed=client.token is not None, token_id=token, expires=manager.expires)
+            if params['dest']:
+                write_token(params['dest'], token)
+        else:
+            client.logout(params['token'])
+            manager.invalidate(params['token'])
+    except ACClientError as e:
+        module.fail_json(msg=str(e), status=e.status, body=e.body)
+    finally:
+        client.close()
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
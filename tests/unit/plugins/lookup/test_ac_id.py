@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleError
+from ansible.plugins.loader import lookup_loader
+
+from ansible_collections.huawei.ac.plugins.lookup import ac_id
+from ansible_collections.huawei.ac.plugins.module_utils.ac_cache import TTLCache
+from ansible_collections.huawei.ac.plugins.module_utils.ac_snapshot import SnapshotStore
+
+
+class StubClient:
+    """Lists one page of LogicSwitches."""
+
+    def __init__(self, switches):
+        self.switches = switches
+        self.listings = 0
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        self.listings += 1
+        return 200, {'switch': self.switches}
+
+    def close(self):
+        pass
+
+
+SWITCHES = [{'id': 's1', 'name': 'web', 'logicNetworkId': 'n1'},
+            {'id': 's2', 'name': 'web', 'logicNetworkId': 'n2'},
+            {'id': 's3', 'name': 'db', 'logicNetworkId': 'n1'}]
+
+
+@pytest.fixture
+def lookup(tmp_path, monkeypatch):
+    client = StubClient(SWITCHES)
+    monkeypatch.setattr(ac_id, '_LISTINGS', TTLCache())
+    monkeypatch.setattr(ac_id, 'connect', lambda params: client)
+    monkeypatch.setattr(ac_id, 'snapshot_path', lambda host, port: str(tmp_path / 'snapshot.db'))
+    plugin = lookup_loader.get('huawei.ac.ac_id')
+    plugin.client = client
+    return plugin
+
+
+def test_names_resolve_with_one_listing_per_type(lookup):
+    assert lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='db') == ['s3']
+    assert lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='web',
+                      filters={'logicNetworkId': 'n2'}) == ['s2']
+    assert lookup.client.listings == 1
+
+
+def test_ambiguous_and_unknown_names_fail(lookup):
+    with pytest.raises(AnsibleError, match='narrow them down'):
+        lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='web')
+    with pytest.raises(AnsibleError, match='no logicswitch named app'):
+        lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='app')
+
+
+def test_fresh_snapshot_answers_without_the_controller(lookup, tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshot.db'))
+    store.replace('logicswitch', [{'id': 's9', 'name': 'app'}])
+    store.close()
+    assert lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='app', snapshot_max_age=60) == ['s9']
+    assert lookup.client.listings == 0
+
+
+def test_unreadable_snapshot_falls_back_to_the_controller(lookup, tmp_path):
+    (tmp_path / 'snapshot.db').write_bytes(b'not a database' * 100)
+    assert lookup.run(['logicswitch'], {}, north_ip='192.0.2.10', name='db', snapshot_max_age=60) == ['s3']
+    assert lookup.client.listings == 1
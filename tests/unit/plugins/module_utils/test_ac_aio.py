@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import sys
+
+import pytest
+
+if sys.version_info < (3, 5):
+    pytest.skip('the asyncio engine needs Python 3.5 or later', allow_module_level=True)
+
+import asyncio
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_aio import AsyncEngine
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACClient, ACClientError
+from ansible_collections.huawei.ac.plugins.module_utils.ac_retry import RetryPolicy
+
+
+class StubEngine(AsyncEngine):
+    """AsyncEngine whose transport answers ``answer(method, url)`` after a short wait."""
+
+    def __init__(self, answer, per_endpoint=4):
+        super(StubEngine, self).__init__(ACClient('controller', token='t', retry=RetryPolicy(retries=0)),
+                                         per_endpoint)
+        self.answer = answer
+        self.sent = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def _exchange(self, method, url, data):
+        self.sent.append((method, url))
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self.answer(method, url)
+        finally:
+            self.in_flight -= 1
+
+
+def _run(engine, requests, allowed=None):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(engine.run(requests, allowed))
+    finally:
+        loop.close()
+
+
+def _ports(count):
+    return [('GET', '/controller/dc/v3/logicnetwork/ports/port/p%d' % index) for index in range(count)]
+
+
+def test_results_and_errors_keep_the_request_order():
+    def answer(method, url):
+        if url.endswith('p1'):
+            return 404, {}, None
+        return 200, {}, {'port': [{'id': url.rsplit('/', 1)[-1]}]}
+
+    results = _run(StubEngine(answer), _ports(3))
+    assert [result[1]['port'][0]['id'] for result, error in results if error is None] == ['p0', 'p2']
+    assert results[1][0] is None and results[1][1].status == 404
+    assert _run(StubEngine(answer), _ports(3), allowed=(404,))[1] == ((404, None), None)
+
+
+def test_requests_in_flight_are_bounded_per_endpoint_class():
+    engine = StubEngine(lambda method, url: (200, {}, None), per_endpoint=3)
+    _run(engine, _ports(20) + [('POST', '/controller/dc/v3/tenants', {'tenant': []})])
+    assert engine.most_in_flight == 4
+    assert len(engine.sent) == 21
+
+
+def test_rejected_token_cancels_the_pending_requests():
+    engine = StubEngine(lambda method, url: (401, {}, None), per_endpoint=1)
+    with pytest.raises(ACClientError) as caught:
+        _run(engine, _ports(10))
+    assert caught.value.status == 401
+    assert len(engine.sent) < 10
+
+
+def test_unexpected_errors_are_raised_as_they_are():
+    def answer(method, url):
+        raise KeyError('broken answer')
+
+    with pytest.raises(KeyError, match='broken answer'):
+        _run(StubEngine(answer), _ports(2))
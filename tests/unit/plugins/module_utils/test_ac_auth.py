@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import threading
+import time
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_auth import TokenCache, TokenManager
+
+
+class StubLogin:
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.logins = 0
+        self._lock = threading.Lock()
+
+    def login(self, username, password):
+        time.sleep(self.delay)
+        with self._lock:
+            self.logins += 1
+            return {'token_id': 'token-%d' % self.logins}
+
+
+def _together(functions):
+    threads = [threading.Thread(target=function) for function in functions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_token_is_reused_until_refresh_margin():
+    client = StubLogin()
+    manager = TokenManager(client, 'admin', 'pw', ttl=1800)
+    assert manager.token() == 'token-1'
+    assert manager.token() == 'token-1'
+    manager._entry['expires'] = time.time() + 10
+    assert manager.token() == 'token-2'
+
+
+def test_cache_roundtrip(tmpdir):
+    cache = TokenCache(os.path.join(str(tmpdir), 'sub', 'entry.json'))
+    assert cache.load() is None
+    cache.save({'token': 'a', 'expires': 1})
+    assert cache.load() == {'token': 'a', 'expires': 1}
+    cache.clear()
+    assert cache.load() is None
+
+
+def test_threads_share_one_login():
+    client = StubLogin(delay=0.1)
+    manager = TokenManager(client, 'admin', 'pw')
+    tokens = []
+    _together([lambda: tokens.append(manager.token())] * 8)
+    assert client.logins == 1
+    assert set(tokens) == set(['token-1'])
+
+
+def test_managers_sharing_a_cache_log_in_once(tmpdir):
+    # Each manager stands for another fork; they only share the cache file and its lock.
+    path = os.path.join(str(tmpdir), 'entry.json')
+    client = StubLogin(delay=0.1)
+    managers = [TokenManager(client, 'admin', 'pw', cache=TokenCache(path)) for dummy in range(4)]
+    tokens = []
+    _together([lambda m=m: tokens.append(m.token()) for m in managers])
+    assert client.logins == 1
+    assert set(tokens) == set(['token-1'])
+
+
+def test_rejected_token_is_replaced(tmpdir):
+    path = os.path.join(str(tmpdir), 'entry.json')
+    client = StubLogin()
+    first = TokenManager(client, 'admin', 'pw', cache=TokenCache(path))
+    second = TokenManager(client, 'admin', 'pw', cache=TokenCache(path))
+    assert first.token() == second.token() == 'token-1'
+    assert first.refresh(rejected='token-1') == 'token-2'
+    # The other fork picks up the new token instead of logging in again.
+    assert second.refresh(rejected='token-1') == 'token-2'
+    assert client.logins == 2
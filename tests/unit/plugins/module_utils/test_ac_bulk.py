@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_bulk import BulkWriter, already_exists, chunks
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACClientError
+
+
+class StubController:
+    """Accepts lists of objects the way an array endpoint does, all or nothing."""
+
+    def __init__(self, bad=(), existing=(), status=400):
+        self.bad = set(bad)
+        self.existing = set(existing)
+        self.status = status
+        self.writes = []
+        self.lookups = 0
+
+    def write(self, objs):
+        self.writes.append([obj['id'] for obj in objs])
+        if any(obj['id'] in self.bad for obj in objs):
+            raise ACClientError('rejected', status=self.status)
+        if any(obj['id'] in self.existing for obj in objs):
+            raise ACClientError('conflict', status=409)
+        self.existing.update(obj['id'] for obj in objs)
+
+    def found(self, objs):
+        self.lookups += 1
+        return set(obj['id'] for obj in objs if obj['id'] in self.existing)
+
+
+def _objs(count):
+    return [{'id': 'o%d' % index} for index in range(count)]
+
+
+def _statuses(results):
+    return [None if error is None else ('exists' if already_exists(error) else error.status)
+            for dummy, error in results]
+
+
+def test_chunks_respect_items_and_bytes():
+    objs = _objs(5)
+    assert [len(c) for c in chunks(objs, 2, 10 ** 6)] == [2, 2, 1]
+    assert [len(c) for c in chunks(objs, 10, 30)] == [2, 2, 1]
+
+
+def test_one_request_per_chunk():
+    controller = StubController()
+    writer = BulkWriter(controller.write, max_items=4)
+    results = writer.run(_objs(10))
+    assert writer.requests == 3
+    assert _statuses(results) == [None] * 10
+
+
+def test_bad_item_is_isolated_by_bisection():
+    controller = StubController(bad=['o5'])
+    writer = BulkWriter(controller.write, max_items=8)
+    results = writer.run(_objs(8))
+    assert [obj['id'] for obj, dummy in results] == ['o%d' % index for index in range(8)]
+    assert _statuses(results) == [None] * 5 + [400] + [None] * 2
+    # 1 + 2 + 2 + 2 requests: log2(8) extra levels around the bad item.
+    assert writer.requests == 7
+
+
+def test_chunk_errors_are_not_split():
+    controller = StubController(bad=['o1'], status=413)
+    writer = BulkWriter(controller.write, max_items=8)
+    assert _statuses(writer.run(_objs(4))) == [413] * 4
+    assert writer.requests == 1
+
+
+def test_existing_objects_are_resolved_with_one_lookup():
+    controller = StubController(existing=['o%d' % index for index in range(0, 100, 3)])
+    writer = BulkWriter(controller.write, max_items=100, existing=controller.found)
+    results = writer.run(_objs(100))
+    assert writer.requests == 2
+    assert controller.lookups == 1
+    assert _statuses(results) == ['exists' if index % 3 == 0 else None for index in range(100)]
+
+
+def test_rerun_costs_one_request_and_one_lookup():
+    controller = StubController(existing=[obj['id'] for obj in _objs(100)])
+    writer = BulkWriter(controller.write, max_items=100, existing=controller.found)
+    assert _statuses(writer.run(_objs(100))) == ['exists'] * 100
+    assert writer.requests == 1
+    assert controller.lookups == 1
+
+
+def test_conflict_without_taken_ids_is_split():
+    controller = StubController(bad=['o2'], status=409)
+    writer = BulkWriter(controller.write, max_items=4, existing=controller.found)
+    assert _statuses(writer.run(_objs(4))) == [None, None, 409, None]
+
+
+def test_single_conflict_is_exists_only_when_the_id_is_taken():
+    controller = StubController(bad=['o0'], existing=['o1'], status=409)
+    writer = BulkWriter(controller.write, max_items=1, existing=controller.found)
+    results = writer.run(_objs(2))
+    assert _statuses(results) == [409, 'exists']
+    assert str(results[0][1]) == 'rejected'
+
+
+def test_conflict_without_lookup_is_an_error():
+    controller = StubController(existing=['o1'])
+    assert _statuses(BulkWriter(controller.write, max_items=1).run(_objs(2))) == [None, 409]
+
+
+def test_check_mode_sends_nothing():
+    controller = StubController()
+    assert _statuses(BulkWriter(controller.write).run(_objs(3), check_mode=True)) == [None] * 3
+    assert controller.writes == []
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_diff import UNSET, differences, merge, prune
+
+
+def test_dicts_compare_as_subsets():
+    current = {'name': 'a', 'description': 'x', 'extra': 1, 'accessInfo': {'mode': 'UNI', 'vlan': 10}}
+    assert differences({'name': 'a', 'accessInfo': {'mode': 'UNI'}}, current) == []
+    assert differences({'name': 'b', 'accessInfo': {'mode': 'UNI'}}, current) == ['name']
+    assert differences({'accessInfo': {'mode': 'TRUNK'}}, current) == ['accessInfo.mode']
+
+
+def test_lists_compare_element_by_element():
+    current = {'location': [{'deviceIp': '1.1.1.1', 'portName': 'GE1'}]}
+    assert differences({'location': [{'deviceIp': '1.1.1.1'}]}, current) == []
+    assert differences({'location': [{'deviceIp': '1.1.1.2'}]}, current) == ['location[0].deviceIp']
+    assert differences({'location': []}, current) == ['location']
+
+
+def test_scalars_are_normalized():
+    assert differences({'a': ''}, {'a': None}) == []
+    assert differences({'a': None}, {}) == []
+    assert differences({'a': True}, {'a': 'true'}) == []
+    assert differences({'a': 10}, {'a': '10'}) == []
+    assert differences({'a': False}, {'a': 0}) == ['a']
+
+
+def test_prune_drops_server_fields_and_unset_options():
+    built = {'id': 'x', 'additional': {}, 'name': 'a', 'description': UNSET, 'ip': {'subnetId': UNSET}}
+    assert prune(built) == {'name': 'a'}
+
+
+def test_merge_is_deep_and_leaves_inputs_alone():
+    current = {'name': 'a', 'accessInfo': {'mode': 'UNI', 'vlan': 10}, 'tags': [1]}
+    desired = {'accessInfo': {'vlan': 20}, 'tags': [2]}
+    merged = merge(current, desired)
+    assert merged == {'name': 'a', 'accessInfo': {'mode': 'UNI', 'vlan': 20}, 'tags': [2]}
+    assert current['accessInfo']['vlan'] == 10
+    merged['tags'].append(3)
+    assert desired['tags'] == [2]
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils import ac_facts
+from ansible_collections.huawei.ac.plugins.module_utils.ac_facts import read_delta, run_facts, sync_delta
+from ansible_collections.huawei.ac.plugins.module_utils.ac_snapshot import SnapshotStore
+
+
+class StubClient:
+    """Serves the LogicSwitches of one controller, page by page."""
+
+    def __init__(self, switches):
+        self.switches = switches
+        self.pages = 0
+
+    def endpoint(self):
+        return 'controller.invalid', 18002
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        self.pages += 1
+        size = query['pageSize']
+        start = (query['pageIndex'] - 1) * size
+        return 200, {'switch': self.switches[start:start + size], 'totalNum': len(self.switches)}
+
+
+def _switch(index, updated='1'):
+    return {'id': 's%d' % index, 'name': 'web%d' % index, 'logicNetworkId': 'n1',
+            'additional': {'updateAt': updated}}
+
+
+def test_read_delta_keeps_only_new_updated_and_removed():
+    client = StubClient([_switch(0), _switch(1, '2'), _switch(3)])
+    versions = {'s0': '1', 's1': '1', 's2': '1'}
+    changed, removed = read_delta(client, 'logicswitch', versions, page_size=2)
+    assert [obj['id'] for obj in changed] == ['s1', 's3']
+    assert removed == ['s2']
+    assert client.pages == 2
+
+
+def test_sync_delta_applies_the_changes_to_the_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshot.db'))
+    try:
+        store.replace('logicswitch', [_switch(0), _switch(1), _switch(2)])
+        client = StubClient([_switch(0), _switch(1, '2'), _switch(3)])
+        changes = sync_delta(store, client, ['logicswitch'])
+        assert changes == {'logicswitch': {'changed': ['s1', 's3'], 'removed': ['s2']}}
+        assert sorted(obj['id'] for obj in store.list('logicswitch')) == ['s0', 's1', 's3']
+        assert store.get('logicswitch', 's1')['additional']['updateAt'] == '2'
+    finally:
+        store.close()
+
+
+def test_sync_delta_reads_everything_without_an_earlier_sync(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshot.db'))
+    try:
+        changes = sync_delta(store, StubClient([_switch(0), _switch(1)]), ['logicswitch'])
+        assert changes['logicswitch']['changed'] == ['s0', 's1']
+        assert store.synced_at('logicswitch') is not None
+    finally:
+        store.close()
+
+
+def _params(sync):
+    return dict(gather_subset=['logicswitch'], workers=2, page_size=10, snapshot=False, sync=sync)
+
+
+def test_delta_reports_changes_without_facts(tmp_path, monkeypatch):
+    monkeypatch.setattr(ac_facts, 'snapshot_path', lambda host, port: str(tmp_path / 'snapshot.db'))
+    client = StubClient([_switch(0), _switch(1)])
+    result = run_facts(dict(_params('delta'), snapshot=True), client)
+    assert 'ansible_facts' not in result
+    assert result['changes']['logicswitch']['changed'] == ['s0', 's1']
+    assert run_facts(_params('delta'), client)['changes']['logicswitch'] == {'changed': [], 'removed': []}
+
+
+def test_full_indexes_the_facts():
+    result = run_facts(_params('full'), StubClient([_switch(0), _switch(1)]))
+    switches = result['ansible_facts']['ac']['logicswitch']
+    assert sorted(switches['by_id']) == ['s0', 's1']
+    assert switches['by_name']['web1'] == ['s1']
+    assert switches['by_logicNetworkId']['n1'] == ['s0', 's1']
+    assert 'changes' not in result
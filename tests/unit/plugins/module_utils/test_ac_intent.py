@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACClientError
+from ansible_collections.huawei.ac.plugins.module_utils.ac_intent import TENANT_SPEC, run_intent
+from ansible_collections.huawei.ac.plugins.module_utils.ac_resource import RESOURCES
+
+FABRIC = '0b2c6e44-5a63-4d4b-9f1e-3a5c2f0e7d11'
+
+
+class FakeController:
+    """Keeps the objects created through the ``RESOURCES`` paths; names are unique per type."""
+
+    def __init__(self):
+        self.objs = dict((resource_type, {}) for resource_type in RESOURCES)
+        self.posts = []
+
+    def endpoint(self):
+        return 'controller.invalid', 18002
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        for resource_type, spec in RESOURCES.items():
+            stored = self.objs[resource_type]
+            if method == 'POST' and path == spec['path']:
+                objs = body[spec['key']]
+                objs = objs if isinstance(objs, list) else [objs]
+                self.posts.append(resource_type)
+                if any(obj['id'] in stored for obj in objs):
+                    raise ACClientError('id is used', status=409)
+                names = set(obj.get('name') for obj in stored.values())
+                if any(obj.get('name') in names for obj in objs):
+                    raise ACClientError('name is used', status=409)
+                stored.update((obj['id'], obj) for obj in objs)
+                return 200, None
+            if method == 'GET' and path == spec['path']:
+                return 200, {spec['key']: list(stored.values())}
+            if method == 'GET' and path.startswith(spec['item_path'] % ''):
+                obj = stored.get(path[len(spec['item_path'] % ''):])
+                return (200, {spec['key']: obj}) if obj else (404, None)
+        raise AssertionError('unexpected %s %s' % (method, path))
+
+
+def _options(spec, values):
+    """Fill ``values`` with the defaults of ``spec`` the way the module arguments are."""
+    filled = dict((name, option.get('default')) for name, option in spec.items())
+    filled.update(values)
+    for name, option in spec.items():
+        if option.get('type') == 'list':
+            filled[name] = [_options(option['options'], item) for item in filled[name]]
+    return filled
+
+
+def _params(tenant_name='t1'):
+    tenant = dict(name=tenant_name, fabric_id=FABRIC, networks=[dict(
+        name='n1',
+        routers=[dict(name='r1', subnets=[dict(cidr='10.0.0.0/24', gateway_ip='10.0.0.1')])],
+        switches=[dict(name='s1', ports=[dict(name='p1', device_ip='10.1.1.1', port_name='10GE1/0/1',
+                                              endports=[dict(name='e1')])])],
+        interfaces=[dict(name='i1', router='r1', switch='s1', subnet='10.0.0.0/24')])])
+    return dict(tenants=[_options(TENANT_SPEC, tenant)], fabric_id=None, workers=4, chunk_size=100,
+                chunk_bytes=1024 * 1024)
+
+
+def _statuses(result):
+    return dict((r['type'], r['status']) for r in result['results'])
+
+
+def test_parents_are_created_before_their_children():
+    controller = FakeController()
+    result = run_intent(_params(), controller)
+    assert result['changed'] and not result.get('failed')
+    assert set(_statuses(result).values()) == set(['created'])
+    order = controller.posts
+    assert order[0] == 'tenant' and order[1] == 'logicnetwork'
+    assert order.index('logicsubnet') > order.index('logicrouter')
+    assert order.index('endport') > order.index('logicport') > order.index('logicswitch')
+    assert order[-1] == 'logicinterface'
+
+
+def test_rerun_reports_every_object_as_existing():
+    controller = FakeController()
+    run_intent(_params(), controller)
+    result = run_intent(_params(), controller)
+    assert not result['changed'] and not result.get('failed')
+    assert set(_statuses(result).values()) == set(['exists'])
+    assert result['ids']['logicport'] == {'t1/n1/s1/p1': list(controller.objs['logicport'])[0]}
+
+
+def test_unconfirmed_conflict_fails_the_parent_and_skips_its_subtree():
+    controller = FakeController()
+    controller.objs['tenant']['a6f1c8de-8f5e-4a3b-bb42-7d8e2c3f1a90'] = {
+        'id': 'a6f1c8de-8f5e-4a3b-bb42-7d8e2c3f1a90', 'name': 't1'}
+    result = run_intent(_params(), controller)
+    statuses = _statuses(result)
+    assert statuses.pop('tenant') == 'failed'
+    assert set(statuses.values()) == set(['skipped'])
+    assert result['failed'] and not result['changed']
+    assert result['ids'] == {}
+    assert controller.posts == ['tenant']
+
+
+def test_check_mode_sends_nothing():
+    controller = FakeController()
+    result = run_intent(_params(), controller, check_mode=True)
+    assert set(_statuses(result).values()) == set(['created'])
+    assert controller.posts == []
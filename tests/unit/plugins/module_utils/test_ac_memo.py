@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import threading
+import time
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_memo import RequestMemo
+
+ROUTER = '/controller/dc/v3/logicnetwork/routers/router/6f1c0b4e-1'
+ROUTERS = '/controller/dc/v3/logicnetwork/routers'
+SWITCHES = '/controller/dc/v3/logicnetwork/switches'
+
+
+class StubSender:
+
+    def __init__(self, delay=0.0, status=200):
+        self.delay = delay
+        self.status = status
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.status, {}, {'router': [{'id': 'r', 'tags': []}]}
+
+
+def test_concurrent_gets_share_one_request():
+    memo = RequestMemo()
+    sender = StubSender(delay=0.2)
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(memo.send('GET', ROUTER, None, sender)))
+               for dummy in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sender.calls == 1
+    assert len(answers) == 8
+
+
+def test_answers_are_copies():
+    memo = RequestMemo()
+    sender = StubSender()
+    memo.send('GET', ROUTER, None, sender)[2]['router'][0]['tags'].append('changed')
+    assert memo.send('GET', ROUTER, None, sender)[2]['router'][0]['tags'] == []
+    assert sender.calls == 1
+
+
+def test_query_is_part_of_the_key():
+    memo = RequestMemo()
+    sender = StubSender()
+    memo.send('GET', ROUTERS, {'pageIndex': 1, 'pageSize': 10}, sender)
+    memo.send('GET', ROUTERS, {'pageSize': 10, 'pageIndex': 1}, sender)
+    memo.send('GET', ROUTERS, {'pageIndex': 2, 'pageSize': 10}, sender)
+    assert sender.calls == 2
+
+
+def test_errors_and_server_failures_are_not_kept():
+    memo = RequestMemo()
+
+    def fail():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError):
+        memo.send('GET', ROUTER, None, fail)
+    sender = StubSender(status=503)
+    memo.send('GET', ROUTER, None, sender)
+    memo.send('GET', ROUTER, None, sender)
+    assert sender.calls == 2
+
+
+def test_writes_forget_their_collection():
+    memo = RequestMemo()
+    routers, switches = StubSender(), StubSender()
+    memo.send('GET', ROUTER, None, routers)
+    memo.send('GET', SWITCHES, None, switches)
+    memo.send('PUT', ROUTERS + '/router/6f1c0b4e-2', None, lambda: (200, {}, None))
+    memo.send('GET', ROUTER, None, routers)
+    memo.send('GET', SWITCHES, None, switches)
+    assert (routers.calls, switches.calls) == (2, 1)
+
+
+def test_deletes_forget_everything():
+    memo = RequestMemo()
+    switches = StubSender()
+    memo.send('GET', SWITCHES, None, switches)
+    memo.send('DELETE', ROUTER, None, lambda: (204, {}, None))
+    memo.send('GET', SWITCHES, None, switches)
+    assert switches.calls == 2
+
+
+def test_answer_overtaken_by_a_write_is_not_kept():
+    memo = RequestMemo()
+    slow = StubSender(delay=0.3)
+    reader = threading.Thread(target=lambda: memo.send('GET', ROUTER, None, slow))
+    reader.start()
+    time.sleep(0.1)
+    memo.send('POST', ROUTERS, None, lambda: (201, {}, None))
+    reader.join()
+    fresh = StubSender()
+    memo.send('GET', ROUTER, None, fresh)
+    assert fresh.calls == 1
+
+
+def test_answers_expire():
+    memo = RequestMemo(ttl=0)
+    sender = StubSender()
+    memo.send('GET', ROUTER, None, sender)
+    memo.send('GET', ROUTER, None, sender)
+    assert sender.calls == 2
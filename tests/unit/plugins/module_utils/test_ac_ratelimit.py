@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils import ac_ratelimit
+from ansible_collections.huawei.ac.plugins.module_utils.ac_ratelimit import TokenBucket, bucket_path
+
+
+class Clock:
+    """Time that only moves when the bucket sleeps or the test says so."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ac_ratelimit, 'time', clock)
+    return clock
+
+
+def test_burst_then_one_token_per_interval(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.take() for dummy in range(3)] == [0, 0, 0]
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.take() == 0
+
+
+def test_tokens_do_not_grow_beyond_the_burst(clock):
+    bucket = TokenBucket(rate=10, burst=2)
+    clock.now += 3600
+    assert [bucket.take() for dummy in range(3)][2] > 0
+
+
+def test_acquire_waits_for_the_rate(clock):
+    bucket = TokenBucket(rate=4, burst=1)
+    started = clock.now
+    for dummy in range(9):
+        bucket.acquire()
+    assert clock.now - started == pytest.approx(2.0)
+
+
+def test_buckets_on_one_file_share_their_tokens(clock, tmp_path):
+    path = str(tmp_path / 'limits' / 'controller.bucket')
+    first = TokenBucket(rate=1, burst=2, path=path)
+    second = TokenBucket(rate=1, burst=2, path=path)
+    assert first.take() == 0
+    assert second.take() == 0
+    assert first.take() == pytest.approx(1.0)
+    assert second.take() == pytest.approx(1.0)
+
+
+def test_unreadable_file_starts_full(clock, tmp_path):
+    path = tmp_path / 'controller.bucket'
+    path.write_bytes(b'garbage')
+    bucket = TokenBucket(rate=1, burst=2, path=str(path))
+    assert [bucket.take() for dummy in range(2)] == [0, 0]
+
+
+def test_bucket_path_is_per_controller():
+    assert bucket_path('192.0.2.10', 18002) != bucket_path('192.0.2.11', 18002)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACClientError
+from ansible_collections.huawei.ac.plugins.module_utils.ac_resource import ACResource, _query
+
+
+class StubClient:
+    """Serves one collection the way the controller pages it."""
+
+    def __init__(self, objs, key='port', total=True, ignored=()):
+        self.objs = objs
+        self.key = key
+        self.total = total
+        self.ignored = ('pageIndex', 'pageSize') + tuple(ignored)
+        self.queries = []
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        self.queries.append(dict(query or {}))
+        matching = [obj for obj in self.objs
+                    if all(obj.get(k) == v for k, v in (query or {}).items() if k not in self.ignored)]
+        size = (query or {}).get('pageSize', len(matching))
+        index = (query or {}).get('pageIndex', 1)
+        data = {self.key: matching[(index - 1) * size:index * size]}
+        if self.total:
+            data['totalNum'] = len(matching)
+        return 200, data
+
+
+def _ports(count, switch='s1'):
+    return [{'id': 'p%d' % index, 'logicSwitchId': switch} for index in range(count)]
+
+
+def test_iter_list_reads_every_page():
+    client = StubClient(_ports(25))
+    found = ACResource(client, 'logicport').list(page_size=10)
+    assert [obj['id'] for obj in found] == ['p%d' % index for index in range(25)]
+    assert [q['pageIndex'] for q in client.queries] == [1, 2, 3]
+
+
+def test_iter_list_stops_at_total():
+    client = StubClient(_ports(20))
+    assert len(ACResource(client, 'logicport').list(page_size=10)) == 20
+    assert len(client.queries) == 2
+
+
+def test_iter_list_without_total_reads_one_page():
+    client = StubClient(_ports(20), total=False)
+    assert len(ACResource(client, 'logicport').list(page_size=10)) == 10
+    assert len(client.queries) == 1
+
+
+def test_iter_list_requests_pages_lazily():
+    client = StubClient(_ports(100))
+    assert len(ACResource(client, 'logicport').list(page_size=10, limit=15)) == 15
+    assert len(client.queries) == 2
+    pages = ACResource(client, 'logicport').iter_list(page_size=10)
+    next(pages)
+    assert len(client.queries) == 3
+
+
+def test_iter_list_passes_filters():
+    client = StubClient(_ports(5, 's1') + _ports(5, 's2'))
+    found = ACResource(client, 'logicport').list({'logicSwitchId': 's2'}, page_size=2)
+    assert len(found) == 5
+    assert all(q['logicSwitchId'] == 's2' for q in client.queries)
+
+
+def _query_params(filters, limit=None):
+    return dict(snapshot_max_age=None, filters=filters, page_size=10, limit=limit)
+
+
+def test_query_rechecks_the_filters_the_controller_ignores():
+    objs = [dict(obj, name='web' if index % 2 else 'db') for index, obj in enumerate(_ports(30, 's1'))]
+    client = StubClient(objs, ignored=['name'])
+    found = list(_query(ACResource(client, 'logicport'), _query_params({'name': 'web'}, limit=4), None))
+    assert [obj['id'] for obj in found] == ['p1', 'p3', 'p5', 'p7']
+    assert len(client.queries) == 1
+
+
+def test_query_limit_stops_the_listing():
+    client = StubClient(_ports(50, 's1') + _ports(50, 's2'))
+    found = list(_query(ACResource(client, 'logicport'), _query_params({'logicSwitchId': 's2'}, limit=15), None))
+    assert len(found) == 15 and all(obj['logicSwitchId'] == 's2' for obj in found)
+    assert [q['pageIndex'] for q in client.queries] == [1, 2]
+
+
+def test_existing_ids_lists_the_shared_parent_once():
+    client = StubClient(_ports(5, 's1') + _ports(5, 's2'))
+    wanted = [{'id': 'p1', 'logicSwitchId': 's1'}, {'id': 'p9', 'logicSwitchId': 's1'}]
+    assert ACResource(client, 'logicport').existing_ids(wanted) == set(['p1'])
+    assert [q['logicSwitchId'] for q in client.queries] == ['s1']
+
+
+class UniqueNameClient:
+    """Creates logic networks whose id and name must both be unique, one per request."""
+
+    def __init__(self, objs):
+        self.objs = dict((obj['id'], obj) for obj in objs)
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        if method == 'POST':
+            obj = body['network']
+            if obj['id'] in self.objs:
+                raise ACClientError('id is used', status=409)
+            if any(other['name'] == obj['name'] for other in self.objs.values()):
+                raise ACClientError('name is used', status=409)
+            self.objs[obj['id']] = obj
+            return 200, None
+        if query:
+            return 200, {'network': list(self.objs.values())}
+        obj = self.objs.get(path.rsplit('/', 1)[-1])
+        if obj is None:
+            return 404, None
+        return 200, {'network': obj}
+
+
+def _network(obj_id, name):
+    return {'id': obj_id, 'name': name, 'tenantId': 't1'}
+
+
+def test_ensure_created_confirms_the_id_after_a_conflict():
+    resource = ACResource(UniqueNameClient([_network('n1', 'web')]), 'logicnetwork')
+    assert resource.ensure_created(_network('n1', 'web')) is False
+    with pytest.raises(ACClientError, match='name is used'):
+        resource.ensure_created(_network('n2', 'web'))
+    assert resource.ensure_created(_network('n3', 'db')) is True
+
+
+def test_create_each_reports_name_clashes_as_failed():
+    resource = ACResource(UniqueNameClient([_network('n1', 'web')]), 'logicnetwork')
+    results = resource.create_each([_network('n1', 'web'), _network('n2', 'web'), _network('n3', 'db')], 2)
+    assert [r['status'] for r in results] == ['exists', 'failed', 'created']
+    assert results[1]['msg'] == 'name is used'
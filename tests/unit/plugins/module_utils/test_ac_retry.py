@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils import ac_client, ac_retry
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACCircuitOpenError, ACClient, ACClientError
+from ansible_collections.huawei.ac.plugins.module_utils.ac_retry import (CircuitBreaker, RetryPolicy, idempotent,
+                                                                         parse_retry_after)
+
+
+class StubClient(ACClient):
+    """ACClient whose transport answers from a list instead of the network."""
+
+    def __init__(self, answers, **kwargs):
+        super(StubClient, self).__init__('controller', token='t', **kwargs)
+        self.answers = list(answers)
+        self.sent = []
+
+    def _exchange(self, method, url, data):
+        self.sent.append((method, url))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        status, headers, body = answer
+        return status, headers, json.dumps(body).encode('utf-8') if body is not None else b''
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    slept = []
+    monkeypatch.setattr(ac_client.time, 'sleep', slept.append)
+    return slept
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('7') == 7
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT', now=1445412480) == 10
+    assert parse_retry_after('soon') is None
+
+
+def test_idempotent():
+    assert idempotent('GET')
+    assert idempotent('DELETE')
+    assert idempotent('POST', {'ports': [{'id': 'a'}, {'id': 'b'}]})
+    assert not idempotent('POST', {'ports': [{'id': 'a'}, {'name': 'b'}]})
+    assert not idempotent('POST', {})
+
+
+def test_retryable():
+    policy = RetryPolicy()
+    assert policy.retryable('POST', {'port': {'name': 'p'}}, 503)
+    assert policy.retryable('POST', {'port': {'name': 'p'}}, 429)
+    assert not policy.retryable('POST', {'port': {'name': 'p'}}, 502)
+    assert policy.retryable('POST', {'port': {'id': 'x'}}, 502)
+    assert policy.retryable('GET', None, None)
+    assert not policy.retryable('GET', None, 500)
+
+
+def test_delay_is_capped():
+    policy = RetryPolicy(max_delay=4, backoff=1)
+    assert all(0 <= policy.delay(attempt) <= min(2 ** attempt, 4) for attempt in range(8))
+    assert policy.delay(0, retry_after=60) == 4
+    assert policy.delay(3, retry_after=2) == 2
+
+
+def test_breaker_opens_and_tries_again(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ac_retry.time, 'time', lambda: now[0])
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+    breaker.failure()
+    assert breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    now[0] += 31
+    assert breaker.allow()
+    # Only one trial request while half open.
+    assert not breaker.allow()
+    breaker.failure()
+    assert not breaker.allow()
+    now[0] += 31
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_send_retries_transient_answers(no_sleep):
+    client = StubClient([(503, {'Retry-After': '1'}, None), (200, {}, {'ok': True})])
+    assert client.request('GET', '/a') == (200, {'ok': True})
+    assert len(client.sent) == 2
+    assert no_sleep == [1]
+
+
+def test_send_gives_up_after_retries():
+    client = StubClient([(503, {}, None)] * 3, retry=RetryPolicy(retries=2))
+    with pytest.raises(ACClientError) as e:
+        client.request('GET', '/a')
+    assert e.value.status == 503
+    assert len(client.sent) == 3
+
+
+def test_send_does_not_repeat_unsafe_creates():
+    client = StubClient([ACClientError('reset'), (204, {}, None)])
+    with pytest.raises(ACClientError):
+        client.request('POST', '/ports', {'port': {'name': 'p'}})
+    assert len(client.sent) == 1
+
+
+def test_send_stops_at_open_circuit():
+    client = StubClient([(500, {}, None)] * 2, breaker=CircuitBreaker(threshold=2))
+    for dummy in range(2):
+        with pytest.raises(ACClientError):
+            client.request('GET', '/a')
+    with pytest.raises(ACCircuitOpenError):
+        client.request('GET', '/a')
+    assert len(client.sent) == 2
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_scheduler import (AIMDLimiter, ConcurrencyControl,
+                                                                             collection_path, endpoint_class)
+
+
+def test_endpoint_class():
+    assert endpoint_class('POST', '/controller/dc/v3/logicnetwork/ports') == 'POST ports'
+    assert endpoint_class('PUT', '/controller/dc/v3/logicnetwork/ports/port/0f5e-11') == 'PUT ports'
+    assert endpoint_class('GET', '/controller/dc/v3/tenants?pageIndex=2') == 'GET tenants'
+    assert collection_path('/controller/dc/v3/logicnetwork/ports/port/0f5e-11') == '/controller/dc/v3/logicnetwork/ports'
+
+
+def test_starts_with_initial_slots():
+    limiter = AIMDLimiter(initial=4)
+    taken = [limiter.try_acquire() for dummy in range(5)]
+    assert taken[:4] == [0] * 4
+    assert taken[4] is None
+
+
+def test_additive_increase():
+    limiter = AIMDLimiter(initial=4, maximum=6)
+    for dummy in range(4):
+        limiter.release(limiter.acquire(), 0.01, True)
+    assert 4.9 < limiter.limit < 5.0
+    for dummy in range(50):
+        limiter.release(limiter.acquire(), 0.01, True)
+    assert limiter.limit == 6
+
+
+def test_one_cut_per_round():
+    limiter = AIMDLimiter(initial=8)
+    rounds = [limiter.acquire() for dummy in range(4)]
+    for taken in rounds:
+        limiter.release(taken, 0.01, False)
+    assert limiter.limit == 4
+    limiter.release(limiter.acquire(), 0.01, False)
+    assert limiter.limit == 2
+    for dummy in range(5):
+        limiter.release(limiter.acquire(), 0.01, False)
+    assert limiter.limit == 1
+
+
+def test_slow_answers_cut_the_limit():
+    limiter = AIMDLimiter(initial=8)
+    limiter.release(limiter.acquire(), 0.1, True)
+    limiter.release(limiter.acquire(), 0.15, True)
+    assert limiter.limit > 8
+    limiter.release(limiter.acquire(), 1.0, True)
+    assert limiter.limit < 5
+
+
+def test_fixed_limits_without_adaptation():
+    control = ConcurrencyControl({'POST ports': 2, 'ports': 3, 'GET': 5}, adaptive=False)
+    post = control.limiter('POST', '/x/ports')
+    assert control.limiter('POST', '/x/ports/port/1') is post
+    assert post.limit == 2
+    assert control.limiter('PUT', '/x/ports').limit == 3
+    assert control.limiter('GET', '/x/tenants').limit == 5
+    post.release(post.acquire(), 0.01, False)
+    assert post.limit == 2
+
+
+def test_adaptive_limits_are_caps():
+    control = ConcurrencyControl({'ports': 2})
+    limiter = control.limiter('POST', '/x/ports')
+    assert limiter.limit == 2
+    for dummy in range(20):
+        limiter.release(limiter.acquire(), 0.01, True)
+    assert limiter.limit == 2
+    assert control.limiter('GET', '/x/tenants').limit == 4
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import time
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_resource import query_snapshot
+from ansible_collections.huawei.ac.plugins.module_utils.ac_snapshot import SnapshotStore, snapshot_path, version
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshots' / 'controller.db'))
+    yield store
+    store.close()
+
+
+def _ports():
+    return [{'id': 'p1', 'name': 'web', 'logicSwitchId': 's1'},
+            {'id': 'p2', 'name': 'web', 'logicSwitchId': 's2'},
+            {'id': 'p3', 'name': 'db', 'logicSwitchId': 's1', 'fabricId': ['f1', 'f2']}]
+
+
+def test_version_prefers_update_time():
+    assert version({'id': 'a', 'additional': {'updateAt': '2024-01-01 10:00:00'}}) == '2024-01-01 10:00:00'
+    assert version({'id': 'a', 'updateAt': '2024-01-02 10:00:00'}) == '2024-01-02 10:00:00'
+    assert version({'id': 'a', 'name': 'x'}) == version({'name': 'x', 'id': 'a'})
+    assert version({'id': 'a', 'name': 'x'}) != version({'id': 'a', 'name': 'y'})
+
+
+def test_snapshot_path_is_per_controller():
+    assert snapshot_path('192.0.2.10', 18002) != snapshot_path('192.0.2.10', 18003)
+    assert snapshot_path('192.0.2.10', 18002, '/var/tmp').startswith('/var/tmp/')
+
+
+def test_store_is_private_and_open_existing_needs_a_file(store, tmp_path):
+    assert os.stat(store.path).st_mode & 0o077 == 0
+    assert SnapshotStore.open_existing(str(tmp_path / 'missing.db')) is None
+
+
+def test_find_uses_the_name_and_parent_indexes(store):
+    store.replace('logicport', _ports())
+    assert [obj['id'] for obj in store.find('logicport', name='web')] == ['p1', 'p2']
+    assert [obj['id'] for obj in store.find('logicport', parents={'logicSwitchId': 's1'})] == ['p1', 'p3']
+    assert [obj['id'] for obj in store.find('logicport', name='web', parents={'logicSwitchId': 's2'})] == ['p2']
+    assert store.ids('logicport', 'db') == ['p3']
+
+
+def test_replace_put_and_remove(store):
+    store.replace('logicport', _ports())
+    store.put('logicport', {'id': 'p1', 'logicSwitchId': 's2'})
+    assert store.get('logicport', 'p1') == {'id': 'p1', 'name': 'web', 'logicSwitchId': 's2'}
+    assert [obj['id'] for obj in store.find('logicport', parents={'logicSwitchId': 's1'})] == ['p3']
+    store.remove('logicport', 'p3')
+    store.replace('logicport', [{'id': 'p4', 'name': 'app', 'logicSwitchId': 's1'}])
+    assert [obj['id'] for obj in store.list('logicport')] == ['p4']
+    assert store.find('logicport', parents={'logicSwitchId': 's2'}) == []
+
+
+def test_freshness_is_kept_per_type(store):
+    store.replace('logicport', _ports(), synced_at=time.time() - 120)
+    assert store.fresh('logicport', 300)
+    assert not store.fresh('logicport', 60)
+    assert not store.fresh('logicswitch', 300)
+    assert store.versions('logicport') == dict((obj['id'], version(obj)) for obj in _ports())
+
+
+def test_query_snapshot_matches_every_filter(store):
+    store.replace('logicport', _ports())
+    found = query_snapshot(store, 'logicport', None, {'logicSwitchId': 's1', 'fabricId': 'f2'})
+    assert [obj['id'] for obj in found] == ['p3']
+    assert query_snapshot(store, 'logicport', 'p2', {'name': 'db'}) == []
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_client import ACClientError
+from ansible_collections.huawei.ac.plugins.module_utils.ac_resource import RESOURCES, cascade_delete
+from ansible_collections.huawei.ac.plugins.module_utils.ac_topology import delete_graph, descendant_types
+
+
+def _inventory():
+    return {
+        'logicrouter': [{'id': 'r1', 'logicNetworkId': 'n1'}, {'id': 'r9', 'logicNetworkId': 'n9'}],
+        'logicswitch': [{'id': 's1', 'logicNetworkId': 'n1'}],
+        'logicsubnet': [{'id': 'sub1', 'logicRouterId': 'r1'}],
+        'logicinterface': [{'id': 'i1', 'logicRouterId': 'r1', 'logicSwitchId': 's1', 'ip': {'subnetId': 'sub1'}}],
+        'logicport': [{'id': 'p1', 'logicSwitchId': 's1'}],
+        'endport': [{'id': 'e1', 'logicPortId': 'p1', 'logicNetworkId': 'n1'}],
+    }
+
+
+def _levels(graph):
+    return [sorted(node['key'] for node in level) for level in graph.levels()]
+
+
+def test_descendant_types_of_a_network():
+    assert sorted(descendant_types('logicnetwork')) == sorted(
+        ['logicrouter', 'logicswitch', 'logicsubnet', 'logicinterface', 'logicport', 'endport'])
+    assert descendant_types('endport') == []
+
+
+def test_delete_graph_removes_leaves_first():
+    assert _levels(delete_graph('logicnetwork', 'n1', _inventory())) == [
+        ['endport:e1', 'logicinterface:i1'],
+        ['logicport:p1', 'logicsubnet:sub1'],
+        ['logicrouter:r1', 'logicswitch:s1'],
+        ['logicnetwork:n1'],
+    ]
+
+
+def test_delete_graph_keeps_other_subtrees():
+    assert _levels(delete_graph('logicswitch', 's1', _inventory())) == [
+        ['endport:e1', 'logicinterface:i1'], ['logicport:p1'], ['logicswitch:s1']]
+
+
+class StubController:
+    """Lists, reads and deletes the objects of an inventory; DELETE of ``stuck`` ids fails."""
+
+    def __init__(self, inventory, stuck=()):
+        self.objs = dict((t, list(objs)) for t, objs in inventory.items())
+        self.stuck = set(stuck)
+        self.deleted = []
+
+    def endpoint(self):
+        return 'controller.invalid', 18002
+
+    def request(self, method, path, body=None, query=None, allowed=None):
+        for resource_type, spec in RESOURCES.items():
+            objs = self.objs.setdefault(resource_type, [])
+            if method == 'GET' and path == spec['path']:
+                return 200, {spec['key']: objs}
+            if path.startswith(spec['item_path'] % ''):
+                obj_id = path[len(spec['item_path'] % ''):]
+                found = [obj for obj in objs if obj['id'] == obj_id]
+                if not found:
+                    return 404, None
+                if method == 'GET':
+                    return 200, {spec['key']: found[0]}
+                if obj_id in self.stuck:
+                    raise ACClientError('%s is in use' % obj_id, status=400)
+                objs.remove(found[0])
+                self.deleted.append(obj_id)
+                return 200, None
+        raise AssertionError('unexpected %s %s' % (method, path))
+
+
+def _network_inventory():
+    return dict(_inventory(), logicnetwork=[{'id': 'n1', 'tenantId': 't1'}])
+
+
+def test_cascade_delete_removes_the_subtree_leaves_first():
+    controller = StubController(_network_inventory())
+    result = cascade_delete(controller, 'logicnetwork', 'n1', workers=4)
+    assert result['changed'] and not result.get('failed')
+    assert set(controller.deleted[:2]) == set(['e1', 'i1'])
+    assert controller.deleted[-1] == 'n1'
+    assert [obj['id'] for obj in controller.objs['logicrouter']] == ['r9']
+
+
+def test_cascade_delete_skips_the_parents_of_a_failed_object():
+    controller = StubController(_network_inventory(), stuck=['p1'])
+    result = cascade_delete(controller, 'logicnetwork', 'n1', workers=4)
+    statuses = dict((item['id'], item['status']) for item in result['deleted'])
+    assert statuses == dict(e1='deleted', i1='deleted', p1='failed', sub1='deleted', r1='deleted', s1='skipped',
+                            n1='skipped')
+    assert result['failed'] and result['changed']
+    assert result['msg'] == '3 of 7 objects were not deleted'
+
+
+def test_cascade_delete_of_a_missing_object_changes_nothing():
+    controller = StubController(_network_inventory())
+    assert cascade_delete(controller, 'logicnetwork', 'n2') == dict(changed=False, id='n2', deleted=[])
+    assert controller.deleted == []
+
+
+def test_cascade_delete_check_mode_sends_no_delete():
+    controller = StubController(_network_inventory())
+    result = cascade_delete(controller, 'logicnetwork', 'n1', check_mode=True)
+    assert result['changed'] and len(result['deleted']) == 7
+    assert controller.deleted == []
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.huawei.ac.plugins.module_utils.ac_resource import ACResourceError, check_valid
+from ansible_collections.huawei.ac.plugins.module_utils.ac_validate import parse_cidr, parse_ip, validate
+
+ID = '3f2b8c1e-7d4a-4e9b-8a6c-5d1e2f3a4b5c'
+PARENT = '9a8b7c6d-5e4f-4a3b-9c2d-1e0f9a8b7c6d'
+
+
+def test_parse_ip_and_cidr():
+    assert parse_ip('10.1.1.1') == (32, 0x0a010101)
+    assert parse_ip('2001:db8::1')[0] == 128
+    assert parse_ip('10.1.1') is None and parse_ip('') is None and parse_ip(None) is None
+    assert parse_cidr('10.1.1.0/24') == (32, 0x0a010100, 24)
+    assert parse_cidr('2001:db8::/32') is not None
+    assert parse_cidr('10.1.1.1/24') is None
+    assert parse_cidr('10.1.1.0/33') is None
+    assert parse_cidr('10.1.1.0') is None
+
+
+def test_valid_subnet_has_no_problems():
+    subnet = {'id': ID, 'logicRouterId': PARENT, 'cidr': '10.1.1.0/24', 'gatewayIp': '10.1.1.1'}
+    assert validate('logicsubnet', subnet) == []
+
+
+def test_subnet_problems_are_all_reported():
+    subnet = {'id': 'r1', 'logicRouterId': PARENT, 'cidr': '10.1.1.0/24', 'gatewayIp': '10.1.2.1'}
+    assert validate('logicsubnet', subnet) == ["id 'r1' is not a UUID", 'gatewayIp 10.1.2.1 is not inside cidr 10.1.1.0/24']
+    assert validate('logicsubnet', dict(subnet, id=ID, cidr='10.1.1.1/24')) == [
+        "cidr '10.1.1.1/24' is not a network address with a prefix length, e.g. 10.1.1.0/24"]
+
+
+def test_nested_parent_ids_are_checked():
+    interface = {'id': ID, 'logicRouterId': PARENT, 'logicSwitchId': PARENT, 'ip': {'subnetId': 'sub1'}}
+    assert validate('logicinterface', interface) == ["ip.subnetId 'sub1' is not a UUID"]
+
+
+def test_port_location_is_checked():
+    port = {'id': ID, 'logicSwitchId': PARENT, 'accessInfo': {'location': [{'deviceIp': '10.0.0.300',
+                                                                            'portName': '10GE1/0/1'}]}}
+    assert validate('logicport', port) == ["accessInfo.location[0].deviceIp '10.0.0.300' is not an IP address"]
+    port['accessInfo']['location'] = []
+    assert validate('logicport', port) == ['accessInfo.location must hold at least one device port']
+
+
+def test_unset_fields_are_not_checked():
+    assert validate('logicswitch', {'id': None, 'logicNetworkId': ''}) == []
+
+
+def test_check_valid_raises_before_any_request():
+    with pytest.raises(ACResourceError, match="invalid logicnetwork: tenantId 't1' is not a UUID"):
+        check_valid('logicnetwork', {'id': ID, 'tenantId': 't1'})